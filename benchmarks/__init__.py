@@ -0,0 +1,11 @@
+"""
+Microbenchmarks for django-guid.
+
+Run the whole suite, and save the results so they can be compared between releases, with
+
+    python -m benchmarks --output results.json --compare previous-results.json
+
+Each suite can also be run on its own, e.g. `python -m benchmarks.middleware`. All timings are per call,
+in nanoseconds, and run against the demo project's settings. `benchmarks.insert_locality` is a standalone
+experiment, and not part of the suite.
+"""
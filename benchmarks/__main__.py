@@ -0,0 +1,103 @@
+"""
+Runs the benchmark suite and saves the results as JSON.
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --output results.json --compare previous-release.json
+    python -m benchmarks --only middleware api
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from benchmarks.utils import Results, report, setup_django
+
+SUITES = [
+    'middleware',
+    'middleware_specialisation',
+    'api',
+    'guid_generation',
+    'guid_validation',
+    'ignore_urls',
+    'settings_access',
+    'sentry',
+    'log_events',
+    'metrics',
+    'celery_signals',
+    'celery_stamping',
+    'trace_context',
+    'opentelemetry',
+    'executors',
+    'http_propagation',
+    'sql_comments',
+    'consumers',
+    'streaming',
+    'log_handlers',
+    'log_formatters',
+]
+
+
+def compare(results: Results, previous: Results) -> None:
+    """
+    Prints each timing next to the previous run, as a ratio. Ratios above 1 are slower than before.
+    """
+    print('Compared to previous results')  # noqa: T201
+    for title, timings in results.items():
+        for name, ns in timings.items():
+            before = previous.get(title, {}).get(name)
+            if before:
+                print(f'  {title} / {name}: {before:.1f} ns -> {ns:.1f} ns ({ns / before:.2f}x)')  # noqa: T201
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Runs the selected suites, prints the results, and optionally saves and compares them.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--output', help='Path to write the results to, as JSON')
+    parser.add_argument('--compare', help='Path to previous JSON results to compare against')
+    parser.add_argument('--only', nargs='+', choices=SUITES, default=SUITES, help='Suites to run')
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    import django
+
+    import django_guid
+
+    results: Results = {}
+    for suite in args.only:
+        suite_results = importlib.import_module(f'benchmarks.{suite}').run()  # type: ignore[attr-defined]
+        for title, timings in suite_results.items():
+            report(title, timings)
+        results.update(suite_results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(
+                {
+                    'metadata': {
+                        'django_guid': django_guid.__version__,
+                        'django': django.get_version(),
+                        'python': platform.python_version(),
+                        'machine': platform.machine(),
+                        'date': datetime.now(timezone.utc).isoformat(),
+                    },
+                    'unit': 'ns',
+                    'results': results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,40 @@
+"""
+Cost of the `get_guid`/`set_guid` API and the log filters, which run for every log record.
+"""
+
+import logging
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django_guid import get_guid, set_guid
+    from django_guid.context import guid
+    from django_guid.integrations.celery.log_filters import CeleryTracing
+    from django_guid.log_filters import CorrelationId
+
+    record = logging.LogRecord('benchmark', logging.INFO, __file__, 1, 'message', None, None)
+    correlation_id = CorrelationId()
+    celery_tracing = CeleryTracing()
+    guid.set(GUID)
+
+    return {
+        'API': {
+            'get_guid': measure(get_guid),
+            'set_guid': measure(lambda: set_guid(GUID)),
+        },
+        'Log filters': {
+            'CorrelationId': measure(lambda: correlation_id.filter(record)),
+            'CeleryTracing': measure(lambda: celery_tracing.filter(record)),
+        },
+    }
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,113 @@
+"""
+Per-task overhead of the Celery signal handlers: publishing a task, and the worker's pre-run and post-run.
+
+The "before" case reproduces the previous implementation, which built and validated the Celery integration
+settings on every access, and parsed the Sentry SDK version for every task.
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Tuple
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+if TYPE_CHECKING:
+    from django_guid.integrations.celery.config import CeleryIntegrationSettings
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+class Task:
+    """
+    Stands in for a Celery task, as the handlers only read `task.request`.
+    """
+
+    def __init__(self, request: dict) -> None:
+        self.request = request
+
+
+def before_handlers() -> Tuple[Callable[..., None], Callable[..., None], Callable[..., None]]:
+    """
+    Returns the publish, pre-run and post-run handlers of the previous implementation.
+    """
+    import sentry_sdk
+    from packaging import version
+
+    from django_guid import clear_guid, get_guid, set_guid
+    from django_guid.config import IntegrationSettings, settings
+    from django_guid.integrations.celery.context import celery_current, celery_parent
+    from django_guid.utils import generate_guid
+
+    def celery_settings() -> 'CeleryIntegrationSettings':
+        integrations = {integration.identifier: integration for integration in settings.snapshot.integrations}
+        return IntegrationSettings(integrations).celery
+
+    def before_set_transaction_id(guid: str) -> None:
+        if celery_settings().sentry_integration:
+            if version.parse(sentry_sdk.VERSION) >= version.parse('2.12.0'):
+                with sentry_sdk.isolation_scope() as scope:
+                    scope.set_tag('transaction_id', guid)
+
+    def before_publish(headers: dict, **kwargs: Any) -> None:
+        headers[settings.snapshot.guid_header_name] = get_guid()
+        if celery_settings().log_parent:
+            current = celery_current.get()
+            if current:
+                headers['CELERY_PARENT_ID'] = current
+
+    def before_prerun(task: Task, **kwargs: Any) -> None:
+        guid = task.request.get(settings.snapshot.guid_header_name)
+        if not guid:
+            guid = generate_guid(uuid_length=celery_settings().uuid_length)
+        set_guid(guid)
+        before_set_transaction_id(guid)
+        if celery_settings().log_parent:
+            origin = task.request.get('CELERY_PARENT_ID')
+            if origin:
+                celery_parent.set(origin)
+            celery_current.set(generate_guid(uuid_length=celery_settings().uuid_length))
+
+    def before_clean_up(task: Task, **kwargs: Any) -> None:
+        clear_guid()
+        if celery_settings().log_parent:
+            celery_current.set(None)
+            celery_parent.set(None)
+
+    return before_publish, before_prerun, before_clean_up
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.test import override_settings
+
+    from django_guid import set_guid
+    from django_guid.integrations import CeleryIntegration
+    from django_guid.integrations.celery.signals import clean_up, publish_task_from_worker_or_request, worker_prerun
+
+    def task_cycle(publish: Any, prerun: Any, postrun: Any) -> None:
+        set_guid(GUID)
+        headers: dict = {}
+        publish(headers=headers)
+        task = Task(headers)
+        prerun(task)
+        postrun(task)
+
+    before = before_handlers()
+    results: Results = {}
+    for title, integration in [
+        ('Celery task', CeleryIntegration()),
+        ('Celery task, log_parent and sentry_integration', CeleryIntegration(log_parent=True, sentry_integration=True)),
+    ]:
+        with override_settings(DJANGO_GUID={'INTEGRATIONS': [integration], 'LOG_EVENTS': []}):
+            results[title] = {
+                'per access (before)': measure(lambda: task_cycle(*before)),
+                'bound handlers': measure(
+                    lambda: task_cycle(publish_task_from_worker_or_request, worker_prerun, clean_up)
+                ),
+            }
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
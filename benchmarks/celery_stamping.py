@@ -0,0 +1,61 @@
+"""
+Publish throughput of a group of tasks, sent to Celery's in-memory broker.
+
+Per-message headers are set by the `before_task_publish` handler, which reads the GUID for every message.
+Stamped canvases read the GUID once, when `stamp_canvas` is called, and the handler skips the stamped messages.
+The stamped timings include the cost of stamping the group.
+"""
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+GROUP_SIZE = 20
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.test import override_settings
+
+    from celery import Celery, group
+
+    from django_guid import set_guid
+    from django_guid.integrations import CeleryIntegration
+    from django_guid.integrations.celery.stamping import stamp_canvas
+
+    app = Celery('benchmarks', broker='memory://')
+
+    @app.task
+    def add(x: int) -> int:
+        return x + 1
+
+    def publish() -> None:
+        group(add.s(i) for i in range(GROUP_SIZE)).apply_async()
+
+    def publish_stamped() -> None:
+        stamp_canvas(group(add.s(i) for i in range(GROUP_SIZE))).apply_async()
+
+    def per_message(func: object) -> float:
+        ns = measure(func, number=200) / GROUP_SIZE  # type: ignore[arg-type]
+        with app.connection() as connection:
+            connection.default_channel.queue_purge('celery')
+        return ns
+
+    results: Results = {}
+    for title, integration in [
+        (f'Celery group of {GROUP_SIZE}, per message', CeleryIntegration()),
+        (f'Celery group of {GROUP_SIZE}, per message, log_parent', CeleryIntegration(log_parent=True)),
+    ]:
+        with override_settings(DJANGO_GUID={'INTEGRATIONS': [integration], 'LOG_EVENTS': []}):
+            set_guid(GUID)
+            results[title] = {
+                'per-message headers': per_message(publish),
+                'stamped canvas': per_message(publish_stamped),
+            }
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
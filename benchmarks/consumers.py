@@ -0,0 +1,97 @@
+"""
+Per-message cost of GuidConsumerMixin, over 10,000 messages on one websocket connection.
+
+Each run drives a consumer through its ASGI interface, from a queue of messages, and times the first and the last
+1,000 messages. With the mixin, the time per message should be the same at the end of the connection as at the start.
+Channels closes old database connections in a worker thread before each message, which dominates these timings,
+so the mixin's own work is also measured around a consumer that does nothing.
+"""
+
+import asyncio
+from time import perf_counter
+from typing import Any, List
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+MESSAGES = 10_000
+BATCH = 1_000
+
+
+async def drive(consumer_class: Any) -> List[float]:
+    """
+    Sends MESSAGES messages through one connection, and returns the time at the end of each batch.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    queue.put_nowait({'type': 'websocket.connect'})
+    for _ in range(MESSAGES):
+        queue.put_nowait({'type': 'websocket.receive', 'text': 'ping'})
+    queue.put_nowait({'type': 'websocket.disconnect', 'code': 1000})
+
+    async def send(message: Any) -> None:
+        pass
+
+    marks = [perf_counter()]
+
+    class Consumer(consumer_class):  # type: ignore[misc, valid-type]
+        count = 0
+
+        async def receive(self, text_data: Any = None, bytes_data: Any = None) -> None:
+            self.count += 1
+            if self.count % BATCH == 0:
+                marks.append(perf_counter())
+
+    scope = {'type': 'websocket', 'path': '/ws', 'headers': [], 'subprotocols': []}
+    await Consumer.as_asgi()(scope, queue.get, send)
+    return marks
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from channels.generic.websocket import AsyncWebsocketConsumer
+
+    from django_guid.consumers import GuidConsumerMixin
+
+    class GuidConsumer(GuidConsumerMixin, AsyncWebsocketConsumer):
+        pass
+
+    results: Results = {}
+    for name, consumer_class in [
+        ('AsyncWebsocketConsumer', AsyncWebsocketConsumer),
+        ('with GuidConsumerMixin', GuidConsumer),
+    ]:
+        marks = min((asyncio.run(drive(consumer_class)) for _ in range(3)), key=lambda marks: marks[-1] - marks[0])
+        results[name] = {
+            f'messages 1-{BATCH:,}': (marks[1] - marks[0]) / BATCH * 1e9,
+            f'messages {MESSAGES - BATCH + 1:,}-{MESSAGES:,}': (marks[-1] - marks[-2]) / BATCH * 1e9,
+        }
+
+    class NoopConsumer:
+        async def dispatch(self, message: Any) -> None:
+            """
+            Handles nothing.
+            """
+
+    class GuidNoopConsumer(GuidConsumerMixin, NoopConsumer):
+        pass
+
+    message = {'type': 'websocket.receive', 'text': 'ping'}
+
+    def dispatch(consumer: Any) -> None:
+        try:
+            consumer.dispatch(message).send(None)
+        except StopIteration:
+            pass
+
+    plain, with_mixin = NoopConsumer(), GuidNoopConsumer()
+    results['Dispatch to a consumer that does nothing'] = {
+        'plain': measure(lambda: dispatch(plain)),
+        'with GuidConsumerMixin': measure(lambda: dispatch(with_mixin)),
+    }
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
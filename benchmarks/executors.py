@@ -0,0 +1,47 @@
+"""
+Per-submit overhead of the context-propagating executors, next to the standard library executors.
+
+Each iteration submits a no-op and waits for its result, so the timings include the hand-off to the worker.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def noop() -> None:
+    """
+    The submitted function. Defined at module level, so the process pools can pickle it.
+    """
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django_guid import set_guid
+    from django_guid.api import GuidProcessPoolExecutor, GuidThreadPoolExecutor
+    from django_guid.integrations.celery.context import celery_current
+
+    set_guid(GUID)
+    celery_current.set(GUID)
+
+    results: Results = {}
+    for title, executors, number in [
+        ('Thread pool, submit and result', (ThreadPoolExecutor, GuidThreadPoolExecutor), 20_000),
+        ('Process pool, submit and result', (ProcessPoolExecutor, GuidProcessPoolExecutor), 2_000),
+    ]:
+        timings = {}
+        for name, executor_class in zip(('standard library', 'GUID propagated'), executors):
+            with executor_class(max_workers=1) as executor:  # type: ignore[operator]
+                executor.submit(noop).result()  # Starts the worker
+                timings[name] = measure(lambda: executor.submit(noop).result(), number=number)
+        results[title] = timings
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
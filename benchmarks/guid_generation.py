@@ -0,0 +1,36 @@
+"""
+Cost of generating GUIDs, before and after the buffered entropy pool.
+
+The "before" cases reproduce the previous implementation, which called `uuid.uuid4()` for every ID.
+"""
+
+import uuid
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+BATCH = 100_000
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django_guid.utils import generate_guid, generate_guids
+
+    return {
+        'Single GUID': {
+            'uuid.uuid4().hex (before)': measure(lambda: uuid.uuid4().hex[:32]),
+            'str(uuid.uuid4()) (before)': measure(lambda: str(uuid.uuid4())[:36]),
+            'generate_guid()': measure(generate_guid),
+        },
+        f'Batch of {BATCH} GUIDs': {
+            'uuid.uuid4().hex loop (before)': measure(lambda: [uuid.uuid4().hex for _ in range(BATCH)], number=5),
+            'generate_guid() loop': measure(lambda: [generate_guid() for _ in range(BATCH)], number=5),
+            'generate_guids(n)': measure(lambda: generate_guids(BATCH), number=5),
+        },
+    }
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,57 @@
+"""
+Cost of validating an incoming GUID, before and after the fast-path validator.
+
+The "before" cases reproduce the previous implementation, which parsed the input with `uuid.UUID`,
+and scanned invalid input character by character to choose a log message.
+"""
+
+import uuid
+from typing import Tuple
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+VALID = '97c304252fd14b25b72d6aee31565843'
+INVALID = 'bad-guid'
+OVERSIZED = 'a' * 1_000_000
+
+
+def before(value: str) -> Tuple[bool, bool]:
+    """
+    The previous `validate_guid`, plus the log message check for invalid input.
+
+    Returns whether the value is valid, and for invalid values, whether it only has alphanumerics and dashes.
+    """
+    try:
+        return bool(uuid.UUID(value, version=4).hex), False
+    except ValueError:
+        return False, all(letter.isalnum() or letter == '-' for letter in value)
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django_guid.utils import validate_guid
+    from django_guid.validation import GUIDValidator
+
+    validator = GUIDValidator()
+    cached_validator = GUIDValidator(cache_size=1024)
+    cached_validator(VALID)
+
+    return {
+        'GUID validation': {
+            'valid, uuid.UUID (before)': measure(lambda: before(VALID)),
+            'valid, validate_guid()': measure(lambda: validate_guid(VALID)),
+            'valid, validator': measure(lambda: validator(VALID)),
+            'valid, validator with cache hit': measure(lambda: cached_validator(VALID)),
+            'invalid, uuid.UUID (before)': measure(lambda: before(INVALID)),
+            'invalid, validator': measure(lambda: validator(INVALID)),
+            'oversized 1MB, uuid.UUID (before)': measure(lambda: before(OVERSIZED), number=10),
+            'oversized 1MB, validator': measure(lambda: validator(OVERSIZED)),
+        },
+    }
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
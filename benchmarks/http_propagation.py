@@ -0,0 +1,92 @@
+"""
+Per-request cost of the outgoing HTTP propagation hooks, next to passing the GUID header by hand.
+
+Requests are sent to a local server over a pooled keep-alive connection, so the timings include a round trip,
+which is noisy next to the cost of the hooks. The last group sends requests to an in-memory `httpx` transport,
+which times the client-side work only.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        """
+        Responds with no content.
+        """
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        """
+        Keeps the server quiet.
+        """
+        pass
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    import httpx
+    import requests
+    import urllib3
+
+    from django_guid import get_guid, set_guid
+    from django_guid.config import settings
+    from django_guid.http.httpx import GuidTransport
+    from django_guid.http.requests import mount_guid_adapter
+    from django_guid.http.urllib3 import GuidPoolManager
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/'
+
+    set_guid(GUID)
+
+    def manual_headers() -> dict:
+        return {settings.snapshot.guid_header_name: get_guid()}
+
+    results: Results = {}
+    with requests.Session() as manual, mount_guid_adapter(requests.Session()) as hooked:
+        results['requests.Session'] = {
+            'headers by hand': measure(lambda: manual.get(url, headers=manual_headers()), number=2_000),
+            'GuidHTTPAdapter': measure(lambda: hooked.get(url), number=2_000),
+        }
+    with urllib3.PoolManager() as manual, GuidPoolManager() as hooked:
+        results['urllib3.PoolManager'] = {
+            'headers by hand': measure(lambda: manual.request('GET', url, headers=manual_headers()), number=2_000),
+            'GuidPoolManager': measure(lambda: hooked.request('GET', url), number=2_000),
+        }
+    with httpx.Client() as manual, httpx.Client(transport=GuidTransport()) as hooked:
+        results['httpx.Client'] = {
+            'headers by hand': measure(lambda: manual.get(url, headers=manual_headers()), number=2_000),
+            'GuidTransport': measure(lambda: hooked.get(url), number=2_000),
+        }
+
+    def respond(request: 'httpx.Request') -> 'httpx.Response':
+        return httpx.Response(204)
+
+    with httpx.Client(transport=httpx.MockTransport(respond)) as manual, httpx.Client(
+        transport=GuidTransport(httpx.MockTransport(respond))
+    ) as hooked:
+        results['httpx.Client, in-memory transport'] = {
+            'headers by hand': measure(lambda: manual.get(url, headers=manual_headers()), number=10_000),
+            'GuidTransport': measure(lambda: hooked.get(url), number=10_000),
+        }
+
+    server.shutdown()
+    server.server_close()
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
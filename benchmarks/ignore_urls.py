@@ -0,0 +1,52 @@
+"""
+Cost of the IGNORE_URLS check for a single request, before and after the compiled matcher.
+
+The "before" case reproduces the previous implementation: strip the full path and look it up in a list
+rebuilt from the settings dict. The matcher is evaluated once per request, and the second lookup
+in the outgoing phase is served from the request.
+"""
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.test import RequestFactory
+
+    from django_guid.matching import IgnoreURLMatcher
+    from django_guid.utils import ignored_url
+
+    rules = ['no-guid', 'health/*', r'^metrics(/|$)', 'api/v1/ping']
+    raw_settings = {'IGNORE_URLS': rules}
+    matcher = IgnoreURLMatcher(rules)
+    request = RequestFactory().get('/health/live?verbose=1')
+
+    def before() -> bool:
+        ignored = False
+        for _ in range(2):  # Incoming and outgoing phase
+            ignored = request.get_full_path().strip('/') in list(
+                {url.strip('/') for url in raw_settings['IGNORE_URLS']}
+            )
+        return ignored
+
+    def after() -> None:
+        request.__dict__.pop('_django_guid_ignored', None)
+        ignored_url(request)
+        ignored_url(request)
+
+    return {
+        'IGNORE_URLS check per request': {
+            'list membership (before)': measure(before),
+            'compiled matcher, cached': measure(after),
+            'matcher, exact hit': measure(lambda: matcher('/no-guid')),
+            'matcher, pattern hit': measure(lambda: matcher('/health/live')),
+            'matcher, miss': measure(lambda: matcher('/api/v2/orders')),
+        },
+    }
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,78 @@
+"""
+Insert locality of the UUID_FORMAT options.
+
+Inserts IDs into an indexed SQLite table (a B-tree) and reports the insert time and resulting file size,
+plus a B-tree stand-in: the share of inserts that land at the right edge of the sorted keys.
+Random UUIDv4 keys land all over the tree, while time-ordered keys are appended.
+"""
+
+import bisect
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.utils import measure, report, setup_django
+
+ROWS = 200_000
+
+
+def sqlite_insert(guids: List[str]) -> Dict[str, float]:
+    """
+    Inserts the IDs one transaction per 1000 rows, and returns the elapsed time and database size.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'locality.sqlite3')
+        connection = sqlite3.connect(path)
+        connection.execute('CREATE TABLE log (correlation_id TEXT PRIMARY KEY) WITHOUT ROWID')
+        start = time.perf_counter()
+        for i in range(0, len(guids), 1000):
+            with connection:
+                connection.executemany('INSERT INTO log VALUES (?)', ((guid,) for guid in guids[i : i + 1000]))
+        elapsed = time.perf_counter() - start
+        connection.close()
+        return {'seconds': elapsed, 'megabytes': os.path.getsize(path) / 1e6}
+
+
+def right_edge_share(guids: List[str]) -> float:
+    """
+    Returns the share of inserts that are appended after all existing keys.
+    """
+    keys: List[str] = []
+    appended = 0
+    for guid in guids:
+        position = bisect.bisect(keys, guid)
+        appended += position == len(keys)
+        keys.insert(position, guid)
+    return appended / len(guids)
+
+
+def main() -> None:
+    """
+    Runs the benchmark.
+    """
+    setup_django()
+
+    from django_guid.utils import new_guid
+
+    formats: Dict[str, Callable[[], str]] = {
+        'hex': lambda: new_guid('hex'),
+        'string': lambda: new_guid('string'),
+        'uuidv7': lambda: new_guid('uuidv7'),
+        'ulid': lambda: new_guid('ulid'),
+    }
+    report('Generation per ID', {name: measure(factory) for name, factory in formats.items()})
+
+    for name, factory in formats.items():
+        guids = [factory() for _ in range(ROWS)]
+        result = sqlite_insert(guids)
+        share = right_edge_share(guids[:20_000])
+        print(  # noqa: T201
+            f'{name:<7} {ROWS} rows: {result["seconds"]:.2f}s, {result["megabytes"]:.1f} MB, '
+            f'{share:.1%} of inserts at the right edge'
+        )
+
+
+if __name__ == '__main__':
+    main()
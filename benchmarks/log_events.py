@@ -0,0 +1,54 @@
+"""
+Cost of django-guid's own lifecycle log lines on the request path, with every event logged and with none.
+
+Logging is enabled for this suite, with the `django_guid` logger writing to a handler that discards records,
+so the timings include creating the log records but not formatting or writing them.
+"""
+
+import logging
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from django_guid.middleware import get_request_processors
+
+    logger = logging.getLogger('django_guid')
+    handlers, level, propagate = logger.handlers, logger.level, logger.propagate
+    logger.handlers, logger.propagate = [logging.NullHandler()], False
+    logger.setLevel(logging.DEBUG)
+    logging.disable(logging.NOTSET)
+
+    request = RequestFactory().get('/', HTTP_CORRELATION_ID=GUID)
+    response = HttpResponse()
+
+    def process() -> None:
+        request.__dict__.pop('_django_guid_ignored', None)
+        processors = get_request_processors()
+        processors.incoming(request)
+        processors.outgoing(response, request)
+
+    results: Results = {'Request processing at DEBUG level': {}}
+    try:
+        for name, log_events in [('all events', None), ('LOG_EVENTS = []', [])]:
+            django_guid_settings = {} if log_events is None else {'LOG_EVENTS': log_events}
+            with override_settings(DJANGO_GUID=django_guid_settings):
+                results['Request processing at DEBUG level'][name] = measure(process)
+    finally:
+        logging.disable(logging.CRITICAL)
+        logger.handlers, logger.propagate = handlers, propagate
+        logger.setLevel(level)
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,113 @@
+"""
+Time per line, and throughput in lines per second, of JsonFormatter, next to the usual pairing of the log filters
+with a `logging.Formatter` subclass that builds a dict from the record and serializes it with `json.dumps`.
+
+Records are formatted directly, without a handler, inside a request with a GUID and a Celery parent and current ID.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+# Attributes every LogRecord has, which the generic formatter leaves out when collecting `extra` values
+RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime'}
+
+
+class GenericJsonFormatter(logging.Formatter):
+    """
+    Serializes the record's standard fields and all its other attributes, as generic JSON formatters do.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Builds a dict from the record, and serializes it.
+        """
+        values: Dict[str, Any] = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in RECORD_ATTRIBUTES:
+                values[name] = value
+        return json.dumps(values, default=str)
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django_guid import clear_guid, set_guid
+    from django_guid.integrations.celery.context import celery_current, celery_parent
+    from django_guid.integrations.celery.log_filters import CeleryTracing
+    from django_guid.log_filters import CorrelationId
+    from django_guid.log_formatters import JsonFormatter
+
+    set_guid(GUID)
+    celery_parent.set('c494886651cd4baaa8654e4d24a8mock')
+    celery_current.set('704ae5472cae4f8daa8f2cc5a5a8mock')
+
+    def record() -> logging.LogRecord:
+        return logging.LogRecord('shop.orders', logging.INFO, __file__, 1, 'Processed order %s', (42,), None)
+
+    def generic(formatter: logging.Formatter, filters: List[logging.Filter]) -> Callable[[], str]:
+        def format_line() -> str:
+            line = record()
+            for log_filter in filters:
+                log_filter.filter(line)
+            line.user_id = 7
+            return formatter.format(line)
+
+        return format_line
+
+    def fast(formatter: JsonFormatter) -> Callable[[], str]:
+        def format_line() -> str:
+            line = record()
+            line.user_id = 7
+            return formatter.format(line)
+
+        return format_line
+
+    import django_guid.log_formatters
+
+    orjson = django_guid.log_formatters.orjson
+    formatters: Dict[str, Callable[[], str]] = {
+        'logging.Formatter + json.dumps, with filters': generic(
+            GenericJsonFormatter(), [CorrelationId(), CeleryTracing()]
+        ),
+    }
+    try:
+        django_guid.log_formatters.orjson = None  # type: ignore[assignment]
+        formatters['JsonFormatter, json'] = fast(JsonFormatter(fields=['user_id']))
+    finally:
+        django_guid.log_formatters.orjson = orjson
+    if orjson is not None:
+        formatters['JsonFormatter, orjson'] = fast(JsonFormatter(fields=['user_id']))
+
+    try:
+        baseline = {'creating the record only': measure(record)}
+        return {
+            'Formatting a record, per line': {
+                **baseline,
+                **{name: measure(format_line) for name, format_line in formatters.items()},
+            }
+        }
+    finally:
+        clear_guid()
+        celery_parent.set(None)
+        celery_current.set(None)
+
+
+if __name__ == '__main__':
+    setup_django()
+    results = run()
+    report_all(results)
+    for title, timings in results.items():
+        print(f'{title}, in lines per second')  # noqa: T201
+        for name, ns in timings.items():
+            print(f'  {name:<45}  {1e9 / ns:12,.0f}')  # noqa: T201
@@ -0,0 +1,107 @@
+"""
+Latency of a logging call, seen by the code that logs, with the handlers called in the logging thread and with
+the records handed over to GuidQueueHandler's listener thread.
+
+Logging is enabled for this suite, on a logger of its own. The sinks are a file, and a handler that sleeps for
+a moment per record, like a handler sending records over the network. The queues are sized so no records are
+dropped, and the listener's backlog is drained after each run, outside the timings.
+"""
+
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
+from typing import Callable
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+FORMAT = '%(levelname)s %(asctime)s [%(correlation_id)s] %(name)s %(message)s'
+
+
+class SlowHandler(logging.Handler):
+    """
+    Formats each record, and sleeps for 50 microseconds.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Formats the record, and waits.
+        """
+        self.format(record)
+        time.sleep(0.00005)
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django_guid import clear_guid, set_guid
+    from django_guid.log_filters import CorrelationId
+    from django_guid.log_handlers import GuidQueueHandler
+
+    logger = logging.getLogger('benchmarks.log_handlers')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logging.disable(logging.NOTSET)
+    set_guid(GUID)
+
+    def log() -> None:
+        logger.info('Processed order %s', 42)
+
+    def timed(handler: logging.Handler, number: int, close: Callable[[], None]) -> float:
+        logger.handlers = [handler]
+        try:
+            log()  # Starts the listener, for the queue handlers
+            return measure(log, number=number, repeat=3)
+        finally:
+            close()
+            logger.handlers = []
+
+    results: Results = {}
+    fd, path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)
+    try:
+        for title, sink, number in [
+            ('Logging to a file', lambda: logging.FileHandler(path), 20_000),
+            ('Logging to a slow handler, 50 us per record', SlowHandler, 2_000),
+        ]:
+            timings = {}
+
+            sync_handler = sink()
+            sync_handler.setFormatter(logging.Formatter(FORMAT))
+            sync_handler.addFilter(CorrelationId())
+            timings['handler called while logging'] = timed(sync_handler, number, sync_handler.close)
+
+            # The standard library's QueueHandler, with the filter reading the GUID before the record is queued
+            target = sink()
+            target.setFormatter(logging.Formatter(FORMAT))
+            queue_handler = QueueHandler(Queue())
+            queue_handler.addFilter(CorrelationId())
+            listener = QueueListener(queue_handler.queue, target)
+            listener.start()
+            timings['QueueHandler with CorrelationId filter'] = timed(
+                queue_handler, number, lambda: (listener.stop(), target.close())  # noqa: B023
+            )
+
+            target = sink()
+            target.setFormatter(logging.Formatter(FORMAT))
+            target.addFilter(CorrelationId())
+            guid_handler = GuidQueueHandler([target], maxsize=4 * number)
+            timings['GuidQueueHandler'] = timed(
+                guid_handler, number, lambda: (guid_handler.close(), target.close())  # noqa: B023
+            )
+
+            results[title] = timings
+    finally:
+        os.remove(path)
+        logging.disable(logging.CRITICAL)
+        clear_guid()
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
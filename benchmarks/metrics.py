@@ -0,0 +1,40 @@
+"""
+Request processing with metrics disabled, and with the built-in registry and a no-op callback collecting them.
+"""
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from django_guid.metrics import MetricsRegistry
+    from django_guid.middleware import get_request_processors
+
+    request = RequestFactory().get('/', HTTP_CORRELATION_ID=GUID)
+    response = HttpResponse()
+
+    def process() -> None:
+        processors = get_request_processors()
+        processors.incoming(request)
+        processors.outgoing(response, request)
+
+    def callback(kind: str, name: str, value: float, labels: dict) -> None:
+        pass
+
+    results: Results = {'Request processing': {}}
+    for name, metrics in [('disabled', None), ('MetricsRegistry', MetricsRegistry()), ('callback', callback)]:
+        with override_settings(DJANGO_GUID={'METRICS': metrics}):
+            results['Request processing'][name] = measure(process)
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
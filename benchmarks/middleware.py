@@ -0,0 +1,109 @@
+"""
+Per-request overhead of the middleware.
+
+Each case calls the middleware with a view that returns an empty response, next to a baseline calling the view
+directly, so the difference is the overhead django-guid adds to a request.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+ASYNC_BATCH = 1000
+
+
+def fresh(request: 'HttpRequest') -> 'HttpRequest':
+    """
+    Drops per-request state cached on the request, so a request object can be reused between iterations.
+    """
+    request.__dict__.pop('_django_guid_ignored', None)
+    request.__dict__.pop('headers', None)
+    return request
+
+
+def measure_async(func: Callable[[], Awaitable[object]]) -> float:
+    """
+    Returns the best per-call time of an async function in nanoseconds, awaiting it in batches on one event loop.
+    """
+
+    async def batch() -> None:
+        for _ in range(ASYNC_BATCH):
+            await func()
+
+    loop = asyncio.new_event_loop()
+    try:
+        return measure(lambda: loop.run_until_complete(batch()), number=20) / ASYNC_BATCH
+    finally:
+        loop.close()
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.core.handlers.asgi import ASGIRequest
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from django_guid.asgi import get_header_from_scope
+    from django_guid.middleware import guid_middleware, process_incoming_request, process_outgoing_request
+
+    factory = RequestFactory()
+    request_without_header = factory.get('/')
+    request_with_header = factory.get('/', HTTP_CORRELATION_ID=GUID)
+    request_ignored = factory.get('/no-guid')
+    response = HttpResponse()
+
+    def view(request: 'HttpRequest') -> 'HttpResponse':
+        return response
+
+    async def async_view(request: 'HttpRequest') -> 'HttpResponse':
+        return response
+
+    middleware = guid_middleware(view)
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/',
+        'query_string': b'',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'accept', b'application/json'),
+            (b'user-agent', b'benchmark'),
+            (b'correlation-id', GUID.encode()),
+        ],
+    }
+    asgi_request = ASGIRequest(scope, None)
+    async_middleware = guid_middleware(async_view)
+
+    return {
+        'Sync middleware': {
+            'baseline, no middleware': measure(lambda: view(fresh(request_with_header))),
+            'header present': measure(lambda: middleware(fresh(request_with_header))),
+            'header missing': measure(lambda: middleware(fresh(request_without_header))),
+            'ignored URL': measure(lambda: middleware(fresh(request_ignored))),
+        },
+        'Async middleware': {
+            'baseline, no middleware': measure_async(lambda: async_view(fresh(request_with_header))),
+            'header present': measure_async(lambda: async_middleware(fresh(request_with_header))),
+            'header missing': measure_async(lambda: async_middleware(fresh(request_without_header))),
+        },
+        'ASGI header lookup': {
+            'request.headers.get': measure(lambda: fresh(asgi_request).headers.get('Correlation-ID')),
+            'raw scope scan': measure(lambda: get_header_from_scope(scope, b'correlation-id')),
+        },
+        'Request processing': {
+            'process_incoming_request': measure(lambda: process_incoming_request(fresh(request_with_header))),
+            'process_outgoing_request': measure(lambda: process_outgoing_request(response, request_with_header)),
+        },
+    }
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
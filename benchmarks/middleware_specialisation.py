@@ -0,0 +1,78 @@
+"""
+Request processing for the default configuration, before and after specialising it at startup.
+
+The "before" case reproduces the previous implementation, which looked up the settings, checked IGNORE_URLS
+and looped over every integration on each request.
+"""
+
+from typing import TYPE_CHECKING
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from django_guid.config import settings
+    from django_guid.context import guid
+    from django_guid.integrations import CeleryIntegration
+    from django_guid.middleware import get_request_processors
+    from django_guid.utils import get_id_from_header, ignored_url
+
+    def before_incoming(request: 'HttpRequest') -> None:
+        if not ignored_url(request=request):
+            guid.set(get_id_from_header(request))
+            for integration in settings.snapshot.integrations:
+                integration.run(guid=guid.get())
+
+    def before_outgoing(response: 'HttpResponse', request: 'HttpRequest') -> None:
+        if not ignored_url(request=request):
+            conf = settings.snapshot
+            if conf.return_header:
+                response[conf.guid_header_name] = guid.get()
+                if conf.expose_header:
+                    response['Access-Control-Expose-Headers'] = conf.guid_header_name
+            for integration in conf.integrations:
+                integration.cleanup()
+
+    request = RequestFactory().get('/', HTTP_CORRELATION_ID=GUID)
+    response = HttpResponse()
+
+    def fresh() -> 'HttpRequest':
+        request.__dict__.pop('_django_guid_ignored', None)
+        return request
+
+    results: Results = {}
+    for title, django_guid_settings in [
+        ('Default configuration', {}),
+        ('Default configuration with CeleryIntegration', {'INTEGRATIONS': [CeleryIntegration()]}),
+    ]:
+        with override_settings(DJANGO_GUID=django_guid_settings):
+            processors = get_request_processors()
+
+            def before() -> None:
+                before_incoming(fresh())
+                before_outgoing(response, request)
+
+            def after() -> None:
+                current = get_request_processors()
+                current.incoming(fresh())
+                current.outgoing(response, request)
+
+            results[title] = {'generic (before)': measure(before), 'specialised': measure(after)}
+            assert processors is get_request_processors()
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,64 @@
+"""
+Per-request latency added by the OpenTelemetryIntegration.
+
+Each request runs through the sync middleware inside an active, recording span, as OpenTelemetry's own
+instrumentation would start it. The integration's hooks are also measured on their own.
+"""
+
+from functools import partial
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from opentelemetry.sdk.trace import TracerProvider
+
+    from django_guid.integrations import OpenTelemetryIntegration
+    from django_guid.middleware import guid_middleware
+
+    tracer = TracerProvider().get_tracer(__name__)
+    factory = RequestFactory()
+    response = HttpResponse()
+
+    def view(request: object) -> HttpResponse:
+        return response
+
+    def call(middleware: object, request: object) -> None:
+        request.__dict__.pop('headers', None)  # type: ignore[attr-defined]
+        middleware(request)  # type: ignore[operator]
+
+    hooks_integration = OpenTelemetryIntegration()
+
+    def hooks() -> None:
+        hooks_integration.run(GUID)
+        hooks_integration.cleanup()
+
+    results: Results = {}
+    with tracer.start_as_current_span('GET /'):
+        results['OpenTelemetryIntegration hooks'] = {'run and cleanup': measure(hooks)}
+        timings = {}
+        for name, integrations in [
+            ('no integration', []),
+            ('span attribute and baggage', [OpenTelemetryIntegration()]),
+            ('span attribute only', [OpenTelemetryIntegration(baggage_key=None)]),
+            ('adopt trace-id', [OpenTelemetryIntegration(adopt_trace_id=True, baggage_key=None)]),
+        ]:
+            with override_settings(DJANGO_GUID={'INTEGRATIONS': integrations, 'LOG_EVENTS': []}):
+                middleware = guid_middleware(view)
+                request = factory.get('/', HTTP_CORRELATION_ID=GUID)
+                timings[name] = measure(partial(call, middleware, request), number=20_000)
+        results['Sync middleware with OpenTelemetryIntegration'] = timings
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,43 @@
+"""
+Per-request cost of tagging the Sentry scope with the correlation ID.
+
+The "before" case reproduces the previous implementation, which parsed the SDK version and entered
+`sentry_sdk.isolation_scope()` on every call.
+"""
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    import sentry_sdk
+    from packaging import version
+
+    from django_guid.integrations import SentryIntegration
+
+    def before() -> None:
+        if version.parse(sentry_sdk.VERSION) >= version.parse('2.12.0'):
+            with sentry_sdk.isolation_scope() as scope:
+                scope.set_tag('transaction_id', GUID)
+        else:  # pragma: no cover
+            with sentry_sdk.configure_scope() as scope:
+                scope.set_tag('transaction_id', GUID)
+
+    integration = SentryIntegration()
+    integration.setup()
+
+    return {
+        'SentryIntegration.run': {
+            'version check per call (before)': measure(before),
+            'resolved in setup': measure(lambda: integration.run(GUID)),
+        },
+    }
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,57 @@
+"""
+Per-request settings access cost, before and after the precomputed settings snapshot.
+
+The "properties" case reads every setting the middleware and utils touch for a single request
+through the `Settings` properties, which re-read `DJANGO_GUID` on each access.
+The "snapshot" case reads the same values from `Settings.snapshot`.
+"""
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django_guid.config import settings
+
+    def properties() -> None:
+        settings.ignore_urls  # process_incoming_request
+        settings.guid_header_name  # get_id_from_header
+        settings.guid_header_name  # get_correlation_id_from_header
+        settings.validate_guid
+        settings.integrations
+        settings.ignore_urls  # process_outgoing_request
+        settings.return_header
+        settings.guid_header_name
+        settings.expose_header
+        settings.guid_header_name
+        settings.integrations
+
+    def snapshot() -> None:
+        conf = settings.snapshot
+        conf.ignore_urls
+        conf.guid_header_name
+        conf.guid_header_name
+        conf.validate_guid
+        conf.integrations
+        conf.ignore_urls
+        conf.return_header
+        conf.guid_header_name
+        conf.expose_header
+        conf.guid_header_name
+        conf.integrations
+
+    return {
+        'Settings access per request': {
+            'properties (before)': measure(properties),
+            'snapshot': measure(snapshot),
+            'integration_settings (before)': measure(lambda: settings.integration_settings),
+            'integration_settings, snapshot': measure(lambda: settings.snapshot.integration_settings),
+        },
+    }
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
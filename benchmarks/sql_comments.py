@@ -0,0 +1,54 @@
+"""
+Per-query overhead of the SqlCommentIntegration, on an in-memory SQLite database.
+
+The comment is formatted once per request, so the per-query cost is the execute wrapper: a context variable lookup
+and a string concatenation. Queries outside of a request only pay for the lookup.
+"""
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.db import connection
+
+    from django_guid import set_guid
+    from django_guid.integrations import SqlCommentIntegration
+    from django_guid.integrations.sqlcommenter import prepend_comment
+
+    integration = SqlCommentIntegration()
+    set_guid(GUID)
+    cursor = connection.cursor()
+
+    def query() -> None:
+        cursor.execute('SELECT 1')
+
+    def query_with_params() -> None:
+        cursor.execute('SELECT %s', (1,))
+
+    results: Results = {}
+    for title, func in [('SELECT 1', query), ('SELECT %s with a parameter', query_with_params)]:
+        timings = {'no integration': measure(func)}
+        connection.execute_wrappers.insert(0, prepend_comment)
+        timings['outside of a request'] = measure(func)
+        integration.run(guid=GUID)
+        timings['tagged'] = measure(func)
+        integration.cleanup()
+        connection.execute_wrappers.remove(prepend_comment)
+        results[title] = timings
+
+    def request() -> None:
+        integration.run(guid=GUID)
+        integration.cleanup()
+
+    results['SqlCommentIntegration hooks'] = {'run and cleanup': measure(request)}
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,68 @@
+"""
+Per-chunk cost of running streaming responses' content in the request's context.
+
+Each run sends one request through the sync middleware, or straight to the view, and reads the whole response:
+a server-sent events stream with many small chunks, and a download from a generator of 64 KiB chunks.
+"""
+
+from functools import partial
+from typing import Any, Callable, Iterator
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+EVENTS = 10_000
+DOWNLOAD_CHUNKS = 1_000
+EVENT = b'data: {"progress": 42}\n\n'
+DOWNLOAD_CHUNK = b'x' * 65_536
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.http import StreamingHttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from django_guid.middleware import guid_middleware
+
+    def events() -> Iterator[bytes]:
+        for _ in range(EVENTS):
+            yield EVENT
+
+    def download() -> Iterator[bytes]:
+        for _ in range(DOWNLOAD_CHUNKS):
+            yield DOWNLOAD_CHUNK
+
+    def streaming_view(content: Callable[[], Iterator[bytes]]) -> Callable[[Any], StreamingHttpResponse]:
+        def view(request: Any) -> StreamingHttpResponse:
+            return StreamingHttpResponse(content())
+
+        return view
+
+    request = RequestFactory().get('/', HTTP_CORRELATION_ID=GUID)
+
+    def stream(handler: Callable[[Any], Any]) -> None:
+        request.__dict__.pop('headers', None)
+        response = handler(request)
+        for _ in response:
+            pass
+        response.close()
+
+    results: Results = {}
+    with override_settings(DJANGO_GUID={'INTEGRATIONS': [], 'LOG_EVENTS': []}):
+        for title, content, chunks in [
+            (f'Server-sent events, {EVENTS:,} chunks of {len(EVENT)} bytes, per chunk', events, EVENTS),
+            (f'Download, {DOWNLOAD_CHUNKS:,} chunks of 64 KiB, per chunk', download, DOWNLOAD_CHUNKS),
+        ]:
+            view = streaming_view(content)
+            results[title] = {
+                'without middleware': measure(partial(stream, view), number=20) / chunks,
+                'with middleware': measure(partial(stream, guid_middleware(view)), number=20) / chunks,
+            }
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
@@ -0,0 +1,73 @@
+"""
+Cost of W3C Trace Context support: parsing `traceparent` headers, and the middleware with TRACE_CONTEXT enabled.
+
+The parser reads each field at its fixed offset. A regular expression parser is measured next to it for comparison.
+"""
+
+import re
+from functools import partial
+from typing import Optional, Tuple
+
+from benchmarks.utils import Results, measure, report_all, setup_django
+
+TRACEPARENT = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+TRACEPARENT_PATTERN = re.compile(r'([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?')
+
+
+def parse_with_regex(value: str) -> Optional[Tuple[str, ...]]:
+    """
+    Parses a `traceparent` header with a regular expression, checking the same rules as the fixed-offset parser.
+    """
+    match = TRACEPARENT_PATTERN.fullmatch(value)
+    if match is None:
+        return None
+    version, trace_id, parent_id, flags, rest = match.groups()
+    if version == 'ff' or (version == '00' and rest) or trace_id == '0' * 32 or parent_id == '0' * 16:
+        return None
+    return version, trace_id, parent_id, flags
+
+
+def run() -> Results:
+    """
+    Runs the benchmark.
+    """
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+
+    from django_guid.middleware import guid_middleware
+    from django_guid.trace_context import parse_traceparent
+
+    results: Results = {
+        'traceparent parsing': {
+            'regex': measure(lambda: parse_with_regex(TRACEPARENT)),
+            'fixed offsets': measure(lambda: parse_traceparent(TRACEPARENT)),
+        }
+    }
+
+    factory = RequestFactory()
+    response = HttpResponse()
+
+    def view(request: object) -> HttpResponse:
+        return response
+
+    def call(middleware: object, request: object) -> None:
+        request.__dict__.pop('headers', None)  # type: ignore[attr-defined]
+        middleware(request)  # type: ignore[operator]
+
+    timings = {}
+    for name, trace_context, headers in [
+        ('TRACE_CONTEXT disabled', False, {'HTTP_CORRELATION_ID': '97c304252fd14b25b72d6aee31565843'}),
+        ('traceparent header', True, {'HTTP_TRACEPARENT': TRACEPARENT}),
+        ('GUID header, new trace', True, {'HTTP_CORRELATION_ID': '97c304252fd14b25b72d6aee31565843'}),
+    ]:
+        with override_settings(DJANGO_GUID={'TRACE_CONTEXT': trace_context, 'LOG_EVENTS': []}):
+            middleware = guid_middleware(view)
+            request = factory.get('/', **headers)
+            timings[name] = measure(partial(call, middleware, request), number=20_000)
+    results['Sync middleware with Trace Context'] = timings
+    return results
+
+
+if __name__ == '__main__':
+    setup_django()
+    report_all(run())
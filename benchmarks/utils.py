@@ -0,0 +1,46 @@
+import logging
+import os
+import timeit
+from typing import Callable, Dict
+
+# Per-call timings in nanoseconds, grouped by title
+Results = Dict[str, Dict[str, float]]
+
+
+def setup_django() -> None:
+    """
+    Configures Django using the demo project, so benchmarks run against the same settings as the test suite.
+
+    Logging is disabled, so the timings reflect django-guid's own work rather than the cost of writing log lines.
+    """
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'demoproj.settings')
+    django.setup()
+    logging.disable(logging.CRITICAL)
+
+
+def measure(func: Callable[[], object], number: int = 100_000, repeat: int = 5) -> float:
+    """
+    Returns the best per-call time of `func` in nanoseconds.
+    """
+    best = min(timeit.repeat(func, number=number, repeat=repeat))
+    return best / number * 1e9
+
+
+def report(title: str, results: Dict[str, float]) -> None:
+    """
+    Prints a small table of per-call timings.
+    """
+    print(title)  # noqa: T201
+    width = max(len(name) for name in results)
+    for name, ns in results.items():
+        print(f'  {name:<{width}}  {ns:10.1f} ns')  # noqa: T201
+
+
+def report_all(results: Results) -> None:
+    """
+    Prints a table per group of timings.
+    """
+    for title, timings in results.items():
+        report(title, timings)
@@ -1,9 +1,34 @@
 import logging
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import TYPE_CHECKING, Any, Callable, Optional, Tuple, TypeVar
 
 from django_guid.context import guid
 
+if TYPE_CHECKING:
+    from django_guid.config import Settings
+
 logger = logging.getLogger('django_guid')
 
+T = TypeVar('T')
+
+_settings: Optional['Settings'] = None  # The settings object, resolved by the first logged change to the GUID
+
+
+def log_context_changes() -> bool:
+    """
+    Returns True if changes to the GUID are logged: if the `django_guid` logger is enabled for INFO, and changes
+    to the GUID are selected in the LOG_EVENTS setting. The settings are only read when the logger is enabled.
+    """
+    global _settings
+    if not logger.isEnabledFor(logging.INFO):
+        return False
+    if _settings is None:
+        from django_guid.config import settings  # Imported on first use, as importing it reads the Django settings
+
+        _settings = settings
+    return 'context' in _settings.snapshot.log_events
+
 
 def get_guid() -> str:
     """
@@ -17,7 +42,7 @@ def set_guid(new_guid: str) -> str:
     Assigns a GUID to the current request
     """
     old_guid = guid.get()
-    if old_guid:
+    if old_guid and log_context_changes():
         logger.info('Changing the guid ContextVar from %s to %s', old_guid, new_guid)
     guid.set(new_guid)
     return new_guid
@@ -28,6 +53,62 @@ def clear_guid() -> None:
     Clears the GUID of the current request
     """
     old_guid = guid.get()
-    if old_guid:
+    if old_guid and log_context_changes():
         logger.info('Clearing %s from the guid ContextVar', old_guid)
     guid.set(None)
+
+
+class GuidThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    A ThreadPoolExecutor that runs each submitted function in a copy of the submitter's context.
+
+    Logs from the worker threads get the GUID, and the Celery IDs, of the request or task that submitted the work.
+    """
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> 'Future[T]':
+        """
+        Submits a function to run in a worker thread, in a copy of the current context.
+        """
+        return super().submit(copy_context().run, fn, *args, **kwargs)
+
+
+def propagated_vars() -> Tuple[ContextVar, ...]:
+    """
+    Returns the context variables passed on to process pool workers: the GUID and the Celery IDs.
+    """
+    from django_guid.integrations.celery.context import celery_current, celery_depth, celery_parent, celery_root
+
+    return guid, celery_parent, celery_current, celery_root, celery_depth
+
+
+def run_with_ids(ids: Tuple[Optional[Any], ...], fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Runs a function in a process pool worker with the IDs of the process that submitted it, then restores the
+    worker's own IDs, so they don't leak into the next function the worker runs.
+    """
+    tokens = [var.set(value) for var, value in zip(propagated_vars(), ids)]
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        for token in reversed(tokens):
+            token.var.reset(token)
+
+
+class GuidProcessPoolExecutor(ProcessPoolExecutor):
+    """
+    A ProcessPoolExecutor that passes the submitter's GUID and Celery IDs on to the worker processes.
+
+    Contexts can't be pickled, so the values of the ID context variables are sent along with each function,
+    as a small tuple, and set in the worker for the duration of the call.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.propagated_vars = propagated_vars()
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> 'Future[T]':
+        """
+        Submits a function to run in a worker process, with the current GUID and Celery IDs.
+        """
+        ids = tuple(var.get() for var in self.propagated_vars)
+        return super().submit(run_with_ids, ids, fn, *args, **kwargs)
@@ -0,0 +1,95 @@
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, MutableMapping, Optional
+
+from django_guid.config import settings
+from django_guid.context import guid
+from django_guid.trace_context import TRACEPARENT_HEADER, parse_traceparent
+from django_guid.utils import (
+    WRAPPER_GUID_KEY,
+    WRAPPER_TRACEPARENT_KEY,
+    adopted_guid,
+    guid_from_header_value,
+    guid_from_trace_parent,
+)
+
+if TYPE_CHECKING:
+    Scope = MutableMapping[str, Any]
+    Message = MutableMapping[str, Any]
+    Receive = Callable[[], Awaitable[Message]]
+    Send = Callable[[Message], Awaitable[None]]
+    ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+# Name of the `traceparent` header in the ASGI scope
+TRACEPARENT_NAME = TRACEPARENT_HEADER.encode('latin-1')
+
+
+def get_header_from_scope(scope: 'Scope', header_name: bytes) -> Optional[str]:
+    """
+    Returns the value of a header from the raw ASGI scope, without building a header mapping.
+
+    :param scope: ASGI connection scope
+    :param header_name: Lowercase header name, as bytes
+    :return: Header value, or None if the header is missing
+    """
+    for name, value in scope['headers']:
+        if name == header_name:
+            return value.decode('latin-1')
+    return None
+
+
+def guid_asgi_middleware(app: 'ASGIApp') -> 'ASGIApp':
+    """
+    Wraps an ASGI application, assigning the GUID before Django's handler runs.
+
+    The correlation header is read from the raw ASGI scope, so logs emitted by Django before the middleware chain runs,
+    like `django.request` logs, get the GUID too. The GUID is added to the response in the `http.response.start`
+    message. Can be used with or without `guid_middleware`; the middleware reuses the GUID assigned here.
+    With TRACE_CONTEXT enabled, the trace-id of a valid `traceparent` header is used as the GUID, and the parsed
+    header is kept in the scope, for the middleware to continue the trace.
+
+    Usage, in asgi.py:
+
+        application = guid_asgi_middleware(get_asgi_application())
+    """
+
+    async def guid_app(scope: 'Scope', receive: 'Receive', send: 'Send') -> None:
+        if scope['type'] != 'http':
+            return await app(scope, receive, send)
+
+        conf = settings.snapshot
+        path = scope['path']
+        root_path = scope.get('root_path', '')
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        if conf.ignore_url_matcher(path):
+            return await app(scope, receive, send)
+
+        trace_parent = parse_traceparent(get_header_from_scope(scope, TRACEPARENT_NAME)) if conf.trace_context else None
+        if trace_parent is not None:
+            correlation_id = guid_from_trace_parent(trace_parent)
+            scope[WRAPPER_TRACEPARENT_KEY] = trace_parent
+        else:
+            correlation_id = guid_from_header_value(get_header_from_scope(scope, conf.asgi_header_name))
+        if conf.guid_adopters:
+            correlation_id = adopted_guid(correlation_id)
+        scope[WRAPPER_GUID_KEY] = correlation_id
+        token = guid.set(correlation_id)
+        try:
+            if not conf.return_header:
+                return await app(scope, receive, send)
+
+            header_name = conf.guid_header_name.encode('latin-1')
+            response_headers = [(header_name, correlation_id.encode('latin-1'))]
+            if conf.expose_header:
+                exposed = header_name + b', ' + TRACEPARENT_NAME if conf.trace_context else header_name
+                response_headers.append((b'Access-Control-Expose-Headers', exposed))
+
+            async def send_with_guid(message: 'Message') -> None:
+                if message['type'] == 'http.response.start':
+                    message['headers'] = [*message.get('headers', ()), *response_headers]
+                await send(message)
+
+            await app(scope, receive, send_with_guid)
+        finally:
+            guid.reset(token)
+
+    return guid_app
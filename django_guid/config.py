@@ -1,33 +1,168 @@
 # flake8: noqa: D102
+import asyncio
+import logging
+import re
 from collections import defaultdict
-from typing import Dict, List, Union
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 from django.conf import settings as django_settings
 from django.core.exceptions import ImproperlyConfigured
 from django.utils.inspect import func_accepts_kwargs
 
+from django_guid.integrations.base import is_overridden
 from django_guid.integrations.celery.config import CeleryIntegrationSettings
+from django_guid.log_events import LOG_EVENTS, RateLimitedWarnings
+from django_guid.matching import IgnoreURLMatcher
+from django_guid.metrics import Metrics, resolve_metrics
+from django_guid.validation import GUIDValidator
+
+# The supported UUID_FORMAT values, and the full length of the IDs they generate
+UUID_FORMAT_LENGTHS = {'hex': 32, 'string': 36, 'uuidv7': 36, 'ulid': 26}
+
+# Formats starting with a timestamp, which can't be shortened, as only the timestamp would be kept
+TIME_ORDERED_FORMATS = frozenset({'uuidv7', 'ulid'})
 
 
 class IntegrationSettings:
-    def __init__(self, integration_settings: dict) -> None:
+    def __init__(self, integration_settings: dict, uuid_format: str = 'hex') -> None:
         self.settings = integration_settings
+        self.uuid_format = uuid_format
+        self._celery: Optional[CeleryIntegrationSettings] = None
 
     @property
     def celery(self) -> CeleryIntegrationSettings:
-        return CeleryIntegrationSettings(self.settings['CeleryIntegration'])
+        # Built and validated once, rather than on every access from the Celery signals
+        celery = self._celery
+        if celery is None:
+            celery = self._celery = CeleryIntegrationSettings(self.settings['CeleryIntegration'], self.uuid_format)
+        return celery
 
     def validate(self) -> None:
         if 'CeleryIntegration' in self.settings:
             self.celery.validate()
 
 
+class SettingsSnapshot:
+    """
+    Immutable, precomputed view of the DJANGO_GUID settings.
+
+    The properties on `Settings` read the raw settings dict on every access, which is fine for validation,
+    but too slow for the request path. The snapshot resolves every value once, so the middleware, utils
+    and the Celery signals only pay for a slot lookup.
+    """
+
+    __slots__ = (
+        'guid_header_name',
+        'asgi_header_name',
+        'wsgi_header_key',
+        'return_header',
+        'expose_header',
+        'ignore_urls',
+        'ignore_url_matcher',
+        'validate_guid',
+        'guid_validator',
+        'integrations',
+        'guid_adopters',
+        'integration_settings',
+        'integration_timeout',
+        'uuid_length',
+        'uuid_format',
+        'log_events',
+        'invalid_header_warnings',
+        'metrics',
+        'trace_context',
+    )
+
+    guid_header_name: str
+    asgi_header_name: bytes
+    wsgi_header_key: str
+    return_header: bool
+    expose_header: bool
+    ignore_urls: FrozenSet[str]
+    ignore_url_matcher: IgnoreURLMatcher
+    validate_guid: bool
+    guid_validator: GUIDValidator
+    integrations: Tuple[Any, ...]
+    guid_adopters: Tuple[Callable[[str], Optional[str]], ...]
+    integration_settings: IntegrationSettings
+    integration_timeout: Optional[float]
+    uuid_length: int
+    uuid_format: str
+    log_events: FrozenSet[str]
+    invalid_header_warnings: RateLimitedWarnings
+    metrics: Optional[Metrics]
+    trace_context: bool
+
+    def __init__(self, settings: 'Settings') -> None:
+        values = {
+            'guid_header_name': settings.guid_header_name,
+            'asgi_header_name': settings.guid_header_name.lower().encode('latin-1'),
+            'wsgi_header_key': 'HTTP_' + settings.guid_header_name.upper().replace('-', '_'),
+            'return_header': settings.return_header,
+            'expose_header': settings.expose_header,
+            'ignore_urls': frozenset(settings.ignore_urls),
+            'ignore_url_matcher': IgnoreURLMatcher(settings.ignore_urls),
+            'validate_guid': settings.validate_guid,
+            'guid_validator': GUIDValidator(
+                accept_ulid=settings.uuid_format == 'ulid', cache_size=settings.validate_guid_cache_size
+            ),
+            'integrations': tuple(settings.integrations),
+            'guid_adopters': tuple(
+                integration.adopt_guid
+                for integration in settings.integrations
+                if integration.runs_in_middleware and is_overridden(integration, 'adopt_guid')
+            ),
+            'integration_settings': settings.integration_settings,
+            'integration_timeout': settings.integration_timeout,
+            'uuid_length': settings.uuid_length,
+            'uuid_format': settings.uuid_format,
+            'log_events': frozenset(settings.log_events),
+            'invalid_header_warnings': RateLimitedWarnings(
+                logging.getLogger('django_guid'), settings.guid_header_name, settings.invalid_header_log_interval
+            ),
+            'metrics': resolve_metrics(settings.metrics),
+            'trace_context': settings.trace_context,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError('SettingsSnapshot is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError('SettingsSnapshot is immutable')
+
+
 class Settings:
     def __init__(self) -> None:
+        self.settings = self._read_settings()
+        self._snapshot: Optional[SettingsSnapshot] = None
+
+    @staticmethod
+    def _read_settings() -> dict:
         if hasattr(django_settings, 'DJANGO_GUID'):
-            self.settings = django_settings.DJANGO_GUID
-        else:
-            self.settings = {}
+            return django_settings.DJANGO_GUID
+        return {}
+
+    @property
+    def snapshot(self) -> SettingsSnapshot:
+        """
+        Returns the precomputed settings, building them from the current settings dict if needed.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = SettingsSnapshot(self)
+        return snapshot
+
+    def reload(self) -> None:
+        """
+        Re-reads the DJANGO_GUID setting and discards the current snapshot.
+
+        Readers either see the old snapshot or a complete new one, as the swap is a single assignment.
+        The new snapshot is built on first access, so invalid settings surface where they are used.
+        """
+        self.settings = self._read_settings()
+        self._snapshot = None
 
     @property
     def guid_header_name(self) -> str:
@@ -43,32 +178,61 @@ class Settings:
 
     @property
     def ignore_urls(self) -> List[str]:
-        return list({url.strip('/') for url in self.settings.get('IGNORE_URLS', [])})
+        # Regular expressions keep their slashes, which are part of the pattern
+        return list({url if url.startswith('^') else url.strip('/') for url in self.settings.get('IGNORE_URLS', [])})
 
     @property
     def validate_guid(self) -> bool:
         return self.settings.get('VALIDATE_GUID', True)
 
+    @property
+    def validate_guid_cache_size(self) -> int:
+        return self.settings.get('VALIDATE_GUID_CACHE_SIZE', 0)
+
     @property
     def integrations(self) -> Union[list, tuple]:
         return self.settings.get('INTEGRATIONS', [])
 
     @property
     def integration_settings(self) -> IntegrationSettings:
-        return IntegrationSettings({integration.identifier: integration for integration in self.integrations})
+        return IntegrationSettings(
+            {integration.identifier: integration for integration in self.integrations}, self.uuid_format
+        )
+
+    @property
+    def integration_timeout(self) -> Optional[float]:
+        return self.settings.get('INTEGRATION_TIMEOUT', None)
 
     @property
     def uuid_length(self) -> int:
-        default_length: Dict[str, int] = defaultdict(lambda: 32, string=36)
+        default_length: Dict[str, int] = defaultdict(lambda: 32, UUID_FORMAT_LENGTHS)
         return self.settings.get('UUID_LENGTH', default_length[self.uuid_format])
 
     @property
     def uuid_format(self) -> str:
         return self.settings.get('UUID_FORMAT', 'hex')
 
+    @property
+    def log_events(self) -> Iterable[str]:
+        return self.settings.get('LOG_EVENTS', LOG_EVENTS)
+
+    @property
+    def invalid_header_log_interval(self) -> float:
+        return self.settings.get('INVALID_HEADER_LOG_INTERVAL', 0)
+
+    @property
+    def metrics(self) -> Any:
+        return self.settings.get('METRICS', None)
+
+    @property
+    def trace_context(self) -> bool:
+        return self.settings.get('TRACE_CONTEXT', False)
+
     def validate(self) -> None:
         if not isinstance(self.validate_guid, bool):
             raise ImproperlyConfigured('VALIDATE_GUID must be a boolean')
+        if type(self.validate_guid_cache_size) is not int or self.validate_guid_cache_size < 0:
+            raise ImproperlyConfigured('VALIDATE_GUID_CACHE_SIZE must be a non-negative integer')
         if not isinstance(self.guid_header_name, str):
             raise ImproperlyConfigured('GUID_HEADER_NAME must be a string')  # Note: Case insensitive
         if not isinstance(self.return_header, bool):
@@ -77,19 +241,45 @@ class Settings:
             raise ImproperlyConfigured('EXPOSE_HEADER must be a boolean')
         if not isinstance(self.integrations, (list, tuple)):
             raise ImproperlyConfigured('INTEGRATIONS must be an array')
+        if self.integration_timeout is not None and (
+            type(self.integration_timeout) not in (int, float) or self.integration_timeout <= 0
+        ):
+            raise ImproperlyConfigured('INTEGRATION_TIMEOUT must be a positive number of seconds, or None')
         if not isinstance(self.settings.get('IGNORE_URLS', []), (list, tuple)):
             raise ImproperlyConfigured('IGNORE_URLS must be an array')
         if not all(isinstance(url, str) for url in self.settings.get('IGNORE_URLS', [])):
             raise ImproperlyConfigured('IGNORE_URLS must be an array of strings')
+        try:
+            IgnoreURLMatcher(self.ignore_urls)
+        except re.error as e:
+            raise ImproperlyConfigured(f'IGNORE_URLS contains an invalid regular expression: {e}')
         if type(self.uuid_length) is not int or self.uuid_length < 1:
             raise ImproperlyConfigured('UUID_LENGTH must be an integer and positive')
-        if self.uuid_format == 'string' and not 1 <= self.uuid_length <= 36:
-            raise ImproperlyConfigured('UUID_LENGTH must be between 1-36 when UUID_FORMAT is string')
-        if self.uuid_format == 'hex' and not 1 <= self.uuid_length <= 32:
-            raise ImproperlyConfigured('UUID_LENGTH must be between 1-32 when UUID_FORMAT is hex')
-        if self.uuid_format not in ('hex', 'string'):
-            raise ImproperlyConfigured('UUID_FORMAT must be either hex or string')
+        if self.uuid_format not in UUID_FORMAT_LENGTHS:
+            raise ImproperlyConfigured('UUID_FORMAT must be one of hex, string, uuidv7 or ulid')
+        if self.uuid_format in TIME_ORDERED_FORMATS and self.uuid_length != UUID_FORMAT_LENGTHS[self.uuid_format]:
+            raise ImproperlyConfigured(
+                f'UUID_LENGTH must be {UUID_FORMAT_LENGTHS[self.uuid_format]} when UUID_FORMAT is {self.uuid_format}, '
+                'as shortened time-ordered IDs only keep their timestamp'
+            )
+        if not 1 <= self.uuid_length <= UUID_FORMAT_LENGTHS[self.uuid_format]:
+            raise ImproperlyConfigured(
+                f'UUID_LENGTH must be between 1-{UUID_FORMAT_LENGTHS[self.uuid_format]} '
+                f'when UUID_FORMAT is {self.uuid_format}'
+            )
 
+        if not isinstance(self.log_events, (list, tuple, set, frozenset)):
+            raise ImproperlyConfigured('LOG_EVENTS must be an array')
+        if not LOG_EVENTS.issuperset(self.log_events):
+            raise ImproperlyConfigured(f'LOG_EVENTS can only contain {", ".join(sorted(LOG_EVENTS))}')
+        if type(self.invalid_header_log_interval) not in (int, float) or self.invalid_header_log_interval < 0:
+            raise ImproperlyConfigured('INVALID_HEADER_LOG_INTERVAL must be a non-negative number of seconds')
+        resolve_metrics(self.metrics)
+        if not isinstance(self.trace_context, bool):
+            raise ImproperlyConfigured('TRACE_CONTEXT must be a boolean')
+
+        # The snapshot is built before the integrations are set up, so their `setup` can bind to it
+        self._snapshot = SettingsSnapshot(self)
         self._validate_and_setup_integrations()
 
     def _validate_and_setup_integrations(self) -> None:
@@ -103,6 +293,8 @@ class Settings:
                 (integration.setup, 'setup'),
                 (integration.run, 'run'),
                 (integration.cleanup, 'cleanup'),
+                (integration.arun, 'arun'),
+                (integration.acleanup, 'acleanup'),
             ]:
                 # Make sure the methods are callable
                 if not callable(method):
@@ -110,8 +302,15 @@ class Settings:
                         f'Integration method `{name}` needs to be made callable for `{integration.identifier}`'
                     )
 
+                # Make sure the async hooks can be awaited
+                if name in ['arun', 'acleanup'] and not asyncio.iscoroutinefunction(method):
+                    raise ImproperlyConfigured(
+                        f'Integration method `{name}` must be a coroutine function (async def) '
+                        f'for `{integration.identifier}`'
+                    )
+
                 # Make sure the method takes kwargs
-                if name in ['run', 'cleanup'] and not func_accepts_kwargs(method):
+                if name in ['run', 'cleanup', 'arun', 'acleanup'] and not func_accepts_kwargs(method):
                     raise ImproperlyConfigured(
                         f'Integration method `{name}` must '
                         f'accept keyword arguments (**kwargs) for `{integration.identifier}`'
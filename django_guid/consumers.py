@@ -0,0 +1,56 @@
+import logging
+from typing import TYPE_CHECKING, Any
+
+from django_guid.asgi import get_header_from_scope
+from django_guid.config import settings
+from django_guid.context import connection_guid, guid
+from django_guid.utils import WRAPPER_GUID_KEY, generate_guid, guid_from_header_value
+
+if TYPE_CHECKING:
+    from django_guid.asgi import Message, Receive, Scope, Send
+
+logger = logging.getLogger('django_guid')
+
+
+class GuidConsumerMixin:
+    """
+    Gives each message a Django Channels consumer receives its own GUID, linked to the GUID of the connection.
+
+    A websocket connection can stay open for hours, so one GUID for the whole connection would tie together the logs
+    of unrelated messages. The connection gets a GUID from the handshake's header, or a generated one, which is kept
+    in the `connection_guid` context variable. Each message, from the client or the channel layer, is handled with a
+    fresh GUID, which is reset to the connection's GUID when the handler returns.
+
+    Works with both async and sync consumers. Put the mixin before the consumer class:
+
+        class ChatConsumer(GuidConsumerMixin, AsyncWebsocketConsumer):
+            ...
+    """
+
+    async def __call__(self, scope: 'Scope', receive: 'Receive', send: 'Send') -> None:
+        """
+        Sets the GUID of the connection for the lifetime of the consumer.
+        """
+        correlation_id = scope.get(WRAPPER_GUID_KEY) or guid_from_header_value(
+            get_header_from_scope(scope, settings.snapshot.asgi_header_name)
+        )
+        connection_token = connection_guid.set(correlation_id)
+        guid_token = guid.set(correlation_id)
+        try:
+            await super().__call__(scope, receive, send)  # type: ignore[misc]
+        finally:
+            guid.reset(guid_token)
+            connection_guid.reset(connection_token)
+
+    async def dispatch(self, message: 'Message') -> Any:
+        """
+        Handles a message with a fresh GUID.
+        """
+        message_guid = generate_guid()
+        if 'context' in settings.snapshot.log_events:
+            logger.debug('Handling %s message with GUID %s', message['type'], message_guid)
+        token = guid.set(message_guid)
+        try:
+            return await super().dispatch(message)  # type: ignore[misc]
+        finally:
+            guid.reset(token)
@@ -1,3 +1,10 @@
 from contextvars import ContextVar
 
 guid: ContextVar = ContextVar('guid', default=None)
+
+# The W3C Trace Context of the current request or task, when the TRACE_CONTEXT setting is enabled
+trace_parent: ContextVar = ContextVar('trace_parent', default=None)
+trace_state: ContextVar = ContextVar('trace_state', default=None)
+
+# The GUID of the long-lived connection, e.g. a websocket, that the current message was received on
+connection_guid: ContextVar = ContextVar('connection_guid', default=None)
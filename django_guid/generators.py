@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from typing import List
+
+UUID_HEX_LENGTH = 32
+
+# Number of UUIDs generated per read from the operating system's entropy source
+BLOCK_SIZE = 1024
+
+# Byte translation tables setting the version (4) and variant (RFC 4122) bits of a UUID
+_VERSION_4_TABLE = bytes((byte & 0x0F) | 0x40 for byte in range(256))
+_VARIANT_TABLE = bytes((byte & 0x3F) | 0x80 for byte in range(256))
+
+# ULIDs are encoded with Crockford's base32 alphabet, two characters (10 bits) at a time
+CROCKFORD_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_CROCKFORD_PAIRS = [first + second for first in CROCKFORD_ALPHABET for second in CROCKFORD_ALPHABET]
+_ULID_SHIFTS = tuple(range(120, -1, -10))
+
+# UUIDv7 layout: 48 bit timestamp, 4 bit version, 12 bit rand_a, 2 bit variant, 62 bit rand_b
+_UUID7_RANDOM_BITS = 74
+_UUID7_RAND_B_BITS = 62
+_UUID7_RAND_B_MASK = (1 << _UUID7_RAND_B_BITS) - 1
+_UUID7_VERSION_AND_VARIANT = (0x7 << 76) | (0x2 << 62)
+
+# ULID layout: 48 bit timestamp, 80 bit randomness
+_ULID_RANDOM_BITS = 80
+
+
+def uuid4_hex_block(count: int) -> str:
+    """
+    Returns `count` random UUIDv4s as one concatenated hex string, using a single read from `os.urandom`.
+    """
+    data = bytearray(os.urandom(count * 16))
+    data[6::16] = data[6::16].translate(_VERSION_4_TABLE)
+    data[8::16] = data[8::16].translate(_VARIANT_TABLE)
+    return data.hex()
+
+
+class UUID4Pool:
+    """
+    Hands out UUIDv4 hex strings from a buffer, refilled with one `os.urandom` call per block.
+
+    Safe to share between threads. The buffer must be discarded in forked children, otherwise
+    every child would hand out the same IDs, which is why the module level pool is reset with `os.register_at_fork`.
+    """
+
+    def __init__(self, block_size: int = BLOCK_SIZE) -> None:
+        self.block_size = block_size
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Discards the buffered IDs. A new lock is created, as a forked child may inherit a lock held by another thread.
+        """
+        self._lock = threading.Lock()
+        self._buffer = ''
+        self._offset = 0
+
+    def uuid4_hex(self) -> str:
+        """
+        Returns a random UUIDv4 as a 32 character hex string.
+        """
+        with self._lock:
+            offset = self._offset
+            if offset >= len(self._buffer):
+                self._buffer = uuid4_hex_block(self.block_size)
+                offset = 0
+            end = self._offset = offset + UUID_HEX_LENGTH
+            return self._buffer[offset:end]
+
+    def uuid4_hexes(self, count: int) -> List[str]:
+        """
+        Returns `count` random UUIDv4s as 32 character hex strings, bypassing the buffer.
+        """
+        block = uuid4_hex_block(count)
+        return [block[i : i + UUID_HEX_LENGTH] for i in range(0, count * UUID_HEX_LENGTH, UUID_HEX_LENGTH)]
+
+
+class TimeOrderedGenerator:
+    """
+    Generates integers made of a millisecond timestamp followed by `random_bits` random bits.
+
+    Values are strictly increasing within a process: the first value in a millisecond gets fresh randomness,
+    and following values in the same millisecond increment the previous one. This keeps IDs sortable by creation time,
+    which keeps B-tree inserts close together. Randomness is read from the operating system in blocks.
+    """
+
+    def __init__(self, random_bits: int, block_size: int = BLOCK_SIZE) -> None:
+        self.random_bits = random_bits
+        self.block_size = block_size
+        self._random_bytes = (random_bits + 7) // 8
+        self._random_mask = (1 << random_bits) - 1
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Discards the buffered randomness and the last value, so forked children don't repeat the parent's IDs.
+        """
+        self._lock = threading.Lock()
+        self._entropy = b''
+        self._offset = 0
+        self._last = 0
+
+    def next_value(self) -> int:
+        """
+        Returns the next value, which is always greater than the previous one.
+        """
+        timestamp = time.time_ns() // 1_000_000
+        with self._lock:
+            last = self._last
+            if timestamp > last >> self.random_bits:
+                offset = self._offset
+                end = offset + self._random_bytes
+                if end > len(self._entropy):
+                    self._entropy = os.urandom(self._random_bytes * self.block_size)
+                    offset, end = 0, self._random_bytes
+                self._offset = end
+                random = int.from_bytes(self._entropy[offset:end], 'big') & self._random_mask
+                value = (timestamp << self.random_bits) | random
+            else:
+                value = last + 1
+            self._last = value
+            return value
+
+
+pool = UUID4Pool()
+uuid7_generator = TimeOrderedGenerator(random_bits=_UUID7_RANDOM_BITS)
+ulid_generator = TimeOrderedGenerator(random_bits=_ULID_RANDOM_BITS)
+
+if hasattr(os, 'register_at_fork'):  # pragma: no branch
+    os.register_at_fork(after_in_child=pool.reset)
+    os.register_at_fork(after_in_child=uuid7_generator.reset)
+    os.register_at_fork(after_in_child=ulid_generator.reset)
+
+
+def uuid7_hex() -> str:
+    """
+    Returns a time-ordered UUIDv7 as a 32 character hex string.
+    """
+    value = uuid7_generator.next_value()
+    timestamp = value >> _UUID7_RANDOM_BITS
+    rand_a = (value >> _UUID7_RAND_B_BITS) & 0xFFF
+    uuid_int = (timestamp << 80) | (rand_a << 64) | (value & _UUID7_RAND_B_MASK) | _UUID7_VERSION_AND_VARIANT
+    return f'{uuid_int:032x}'
+
+
+def ulid() -> str:
+    """
+    Returns a time-ordered ULID as a 26 character Crockford base32 string.
+    """
+    # A ULID is 128 bits encoded as 26 base32 characters (130 bits), so the first character holds two zero bits
+    value = ulid_generator.next_value()
+    return ''.join([_CROCKFORD_PAIRS[(value >> shift) & 0x3FF] for shift in _ULID_SHIFTS])
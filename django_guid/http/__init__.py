@@ -0,0 +1,14 @@
+from typing import Optional, Tuple
+
+from django_guid.api import get_guid
+from django_guid.config import settings
+
+
+def outgoing_header() -> Optional[Tuple[str, str]]:
+    """
+    Returns the header name and GUID to add to an outgoing request, or None if there is no GUID to pass on.
+    """
+    guid = get_guid()
+    if not guid:
+        return None
+    return settings.snapshot.guid_header_name, guid
@@ -0,0 +1,104 @@
+from typing import TYPE_CHECKING, Any, Optional, Type
+
+import httpx
+
+from django_guid.http import outgoing_header
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+
+def add_guid_header(request: httpx.Request) -> None:
+    """
+    Adds the GUID header to a request, unless the caller has set it.
+    """
+    header = outgoing_header()
+    if header is not None:
+        name, guid = header
+        if name not in request.headers:
+            request.headers[name] = guid
+
+
+class GuidTransport(httpx.BaseTransport):
+    """
+    An `httpx` transport that adds the GUID of the current request or task to every request, before handing it
+    to the wrapped transport. The wrapped transport keeps its connection pool.
+
+    :param transport: The transport to wrap. Defaults to an `httpx.HTTPTransport` built with the other arguments
+    """
+
+    def __init__(self, transport: Optional[httpx.BaseTransport] = None, **kwargs: Any) -> None:
+        self.transport = transport if transport is not None else httpx.HTTPTransport(**kwargs)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Adds the GUID header to a request and sends it with the wrapped transport.
+        """
+        add_guid_header(request)
+        return self.transport.handle_request(request)
+
+    def __enter__(self) -> 'GuidTransport':
+        """
+        Opens the wrapped transport.
+        """
+        self.transport.__enter__()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional['TracebackType'] = None,
+    ) -> None:
+        """
+        Closes the wrapped transport.
+        """
+        self.transport.__exit__(exc_type, exc_value, traceback)
+
+    def close(self) -> None:
+        """
+        Closes the wrapped transport.
+        """
+        self.transport.close()
+
+
+class AsyncGuidTransport(httpx.AsyncBaseTransport):
+    """
+    The async version of `GuidTransport`, for `httpx.AsyncClient`.
+
+    :param transport: The transport to wrap. Defaults to an `httpx.AsyncHTTPTransport` built with the other arguments
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, **kwargs: Any) -> None:
+        self.transport = transport if transport is not None else httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """
+        Adds the GUID header to a request and sends it with the wrapped transport.
+        """
+        add_guid_header(request)
+        return await self.transport.handle_async_request(request)
+
+    async def __aenter__(self) -> 'AsyncGuidTransport':
+        """
+        Opens the wrapped transport.
+        """
+        await self.transport.__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional['TracebackType'] = None,
+    ) -> None:
+        """
+        Closes the wrapped transport.
+        """
+        await self.transport.__aexit__(exc_type, exc_value, traceback)
+
+    async def aclose(self) -> None:
+        """
+        Closes the wrapped transport.
+        """
+        await self.transport.aclose()
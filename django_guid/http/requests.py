@@ -0,0 +1,41 @@
+from typing import TYPE_CHECKING, Any
+
+from requests.adapters import HTTPAdapter
+
+from django_guid.http import outgoing_header
+
+if TYPE_CHECKING:
+    from requests import PreparedRequest, Session
+
+
+class GuidHTTPAdapter(HTTPAdapter):
+    """
+    A `requests` transport adapter that adds the GUID of the current request or task to every request it sends.
+
+    The header is set on the prepared request just before it is sent, so the session's connection pools are reused
+    and no header dicts are copied. A GUID header set by the caller is left as is.
+    """
+
+    def add_headers(self, request: 'PreparedRequest', **kwargs: Any) -> None:
+        """
+        Adds the GUID header to a prepared request.
+        """
+        header = outgoing_header()
+        if header is not None:
+            name, guid = header
+            if name not in request.headers:
+                request.headers[name] = guid
+
+
+def mount_guid_adapter(session: 'Session', **kwargs: Any) -> 'Session':
+    """
+    Mounts a `GuidHTTPAdapter` on a session, for both HTTP and HTTPS URLs.
+
+    :param session: The session to propagate the GUID from
+    :param kwargs: Arguments for the adapter, e.g. `pool_maxsize` or `max_retries`
+    :return: The session
+    """
+    adapter = GuidHTTPAdapter(**kwargs)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,86 @@
+from typing import Any, Mapping, Optional, Tuple
+
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+from django_guid.http import outgoing_header
+
+
+def has_header(headers: Mapping[str, Any], name: str) -> bool:
+    """
+    Returns True if a header is in a mapping of headers, ignoring case.
+    """
+    lowered = name.lower()
+    return any(key.lower() == lowered for key in headers)
+
+
+class GuidConnectionMixin(HTTPConnection):
+    """
+    Writes the GUID header to the connection after the request's own headers, so the caller's header mapping
+    isn't copied or changed. A GUID header set by the caller is left as is.
+
+    Subclasses `HTTPConnection` so the overrides are type checked against it. The HTTPS connection puts the mixin
+    before `HTTPSConnection`, which subclasses `HTTPConnection` too.
+    """
+
+    guid_header: Optional[Tuple[str, str]] = None
+
+    def request(
+        self, method: str, url: str, body: Any = None, headers: Optional[Mapping[str, Any]] = None, **kwargs: Any
+    ) -> None:
+        """
+        Sends the request line and headers, adding the GUID header unless the caller has set it.
+        """
+        header = outgoing_header()
+        if header is not None and headers and has_header(headers, header[0]):
+            header = None
+        self.guid_header = header
+        super().request(method, url, body, headers, **kwargs)
+
+    def endheaders(self, message_body: Any = None, *, encode_chunked: bool = False) -> None:
+        """
+        Writes the GUID header, then ends the headers.
+
+        The header is cleared once written, so requests sent without `request`, like urllib3 1.x's
+        `request_chunked`, don't repeat the GUID of an earlier request on the same connection.
+        """
+        header, self.guid_header = self.guid_header, None
+        if header is not None:
+            self.putheader(*header)
+        super().endheaders(message_body, encode_chunked=encode_chunked)
+
+
+class GuidHTTPConnection(GuidConnectionMixin):
+    pass
+
+
+class GuidHTTPSConnection(GuidConnectionMixin, HTTPSConnection):
+    pass
+
+
+class GuidHTTPConnectionPool(HTTPConnectionPool):
+    """
+    An HTTP connection pool that adds the GUID of the current request or task to every request it sends.
+    """
+
+    ConnectionCls = GuidHTTPConnection
+
+
+class GuidHTTPSConnectionPool(HTTPSConnectionPool):
+    """
+    An HTTPS connection pool that adds the GUID of the current request or task to every request it sends.
+    """
+
+    ConnectionCls = GuidHTTPSConnection
+
+
+class GuidPoolManager(PoolManager):
+    """
+    A urllib3 PoolManager that adds the GUID of the current request or task to every request it sends.
+
+    Accepts the same arguments as `PoolManager`, and keeps connections pooled per host the same way.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.pool_classes_by_scheme = {'http': GuidHTTPConnectionPool, 'https': GuidHTTPSConnectionPool}
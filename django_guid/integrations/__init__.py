@@ -1,5 +1,7 @@
 from django_guid.integrations.base import Integration
 from django_guid.integrations.celery import CeleryIntegration
+from django_guid.integrations.opentelemetry import OpenTelemetryIntegration
 from django_guid.integrations.sentry import SentryIntegration
+from django_guid.integrations.sqlcommenter import SqlCommentIntegration
 
-__all__ = ['Integration', 'CeleryIntegration', 'SentryIntegration']
+__all__ = ['Integration', 'CeleryIntegration', 'OpenTelemetryIntegration', 'SentryIntegration', 'SqlCommentIntegration']
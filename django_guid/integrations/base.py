@@ -2,6 +2,8 @@ from typing import Any, Optional
 
 from django.core.exceptions import ImproperlyConfigured
 
+from asgiref.sync import sync_to_async
+
 
 class Integration:
     """
@@ -9,6 +11,8 @@ class Integration:
     """
 
     identifier: Optional[str] = None  # The name of your integration
+    runs_in_middleware: bool = True  # Set to False if the integration only needs `setup`
+    runs_inline: bool = False  # Set to True if `run` and `cleanup` are quick, to call them on the event loop
 
     def __init__(self) -> None:
         if self.identifier is None:
@@ -31,3 +35,39 @@ class Integration:
         Code here is executed in the middleware, after the view is called.
         """
         pass
+
+    def adopt_guid(self, guid: str) -> Optional[str]:
+        """
+        Code here is executed when a request's GUID is resolved from its headers, before it is set, passed to `run`
+        and added to the response. Only called if overridden.
+
+        Returns an ID to use as the GUID instead, e.g. one from a tracing system, or None to keep the GUID.
+        """
+        return None
+
+    async def arun(self, guid: str, **kwargs: Any) -> None:
+        """
+        Code here is executed in the async middleware, before the view is called, in a task of its own.
+
+        Only awaited if overridden, as the async middleware calls `run` in a worker thread otherwise, keeping the
+        changes it makes to context variables. Calls `run` in a worker thread, for use with `await super().arun(...)`.
+        """
+        await sync_to_async(self.run, thread_sensitive=False)(guid=guid, **kwargs)
+
+    async def acleanup(self, **kwargs: Any) -> None:
+        """
+        Code here is executed in the async middleware, after the view is called, in a task of its own.
+
+        Only awaited if overridden, as the async middleware calls `cleanup` in a worker thread otherwise, keeping
+        the changes it makes to context variables. Calls `cleanup` in a worker thread, for use with
+        `await super().acleanup()`.
+        """
+        await sync_to_async(self.cleanup, thread_sensitive=False)(**kwargs)
+
+
+def is_overridden(integration: Integration, method: str) -> bool:
+    """
+    Checks if an integration overrides a method of the Integration base class.
+    """
+    implementation = getattr(integration, method)
+    return getattr(implementation, '__func__', implementation) is not getattr(Integration, method)
@@ -1,5 +1,5 @@
 # flake8: noqa: D102
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from django.core.exceptions import ImproperlyConfigured
 
@@ -10,8 +10,9 @@ if TYPE_CHECKING:
 
 
 class CeleryIntegrationSettings:
-    def __init__(self, instance: 'CeleryIntegration') -> None:
+    def __init__(self, instance: 'CeleryIntegration', uuid_format: str = 'hex') -> None:
         self.instance = instance
+        self.uuid_format = uuid_format
         self.validate()
 
     @property
@@ -23,7 +24,7 @@ class CeleryIntegrationSettings:
         return self.instance.log_parent
 
     @property
-    def uuid_length(self) -> int:
+    def uuid_length(self) -> Optional[int]:
         return self.instance.uuid_length
 
     @property
@@ -31,11 +32,22 @@ class CeleryIntegrationSettings:
         return self.instance.sentry_integration
 
     def validate(self) -> None:
+        from django_guid.config import TIME_ORDERED_FORMATS, UUID_FORMAT_LENGTHS
+
+        uuid_format = self.uuid_format
         if not isinstance(self.use_django_logging, bool):
             raise ImproperlyConfigured('The CeleryIntegration use_django_logging setting must be a boolean.')
         if not isinstance(self.log_parent, bool):
             raise ImproperlyConfigured('The CeleryIntegration log_parent setting must be a boolean.')
-        if type(self.uuid_length) is not int or not 1 <= self.uuid_length <= 32:
+        if uuid_format in TIME_ORDERED_FORMATS:
+            if self.uuid_length is not None and (
+                type(self.uuid_length) is not int or self.uuid_length != UUID_FORMAT_LENGTHS[uuid_format]
+            ):
+                raise ImproperlyConfigured(
+                    f'The CeleryIntegration uuid_length setting must be {UUID_FORMAT_LENGTHS[uuid_format]} '
+                    f'when UUID_FORMAT is {uuid_format}, as shortened time-ordered IDs only keep their timestamp.'
+                )
+        elif self.uuid_length is not None and (type(self.uuid_length) is not int or not 1 <= self.uuid_length <= 32):
             raise ImproperlyConfigured('The CeleryIntegration uuid_length setting must be an integer.')
         if not isinstance(self.sentry_integration, bool):
             raise ImproperlyConfigured('The CeleryIntegration sentry_integration setting must be a boolean.')
@@ -2,3 +2,5 @@ from contextvars import ContextVar
 
 celery_parent: ContextVar = ContextVar('celery_parent', default=None)
 celery_current: ContextVar = ContextVar('celery_current', default=None)
+celery_root: ContextVar = ContextVar('celery_root', default=None)
+celery_depth: ContextVar = ContextVar('celery_depth', default=None)
@@ -1,5 +1,5 @@
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from django_guid.integrations import Integration
 
@@ -16,18 +16,20 @@ class CeleryIntegration(Integration):
     """
 
     identifier = 'CeleryIntegration'
+    runs_in_middleware = False
 
     def __init__(
         self,
         use_django_logging: bool = False,
         log_parent: bool = False,
-        uuid_length: int = 32,
+        uuid_length: Optional[int] = None,
         sentry_integration: bool = False,
     ) -> None:
         """
         :param use_django_logging: If true, configures Celery to use the logging settings defined in settings.py
         :param log_parent: If true, traces the origin of a task. Should be True if you wish to use the CeleryTracing log filter.
-        :param uuid_length: Optionally lets you set the length of the celery IDs generated for the log filter
+        :param uuid_length: Optionally lets you set the length of the celery IDs generated for the log filter.
+            Defaults to 32, or to the full length of time-ordered UUID_FORMATs, which can't be shortened
         """
         super().__init__()
         self.log_parent = log_parent
@@ -37,11 +39,15 @@ class CeleryIntegration(Integration):
 
     def setup(self) -> None:
         """
-        Loads Celery signals.
+        Loads Celery signals, and binds their handlers to the resolved settings.
         """
         # Import pre-configured Celery signals that will pass on the correlation ID to a celery worker
         # or will generate a correlation ID when a worker starts a scheduled task
-        from django_guid.integrations.celery.signals import before_task_publish, task_postrun, task_prerun  # noqa
+        from django_guid.config import settings
+        from django_guid.integrations.celery.signals import get_signal_handlers
+
+        if self in settings.snapshot.integrations:
+            get_signal_handlers()
 
         if self.use_django_logging:
             # Import pre-configured Celery signals that makes Celery adopt the settings.py log config
@@ -0,0 +1,80 @@
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from django_guid.integrations.celery.context import celery_current, celery_depth, celery_parent, celery_root
+
+lineage_header = 'CELERY_LINEAGE'
+
+# Parent ID header sent by earlier versions, which only carried one level of lineage. Still sent and read, so workers
+# running different versions keep their parent IDs during a rolling upgrade
+parent_header = 'CELERY_PARENT_ID'
+
+# The depth is written as a fixed number of hex digits, so the header has the same size at any depth
+DEPTH_DIGITS = 8
+MAX_DEPTH = 16**DEPTH_DIGITS - 1
+
+
+class Lineage(NamedTuple):
+    """
+    The position of a task in its task tree.
+
+    `root` is the current ID of the first task in the tree, `parent` the current ID of the task that published this
+    one, and `depth` the number of tasks between this task and the root. Tasks published from a request, or from
+    Celery beat, are roots: their root ID is their own current ID, they have no parent and their depth is 0.
+    """
+
+    root: str
+    parent: Optional[str]
+    current: str
+    depth: int
+
+
+def format_lineage(root: str, current: str, depth: int) -> str:
+    """
+    Formats the lineage header a task sends with the tasks it publishes.
+
+    Only the root ID, the publishing task's current ID and its depth are sent. The receiving task uses the current ID
+    as its parent, so the header doesn't grow with the depth of the tree.
+
+    :param root: Root ID of the publishing task
+    :param current: Current ID of the publishing task
+    :param depth: Depth of the publishing task
+    :return: Header value, in the format `root:current:depth`
+    """
+    return f'{root}:{current}:{min(depth, MAX_DEPTH):0{DEPTH_DIGITS}x}'
+
+
+def add_lineage_headers(headers: Dict[str, str]) -> None:
+    """
+    Adds the lineage header, and the parent ID header read by earlier versions, for tasks published by the current
+    task. Nothing is added outside of a task.
+    """
+    current = celery_current.get()
+    if current is not None:
+        headers[lineage_header] = format_lineage(celery_root.get() or current, current, celery_depth.get() or 0)
+        headers[parent_header] = current
+
+
+def parse_lineage(value: str) -> Optional[Tuple[str, str, int]]:
+    """
+    Parses a lineage header.
+
+    :param value: Header value
+    :return: Root ID, current ID and depth of the publishing task, or None if the value is malformed
+    """
+    try:
+        root, current, depth = value.split(':')
+        return root, current, int(depth, 16)
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_lineage() -> Optional[Lineage]:
+    """
+    Returns the lineage of the current task, if the CeleryIntegration `log_parent` setting is enabled.
+
+    :return: Lineage, or None outside of a task
+    """
+    current = celery_current.get()
+    if current is None:
+        return None
+    return Lineage(celery_root.get() or current, celery_parent.get(), current, celery_depth.get() or 0)
@@ -1,7 +1,7 @@
 from logging import Filter
 from typing import TYPE_CHECKING
 
-from django_guid.integrations.celery.context import celery_current, celery_parent
+from django_guid.integrations.celery.context import celery_current, celery_depth, celery_parent, celery_root
 
 if TYPE_CHECKING:
     from logging import LogRecord
@@ -11,13 +11,17 @@ class CeleryTracing(Filter):
     # noinspection PyTypeHints
     def filter(self, record: 'LogRecord') -> bool:
         """
-        Sets two record attributes: celery parent and celery current.
+        Sets four record attributes: celery parent, celery current, celery root and celery depth.
         Celery origin is the tracing ID of the process that spawned the current
         process, and celery current is the current process' tracing ID.
 
         In other words, if a worker sent a task to be executed by the worker pool,
         that celery worker's `current` tracing ID would become the next worker's `origin` tracing ID.
+        Celery root is the current tracing ID of the first task in the tree, and celery depth
+        the number of tasks between the current task and the root.
         """
         record.celery_parent_id: str = celery_parent.get()  # type: ignore
         record.celery_current_id: str = celery_current.get()  # type: ignore
+        record.celery_root_id: str = celery_root.get()  # type: ignore
+        record.celery_depth: int = celery_depth.get()  # type: ignore
         return True
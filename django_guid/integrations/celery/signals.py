@@ -1,37 +1,253 @@
 import logging
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
 
 from celery.signals import before_task_publish, task_postrun, task_prerun
 
 from django_guid import clear_guid, get_guid, set_guid
-from django_guid.config import settings
-from django_guid.integrations.celery.context import celery_current, celery_parent
+from django_guid.config import TIME_ORDERED_FORMATS, UUID_FORMAT_LENGTHS, settings
+from django_guid.context import trace_parent, trace_state
+from django_guid.integrations.celery.context import celery_current, celery_depth, celery_parent, celery_root
+from django_guid.integrations.celery.lineage import add_lineage_headers, lineage_header, parent_header, parse_lineage
+from django_guid.integrations.sentry import transaction_id_setter
+from django_guid.trace_context import (
+    TRACEPARENT_HEADER,
+    TRACESTATE_HEADER,
+    clear_trace_context,
+    parse_traceparent,
+    start_trace_context,
+)
 from django_guid.utils import generate_guid
 
 if TYPE_CHECKING:
     from celery import Task
 
+    from django_guid.config import SettingsSnapshot
+    from django_guid.metrics import Metrics
+
 logger = logging.getLogger('django_guid.celery')
 
-parent_header = 'CELERY_PARENT_ID'
 
+def request_header(request: Any, name: str) -> Optional[str]:
+    """
+    Returns a header from a task request, or from the request's stamps if the task was stamped by
+    `CorrelationIdStamper`. Celery keeps duplicated stamps as a list, in which case the last one is returned.
+    """
+    value = request.get(name)
+    if value:
+        return value
+    stamps = request.get('stamps')
+    if not stamps:
+        return None
+    value = stamps.get(name)
+    if isinstance(value, list):
+        return value[-1] if value else None
+    return value
 
-def set_transaction_id(guid: str) -> None:
+
+class SignalHandlers(NamedTuple):
     """
-    Sets the Sentry transaction ID if the Celery sentry integration setting is True.
+    The Celery signal handlers, bound to the resolved configuration of one settings snapshot.
+    """
+
+    conf: 'SettingsSnapshot'
+    set_transaction_id: Callable[[str], None]
+    publish: Callable[[dict], None]
+    prerun: Callable[['Task'], None]
+    postrun: Callable[[], None]
+
+
+_signal_handlers: Optional[SignalHandlers] = None
+
+
+def transaction_id_handler(tag_sentry: Optional[Callable[[str], None]], log: bool) -> Callable[[str], None]:
+    """
+    Returns the handler tagging Sentry with a task's GUID, which does nothing if the Sentry integration is disabled.
+    """
+
+    def set_transaction_id(guid: str) -> None:
+        if tag_sentry is not None:
+            tag_sentry(guid)
+            if log:
+                logger.debug('Setting Sentry transaction_id to %s', guid)
+
+    return set_transaction_id
+
+
+def add_trace_headers(headers: dict) -> None:
+    """
+    Adds the Trace Context of the current request or task to a published task's headers.
     """
-    if settings.integration_settings.celery.sentry_integration:
-        import sentry_sdk
-        from packaging import version
+    traceparent = trace_parent.get()
+    if traceparent:
+        headers[TRACEPARENT_HEADER] = traceparent
+        tracestate = trace_state.get()
+        if tracestate:
+            headers[TRACESTATE_HEADER] = tracestate
 
-        if version.parse(sentry_sdk.VERSION) >= version.parse('2.12.0'):
-            with sentry_sdk.isolation_scope() as scope:
-                scope.set_tag('transaction_id', guid)
+
+def publish_handler(header_name: str, log_parent: bool, trace_context: bool, log: bool) -> Callable[[dict], None]:
+    """
+    Returns the handler adding the GUID, the lineage of the current task if `log_parent` is enabled, and the
+    Trace Context if TRACE_CONTEXT is enabled, to a published task's headers.
+    """
+
+    def publish(headers: dict) -> None:
+        stamps = headers.get('stamps')
+        if stamps and header_name in stamps:
+            return  # The IDs were stamped onto the canvas when it was built
+
+        guid = get_guid()
+        if log:
+            logger.info('Setting task request header as %s', guid)
+        headers[header_name] = guid
+
+        if log_parent:
+            add_lineage_headers(headers)
+
+        if trace_context:
+            add_trace_headers(headers)
+
+    return publish
+
+
+def set_lineage(task: 'Task', uuid_length: int, log: bool) -> None:
+    """
+    Sets the root, parent and current IDs and the depth of a task, from the lineage of the task that published it.
+    """
+    current = generate_guid(uuid_length=uuid_length)
+    if log:
+        logger.info('Generated current ID %s', current)
+    celery_current.set(current)
+
+    lineage = request_header(task.request, lineage_header)
+    published_by = parse_lineage(lineage) if lineage else None
+    parent: Optional[str]
+    if published_by:
+        root, parent, depth = published_by
+        depth += 1
+    else:
+        root, parent, depth = current, request_header(task.request, parent_header), 0
+    if parent and log:
+        logger.info('Setting parent ID %s', parent)
+    celery_parent.set(parent)
+    celery_root.set(root)
+    celery_depth.set(depth)
+
+
+def set_trace_context(task: 'Task', guid: str) -> None:
+    """
+    Sets the Trace Context of a task, continuing the trace of the request or task that published it.
+    """
+    incoming = parse_traceparent(request_header(task.request, TRACEPARENT_HEADER))
+    tracestate = request_header(task.request, TRACESTATE_HEADER) if incoming is not None else None
+    start_trace_context(guid, incoming, tracestate)
+
+
+def prerun_handler(
+    header_name: str,
+    log_parent: bool,
+    trace_context: bool,
+    uuid_length: int,
+    log: bool,
+    metrics: Optional['Metrics'],
+    set_transaction_id: Callable[[str], None],
+) -> Callable[['Task'], None]:
+    """
+    Returns the handler setting the GUID, the lineage if `log_parent` is enabled, and the Trace Context if
+    TRACE_CONTEXT is enabled, for a task.
+    """
+
+    def prerun(task: 'Task') -> None:
+        guid = request_header(task.request, header_name)
+        if guid:
+            if log:
+                logger.info('Setting GUID %s', guid)
+            if metrics is not None:
+                metrics.increment('django_guid_celery_task_ids_total', 'propagated')
         else:
-            with sentry_sdk.configure_scope() as scope:
-                scope.set_tag('transaction_id', guid)
+            guid = generate_guid(uuid_length=uuid_length)
+            if log:
+                logger.info('Generated GUID %s', guid)
+            if metrics is not None:
+                metrics.increment('django_guid_celery_task_ids_total', 'generated')
+        set_guid(guid)
+        set_transaction_id(guid)
+        if trace_context:
+            set_trace_context(task, guid)
+
+        if log_parent:
+            set_lineage(task, uuid_length, log)
+
+    return prerun
+
+
+def postrun_handler(log_parent: bool, trace_context: bool, log: bool) -> Callable[[], None]:
+    """
+    Returns the handler clearing the IDs set for a task.
+    """
+
+    def postrun() -> None:
+        if log:
+            logger.debug('Cleaning up GUIDs')
+        clear_guid()
+
+        if log_parent:
+            celery_current.set(None)
+            celery_parent.set(None)
+            celery_root.set(None)
+            celery_depth.set(None)
+
+        if trace_context:
+            clear_trace_context()
+
+    return postrun
+
 
-        logger.debug('Setting Sentry transaction_id to %s', guid)
+def build_signal_handlers(conf: 'SettingsSnapshot') -> SignalHandlers:
+    """
+    Builds the signal handlers for the given settings, so no settings are looked up per task.
+    """
+    celery_settings = conf.integration_settings.celery
+    log = 'celery' in conf.log_events
+    uuid_length = celery_settings.uuid_length
+    if uuid_length is None:
+        uuid_length = UUID_FORMAT_LENGTHS[conf.uuid_format] if conf.uuid_format in TIME_ORDERED_FORMATS else 32
+    tag_sentry = transaction_id_setter() if celery_settings.sentry_integration else None
+    set_transaction_id = transaction_id_handler(tag_sentry, 'integrations' in conf.log_events)
+    return SignalHandlers(
+        conf,
+        set_transaction_id,
+        publish_handler(conf.guid_header_name, celery_settings.log_parent, conf.trace_context, log),
+        prerun_handler(
+            conf.guid_header_name,
+            celery_settings.log_parent,
+            conf.trace_context,
+            uuid_length,
+            log,
+            conf.metrics,
+            set_transaction_id,
+        ),
+        postrun_handler(celery_settings.log_parent, conf.trace_context, log),
+    )
+
+
+def get_signal_handlers() -> SignalHandlers:
+    """
+    Returns the signal handlers for the current settings, rebuilding them if the settings have changed.
+    """
+    global _signal_handlers
+    conf = settings.snapshot
+    handlers = _signal_handlers
+    if handlers is None or handlers.conf is not conf:
+        handlers = _signal_handlers = build_signal_handlers(conf)
+    return handlers
+
+
+def set_transaction_id(guid: str) -> None:
+    """
+    Sets the Sentry transaction ID if the Celery sentry integration setting is True.
+    """
+    get_signal_handlers().set_transaction_id(guid)
 
 
 @before_task_publish.connect
@@ -41,14 +257,7 @@ def publish_task_from_worker_or_request(headers: dict, **kwargs: Any) -> None:
     by calling task.delay(), task.apply_async() or using another equivalent method.
     This is where we transfer state from a parent process to a child process.
     """
-    guid = get_guid()
-    logger.info('Setting task request header as %s', guid)
-    headers[settings.guid_header_name] = guid
-
-    if settings.integration_settings.celery.log_parent:
-        current = celery_current.get()
-        if current:
-            headers[parent_header] = current
+    get_signal_handlers().publish(headers)
 
 
 @task_prerun.connect
@@ -59,25 +268,7 @@ def worker_prerun(task: 'Task', **kwargs: Any) -> None:
     during the tasks, and on the thread in general. In that regard, this does
     the Celery equivalent to what the django-guid middleware does for a request.
     """
-    guid = task.request.get(settings.guid_header_name)
-    if guid:
-        logger.info('Setting GUID %s', guid)
-        set_guid(guid)
-        set_transaction_id(guid)
-    else:
-        generated_guid = generate_guid(uuid_length=settings.integration_settings.celery.uuid_length)
-        logger.info('Generated GUID %s', generated_guid)
-        set_guid(generated_guid)
-        set_transaction_id(generated_guid)
-
-    if settings.integration_settings.celery.log_parent:
-        origin = task.request.get(parent_header)
-        if origin:
-            logger.info('Setting parent ID %s', origin)
-            celery_parent.set(origin)
-        generated_current_guid = generate_guid(uuid_length=settings.integration_settings.celery.uuid_length)
-        logger.info('Generated current ID %s', generated_current_guid)
-        celery_current.set(generated_current_guid)
+    get_signal_handlers().prerun(task)
 
 
 @task_postrun.connect
@@ -87,9 +278,4 @@ def clean_up(task: 'Task', **kwargs: Any) -> None:
     Here we make sure to clean up the IDs we set in the pre-run method, so that
     the next task executed by the same worker doesn't inherit the same IDs.
     """
-    logger.debug('Cleaning up GUIDs')
-    clear_guid()
-
-    if settings.integration_settings.celery.log_parent:
-        celery_current.set(None)
-        celery_parent.set(None)
+    get_signal_handlers().postrun()
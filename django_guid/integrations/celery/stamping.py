@@ -0,0 +1,49 @@
+from typing import TYPE_CHECKING, Any, Dict
+
+from celery.canvas import StampingVisitor
+
+from django_guid import get_guid
+from django_guid.config import settings
+from django_guid.integrations.celery.lineage import add_lineage_headers
+from django_guid.integrations.celery.signals import add_trace_headers
+
+if TYPE_CHECKING:
+    from celery.canvas import Signature
+
+
+class CorrelationIdStamper(StampingVisitor):
+    """
+    Stamps every signature in a canvas with the GUID, the lineage of the current task when `log_parent` is enabled,
+    and the Trace Context when TRACE_CONTEXT is enabled.
+
+    The IDs are read once, when the visitor is created, rather than for each message when the canvas is published.
+    Stamped signatures keep the IDs of the request or task that built them, even if they are applied later.
+    """
+
+    def __init__(self) -> None:
+        conf = settings.snapshot
+        self.stamps: Dict[str, str] = {}
+        guid = get_guid()
+        if guid:
+            self.stamps[conf.guid_header_name] = guid
+            if conf.integration_settings.celery.log_parent:
+                add_lineage_headers(self.stamps)
+            if conf.trace_context:
+                add_trace_headers(self.stamps)
+
+    def on_signature(self, actual_sig: 'Signature', **headers: Any) -> Dict[str, str]:
+        """
+        Returns the stamps for a signature. Celery adds its own keys to the dict, so each signature gets a copy.
+        """
+        return dict(self.stamps)
+
+
+def stamp_canvas(canvas: 'Signature') -> 'Signature':
+    """
+    Stamps a signature or canvas with the GUID of the current request or task.
+
+    :param canvas: A signature, or a group, chain or chord of signatures
+    :return: The stamped canvas
+    """
+    canvas.stamp(visitor=CorrelationIdStamper())
+    return canvas
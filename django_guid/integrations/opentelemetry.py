@@ -0,0 +1,125 @@
+import logging
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, NamedTuple, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+
+from django_guid.integrations import Integration
+
+logger = logging.getLogger('django_guid')
+
+# Token for detaching the context with the GUID baggage entry, when the request is finished
+baggage_token: ContextVar = ContextVar('baggage_token', default=None)
+
+
+class OpenTelemetryAPI(NamedTuple):
+    """
+    The OpenTelemetry API functions used by the integration.
+    """
+
+    get_current_span: Callable[..., Any]
+    format_trace_id: Callable[[int], str]
+    set_baggage: Callable[..., Any]
+    attach: Callable[..., Any]
+    detach: Callable[..., None]
+
+
+@lru_cache(maxsize=None)
+def opentelemetry_api() -> OpenTelemetryAPI:
+    """
+    Imports the OpenTelemetry API functions once, rather than on each request.
+    """
+    from opentelemetry import baggage, context, trace
+
+    return OpenTelemetryAPI(
+        trace.get_current_span, trace.format_trace_id, baggage.set_baggage, context.attach, context.detach
+    )
+
+
+class OpenTelemetryIntegration(Integration):
+    """
+    Ties each request's correlation ID to the active OpenTelemetry span.
+
+    The trace-id of the active span can be adopted as the GUID, before the GUID is set, and the GUID is added to the
+    span as an attribute and to the baggage. No spans are created; the span must be started by OpenTelemetry's own
+    instrumentation.
+    """
+
+    identifier = 'OpenTelemetryIntegration'
+    runs_inline = True  # The baggage is attached to the request's context
+
+    def __init__(
+        self,
+        adopt_trace_id: bool = False,
+        span_attribute: Optional[str] = 'correlation_id',
+        baggage_key: Optional[str] = 'correlation_id',
+    ) -> None:
+        super().__init__()
+        self.adopt_trace_id = adopt_trace_id
+        self.span_attribute = span_attribute
+        self.baggage_key = baggage_key
+        self.api: Optional[OpenTelemetryAPI] = None
+
+    def setup(self) -> None:
+        """
+        Verifies the settings, and that the opentelemetry-api dependency is installed.
+        """
+        try:
+            import opentelemetry.trace  # noqa: F401
+        except ModuleNotFoundError:
+            raise ImproperlyConfigured(
+                'The package `opentelemetry-api` is required for extending your tracing IDs to OpenTelemetry. '
+                'Please run `pip install opentelemetry-api` if you wish to include this integration.'
+            )
+        if not isinstance(self.adopt_trace_id, bool):
+            raise ImproperlyConfigured('The OpenTelemetryIntegration adopt_trace_id setting must be a boolean.')
+        for name in ('span_attribute', 'baggage_key'):
+            value = getattr(self, name)
+            if value is not None and (not isinstance(value, str) or not value):
+                raise ImproperlyConfigured(f'The OpenTelemetryIntegration {name} setting must be a string or None.')
+        self.api = opentelemetry_api()
+
+    def get_api(self) -> OpenTelemetryAPI:
+        """
+        Returns the OpenTelemetry API functions, resolving them if `setup` wasn't run, e.g. in tests.
+        """
+        api = self.api
+        if api is None:
+            api = self.api = opentelemetry_api()
+        return api
+
+    def adopt_guid(self, guid: str) -> Optional[str]:
+        """
+        Returns the trace-id of the active span, to use as the GUID, if `adopt_trace_id` is enabled.
+        """
+        if not self.adopt_trace_id:
+            return None
+        api = self.get_api()
+        span_context = api.get_current_span().get_span_context()
+        if not span_context.is_valid:
+            return None
+        trace_id = api.format_trace_id(span_context.trace_id)
+        logger.debug('Using OpenTelemetry trace-id %s as GUID', trace_id)
+        return trace_id
+
+    def run(self, guid: str, **kwargs: Any) -> None:
+        """
+        Adds the GUID to the active span and the baggage.
+        """
+        api = self.get_api()
+        if self.span_attribute:
+            span = api.get_current_span()
+            if span.is_recording():
+                span.set_attribute(self.span_attribute, guid)
+        if self.baggage_key:
+            baggage_token.set(api.attach(api.set_baggage(self.baggage_key, guid)))
+
+    def cleanup(self, **kwargs: Any) -> None:
+        """
+        Detaches the context with the GUID baggage entry.
+        """
+        token = baggage_token.get()
+        if token is not None:
+            opentelemetry_api().detach(token)
+            baggage_token.set(None)
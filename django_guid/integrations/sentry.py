@@ -1,5 +1,6 @@
 import logging
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
 from django.core.exceptions import ImproperlyConfigured
 
@@ -8,16 +9,47 @@ from django_guid.integrations import Integration
 logger = logging.getLogger('django_guid')
 
 
+@lru_cache(maxsize=None)
+def transaction_id_setter() -> Callable[[str], None]:
+    """
+    Returns a function that tags the current Sentry scope with a `transaction_id`.
+
+    The installed SDK's capabilities are checked once, rather than on each call. SDK 2.x tags the current
+    isolation scope directly, as entering `sentry_sdk.isolation_scope()` would fork a new scope and discard
+    the tag when the block exits. Older SDKs tag the current hub's scope.
+    """
+    import sentry_sdk
+
+    if hasattr(sentry_sdk, 'get_isolation_scope'):
+        get_isolation_scope = sentry_sdk.get_isolation_scope
+
+        def set_transaction_id(guid: str) -> None:
+            get_isolation_scope().set_tag('transaction_id', guid)
+
+    else:  # pragma: no cover - sentry-sdk<2.0
+
+        def set_transaction_id(guid: str) -> None:
+            with sentry_sdk.configure_scope() as scope:
+                scope.set_tag('transaction_id', guid)
+
+    return set_transaction_id
+
+
 class SentryIntegration(Integration):
     """
     Ensures that each request's correlation ID is passed on to Sentry exception logs as a `transaction_id`.
     """
 
     identifier = 'SentryIntegration'
+    runs_inline = True  # The tag is set on the request's isolation scope, which may be created by the first call
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.set_transaction_id: Optional[Callable[[str], None]] = None
 
     def setup(self) -> None:
         """
-        Verifies that the sentry_sdk dependency is installed.
+        Verifies that the sentry_sdk dependency is installed, and resolves how to tag the Sentry scope.
         """
         # Makes sure the client has installed the `sentry_sdk` package, and that the header is appropriately named.
         try:
@@ -27,19 +59,14 @@ class SentryIntegration(Integration):
                 'The package `sentry-sdk` is required for extending your tracing IDs to Sentry. '
                 'Please run `pip install sentry-sdk` if you wish to include this integration.'
             )
+        self.set_transaction_id = transaction_id_setter()
 
     def run(self, guid: str, **kwargs: Any) -> None:
         """
         Sets the Sentry transaction_id.
         """
-        import sentry_sdk
-        from packaging import version
-
-        if version.parse(sentry_sdk.VERSION) >= version.parse('2.12.0'):
-            with sentry_sdk.isolation_scope() as scope:
-                scope.set_tag('transaction_id', guid)
-        else:
-            with sentry_sdk.configure_scope() as scope:
-                scope.set_tag('transaction_id', guid)
-
+        set_transaction_id = self.set_transaction_id
+        if set_transaction_id is None:  # The integration was added without running `setup`, e.g. in tests
+            set_transaction_id = self.set_transaction_id = transaction_id_setter()
+        set_transaction_id(guid)
         logger.debug('Setting Sentry transaction_id to %s', guid)
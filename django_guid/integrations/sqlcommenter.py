@@ -0,0 +1,108 @@
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from django_guid.api import get_guid
+from django_guid.integrations import Integration
+
+
+class SqlComment(NamedTuple):
+    """
+    The SQL comment of a request, formatted once when the request starts.
+    """
+
+    comment: str
+    escaped: str  # With `%` escaped, for queries with parameters
+    databases: Optional[Tuple[str, ...]]  # The aliases of the databases to tag, or None for all of them
+
+
+# The comment of the current request, or None outside of requests
+sql_comment: ContextVar[Optional[SqlComment]] = ContextVar('sql_comment', default=None)
+
+
+def format_comment(key: str, guid: str, databases: Optional[Tuple[str, ...]] = None) -> SqlComment:
+    """
+    Returns the SQL comment for a GUID.
+
+    The GUID is URL-encoded, like sqlcommenter does, so a GUID from a request header can't close the comment.
+    """
+    comment = f'/* {key}={quote(guid, safe="")} */ '
+    return SqlComment(comment, comment.replace('%', '%%'), databases)
+
+
+def prepend_comment(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: dict) -> Any:
+    """
+    Execute wrapper prepending the current request's comment to a query.
+    """
+    request_comment = sql_comment.get()
+    if request_comment is not None and (
+        request_comment.databases is None or context['connection'].alias in request_comment.databases
+    ):
+        sql = (request_comment.comment if params is None else request_comment.escaped) + sql
+    return execute(sql, params, many, context)
+
+
+def install_wrapper(connection: Any, **kwargs: Any) -> None:
+    """
+    Installs the execute wrapper on a database connection, if it isn't installed yet.
+
+    Receiver for `connection_created`, which is sent for the connection of each thread, and again when a
+    connection is reopened. The wrapper is inserted first, so it doesn't disturb `execute_wrapper` blocks that
+    are active while the connection is opened, which remove the last wrapper when they exit.
+    """
+    if prepend_comment not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, prepend_comment)
+
+
+class SqlCommentIntegration(Integration):
+    """
+    Prepends a comment with the correlation ID to the queries sent to the database during a request, so queries
+    in the database's logs can be traced back to the request that sent them.
+
+    Database connections are per thread, and async views run their queries in other threads than the middleware,
+    so the execute wrapper is installed on every connection when it is opened. The comment is formatted once per
+    request and read from a context variable, which is passed on to the threads running the request's queries.
+    Queries sent outside of a request, e.g. in Celery tasks, are not tagged.
+    """
+
+    identifier = 'SqlCommentIntegration'
+    runs_inline = True  # The comment is set in the request's context
+
+    def __init__(self, key: str = 'correlation_id', databases: Optional[Iterable[str]] = None) -> None:
+        super().__init__()
+        self.key = key
+        self.databases = tuple(databases) if databases is not None else None
+
+    def setup(self) -> None:
+        """
+        Verifies the settings, and installs the execute wrapper on database connections when they are opened.
+        """
+        if not isinstance(self.key, str) or not self.key or quote(self.key, safe='') != self.key:
+            raise ImproperlyConfigured(
+                'The SqlCommentIntegration key setting must be a non-empty string of letters, digits, `_`, `-` or `.`'
+            )
+        if self.databases is not None:
+            unknown = [alias for alias in self.databases if alias not in connections]
+            if unknown:
+                raise ImproperlyConfigured(
+                    f'The SqlCommentIntegration databases setting contains unknown aliases: {", ".join(unknown)}'
+                )
+        connection_created.connect(install_wrapper, dispatch_uid='django_guid.sqlcommenter')
+        for connection in connections.all(initialized_only=True):  # Connections opened before the app was ready
+            install_wrapper(connection)
+
+    def run(self, guid: str, **kwargs: Any) -> None:
+        """
+        Formats the comment for the request's queries.
+        """
+        sql_comment.set(format_comment(self.key, get_guid() or guid, self.databases))
+
+    def cleanup(self, **kwargs: Any) -> None:
+        """
+        Stops tagging queries.
+        """
+        sql_comment.set(None)
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Optional
+
+# The lifecycle events django-guid logs, which can be selected with the LOG_EVENTS setting
+LOG_EVENTS = frozenset({'middleware', 'header', 'integrations', 'context', 'celery'})
+
+
+class RateLimitedWarnings:
+    """
+    Rate limits the warnings logged for invalid GUID headers.
+
+    The first warning in each interval is logged as is. Later warnings in the same interval are only counted,
+    by kind, and logged as a single summary line when the interval ends, by a timer started with the first
+    suppressed warning, so the summary isn't held back until the next warning. With an interval of 0, every
+    warning is logged.
+    """
+
+    __slots__ = (
+        'logger',
+        'header_name',
+        'interval',
+        'clock',
+        'make_timer',
+        'lock',
+        'window_end',
+        'suppressed',
+        'timer',
+    )
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        header_name: str,
+        interval: float,
+        clock: Callable[[], float] = time.monotonic,
+        make_timer: Callable[[float, Callable[[], None]], threading.Timer] = threading.Timer,
+    ) -> None:
+        self.logger = logger
+        self.header_name = header_name
+        self.interval = interval
+        self.clock = clock
+        self.make_timer = make_timer
+        self.lock = threading.Lock()
+        self.window_end = 0.0
+        self.suppressed: Counter = Counter()
+        self.timer: Optional[threading.Timer] = None
+
+    def warning(self, kind: str, msg: str, *args: Any) -> None:
+        """
+        Logs the warning, or counts it if a warning was already logged in the current interval.
+
+        :param kind: Short description of the warning, used in the summary line, e.g. `oversized`
+        :param msg: Log message
+        :param args: Log message arguments
+        """
+        if self.interval <= 0:
+            self.logger.warning(msg, *args)
+            return
+        now = self.clock()
+        with self.lock:
+            if now < self.window_end:
+                if self.timer is None:
+                    self.timer = self.make_timer(self.window_end - now, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                self.suppressed[kind] += 1
+                return
+            # The timer may not have fired yet, if the warning comes right as the interval ends
+            suppressed, self.suppressed = self.suppressed, Counter()
+            self.window_end = now + self.interval
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        self.log_summary(suppressed)
+        self.logger.warning(msg, *args)
+
+    def flush(self) -> None:
+        """
+        Logs the summary of the warnings suppressed so far, if any. Called by the timer when the interval ends.
+        """
+        with self.lock:
+            suppressed, self.suppressed = self.suppressed, Counter()
+            self.timer = None
+        self.log_summary(suppressed)
+
+    def log_summary(self, suppressed: Counter) -> None:
+        """
+        Logs a single line counting the suppressed warnings by kind, if there were any.
+        """
+        if suppressed:
+            self.logger.warning(
+                'Suppressed %s warnings about invalid %s headers (%s)',
+                sum(suppressed.values()),
+                self.header_name,
+                ', '.join(f'{count} {kind}' for kind, count in sorted(suppressed.items())),
+            )
@@ -1,7 +1,7 @@
 from logging import Filter
 from typing import TYPE_CHECKING
 
-from django_guid.context import guid
+from django_guid.context import connection_guid, guid
 
 if TYPE_CHECKING:
     from logging import LogRecord
@@ -21,3 +21,18 @@ class CorrelationId(Filter):
         """
         setattr(record, self.correlation_id_field, guid.get())
         return True
+
+
+class ConnectionId(Filter):
+    def __init__(self, connection_id_field: str = 'connection_id') -> None:
+        super().__init__()
+        self.connection_id_field = connection_id_field
+
+    def filter(self, record: 'LogRecord') -> bool:
+        """
+        Add the GUID of the connection a message was received on, e.g. a websocket, to the log record.
+        :param record: Log record
+        :return: True
+        """
+        setattr(record, self.connection_id_field, connection_guid.get())
+        return True
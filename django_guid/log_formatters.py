@@ -0,0 +1,103 @@
+import logging
+import time
+from json.encoder import JSONEncoder, encode_basestring
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from django_guid.api import propagated_vars
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from logging import LogRecord
+
+# Keys of the IDs in each line, read from the context variables returned first by `propagated_vars()`
+ID_KEYS = ('correlation_id', 'celery_parent_id', 'celery_current_id')
+
+# Shared, as `json.dumps` builds a new encoder for every call made with options
+json_encode = JSONEncoder(ensure_ascii=False, default=str).encode
+
+
+def dump_value(value: Any) -> str:
+    """
+    Serializes a value with the standard library, falling back to `str()` for values it can't serialize.
+    """
+    if value.__class__ is str:
+        return encode_basestring(value)
+    return json_encode(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, with the GUID and the Celery parent and current IDs read from
+    their context variables, so no log filters are needed.
+
+    Each line holds `timestamp`, in UTC, `level`, `logger`, `message`, the IDs, the configured record attributes,
+    the static fields, and `exc_info` and `stack_info` when the record has them. The static fields, level and
+    logger name are serialized once per logger and level, and the timestamp once per second. The rest of the line
+    is serialized with `orjson` if it is installed, and with the standard library `json` module otherwise.
+
+    :param fields: Record attributes to include, e.g. ones passed with `extra`, if the record has them
+    :param static_fields: Keys and values to include in every line, e.g. the name of the service
+    """
+
+    def __init__(self, fields: Sequence[str] = (), static_fields: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__()
+        self.fields = tuple(fields)
+        self.static_fields = dict(static_fields or {})
+        self.id_vars = propagated_vars()[: len(ID_KEYS)]
+        self.prefixes: Dict[Tuple[str, int], str] = {}
+        self.second: Tuple[int, str] = (-1, '')
+        self.use_orjson = orjson is not None
+
+    def prefix(self, record: 'LogRecord') -> str:
+        """
+        Returns the serialized level, logger name and static fields for the record's logger and level.
+        """
+        key = (record.name, record.levelno)
+        prefix = self.prefixes.get(key)
+        if prefix is None:
+            static = {'level': record.levelname, 'logger': record.name, **self.static_fields}
+            prefix = self.prefixes[key] = json_encode(static)[1:-1]
+        return prefix
+
+    def timestamp(self, record: 'LogRecord') -> str:
+        """
+        Returns the record's creation time in ISO 8601 format, in UTC, with milliseconds.
+        """
+        seconds = int(record.created)
+        second = self.second
+        if second[0] != seconds:
+            second = self.second = (seconds, time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)))
+        return f'{second[1]}.{int(record.msecs):03d}Z'
+
+    def format(self, record: 'LogRecord') -> str:
+        """
+        Formats the record as a JSON object.
+
+        :param record: Log record
+        :return: The JSON object, on one line
+        """
+        values: Dict[str, Any] = {'message': record.getMessage()}
+        for key, var in zip(ID_KEYS, self.id_vars):
+            values[key] = var.get()
+        for name in self.fields:
+            if name in record.__dict__:
+                values[name] = record.__dict__[name]
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            values['exc_info'] = record.exc_text
+        if record.stack_info:
+            values['stack_info'] = self.formatStack(record.stack_info)
+
+        head = f'{{"timestamp":"{self.timestamp(record)}",{self.prefix(record)},'
+        if self.use_orjson:
+            return head + orjson.dumps(values, default=str).decode()[1:]
+        parts: List[str] = [head]
+        for key, value in values.items():
+            parts += encode_basestring(key), ':', 'null' if value is None else dump_value(value), ','
+        parts[-1] = '}'
+        return ''.join(parts)
@@ -0,0 +1,180 @@
+import logging
+import os
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+from queue import Empty, Full, Queue
+from typing import TYPE_CHECKING, List, Optional, Sequence, Union
+
+from django.core.exceptions import ImproperlyConfigured
+
+from django_guid.api import propagated_vars
+
+if TYPE_CHECKING:
+    from logging import Handler, LogRecord
+
+# Record attributes the IDs are captured in, in the order of `propagated_vars()`. Named as the log filters name them,
+# so formatters can use them without the filters
+ID_ATTRIBUTES = ('correlation_id', 'celery_parent_id', 'celery_current_id', 'celery_root_id', 'celery_depth')
+
+# What to do with a record when the queue is full
+OVERFLOW_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+# Every GuidQueueHandler, so they can be reset in forked children
+_handlers: 'weakref.WeakSet[GuidQueueHandler]' = weakref.WeakSet()
+
+
+def get_handler(handler: Union[str, 'Handler']) -> 'Handler':
+    """
+    Returns a handler, looking it up by name if a name is given.
+    """
+    if not isinstance(handler, str):
+        return handler
+    get_handler_by_name = getattr(logging, 'getHandlerByName', None)  # Python 3.12+
+    found = get_handler_by_name(handler) if get_handler_by_name else logging._handlers.get(handler)  # type: ignore
+    if found is None:
+        raise ImproperlyConfigured(f'GuidQueueHandler could not find the log handler `{handler}`')
+    return found
+
+
+class GuidQueueListener(QueueListener):
+    """
+    A QueueListener that sets the IDs captured by `GuidQueueHandler` before passing a record on to the handlers,
+    so log filters on those handlers, like `CorrelationId`, read the IDs of the code that logged the record.
+
+    The listener thread has a context of its own, so the IDs are simply replaced for each record.
+    """
+
+    def __init__(self, queue: 'Queue', *handlers: 'Handler', respect_handler_level: bool = False) -> None:
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.propagated_vars = propagated_vars()
+
+    def handle(self, record: 'LogRecord') -> None:
+        """
+        Sets the record's IDs, and passes it on to the handlers.
+        """
+        for name, var in zip(ID_ATTRIBUTES, self.propagated_vars):
+            var.set(getattr(record, name, None))
+        super().handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        """
+        Waits for room in the queue for the sentinel, which tells the listener thread to stop, if the queue is full.
+        """
+        self.queue.put(self._sentinel)  # type: ignore[attr-defined]
+
+
+class GuidQueueHandler(QueueHandler):
+    """
+    Hands records over to a background thread, which passes them on to other, possibly slow, handlers.
+
+    The GUID and the Celery IDs are read when a record is logged, and stored on the record, because the handlers
+    run in the listener thread, where the context variables don't hold the IDs of the code that logged the record.
+
+    The queue is bounded. When it's full, the overflow policy decides what happens to a new record:
+    `drop_newest` drops it, `drop_oldest` drops the oldest queued record to make room for it, and `block` waits
+    for room. Dropped records are counted in `dropped`.
+
+    :param handlers: The handlers to pass records on to, or their names in the LOGGING setting
+    :param maxsize: The maximum number of queued records
+    :param overflow: The overflow policy: `drop_newest`, `drop_oldest` or `block`
+    :param respect_handler_level: Whether to only pass records on to handlers whose level they meet
+    """
+
+    queue: 'Queue'
+    listener: Optional[GuidQueueListener]
+
+    def __init__(
+        self,
+        handlers: Sequence[Union[str, 'Handler']] = (),
+        maxsize: int = 10_000,
+        overflow: str = 'drop_newest',
+        respect_handler_level: bool = True,
+    ) -> None:
+        if type(maxsize) is not int or maxsize < 1:
+            raise ImproperlyConfigured('GuidQueueHandler maxsize must be a positive integer')
+        if overflow not in OVERFLOW_POLICIES:
+            raise ImproperlyConfigured(f'GuidQueueHandler overflow must be one of {", ".join(OVERFLOW_POLICIES)}')
+        super().__init__(Queue(maxsize))
+        self.target_handlers: List[Union[str, 'Handler']] = list(handlers)
+        self.overflow = overflow
+        self.respect_handler_level = respect_handler_level
+        self.propagated_vars = propagated_vars()
+        self.listener = None
+        self.closed = False
+        self.dropped = 0
+        _handlers.add(self)
+
+    def reset(self) -> None:
+        """
+        Discards the listener and the queued records, in a forked child. The listener thread isn't running in the
+        child, and the records queued before the fork are passed on by the parent. The listener is started again
+        when the child logs its first record.
+        """
+        self.queue = Queue(self.queue.maxsize)
+        self.listener = None
+        self.dropped = 0
+
+    def start(self) -> None:
+        """
+        Starts the listener thread. Called when the first record is logged, so handlers configured after this one
+        in the LOGGING setting can be referred to by name.
+        """
+        handlers = [get_handler(handler) for handler in self.target_handlers]
+        self.listener = GuidQueueListener(self.queue, *handlers, respect_handler_level=self.respect_handler_level)
+        self.listener.start()
+
+    def prepare(self, record: 'LogRecord') -> 'LogRecord':
+        """
+        Formats the record's message, as QueueHandler does, and stores the current IDs on the record.
+        """
+        record = super().prepare(record)
+        for name, var in zip(ID_ATTRIBUTES, self.propagated_vars):
+            setattr(record, name, var.get())
+        return record
+
+    def enqueue(self, record: 'LogRecord') -> None:
+        """
+        Queues a record, following the overflow policy if the queue is full.
+        """
+        if self.listener is None:
+            if self.closed:
+                return
+            self.start()  # Records are emitted while holding the handler's lock, so this runs once
+        if self.overflow == 'block':
+            self.queue.put(record)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except Full:
+                self.dropped += 1
+                if self.overflow == 'drop_newest':
+                    return
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except Empty:
+                pass
+
+    def close(self) -> None:
+        """
+        Passes the queued records on to the handlers, and stops the listener thread.
+        """
+        self.closed = True
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+        super().close()
+
+
+def reset_handlers() -> None:
+    """
+    Resets every GuidQueueHandler in a forked child, which would otherwise queue records no thread reads.
+    """
+    for handler in list(_handlers):
+        handler.reset()
+
+
+if hasattr(os, 'register_at_fork'):  # pragma: no branch
+    os.register_at_fork(after_in_child=reset_handlers)
@@ -0,0 +1,64 @@
+import re
+from fnmatch import translate
+from typing import Iterable, Optional, Pattern
+
+GLOB_CHARACTERS = frozenset('*?[')
+
+
+class IgnoreURLMatcher:
+    r"""
+    Matches request paths against the `IGNORE_URLS` rules.
+
+    Rules are compiled once, into a set of exact paths, a combined regex for the glob patterns and a combined regex
+    for the regular expressions, so matching a path costs one set lookup, plus a regex match per kind of non-exact
+    rule configured.
+
+    Supported rules:
+
+    * Exact paths, e.g. `health` or `/health/`, compared without leading and trailing slashes
+    * Glob patterns, e.g. `health/*` (which also matches `health` itself) or `api/v?/status`, compared without
+      leading and trailing slashes
+    * Regular expressions, starting with `^`, matched from the start of the path without its leading slash,
+      e.g. `^api/v\d+/status$`. Trailing slashes are kept, so `^admin/` doesn't match `/administrator`
+    """
+
+    __slots__ = ('exact', 'pattern', 'regex')
+
+    def __init__(self, rules: Iterable[str]) -> None:
+        exact = set()
+        patterns = []
+        regexes = []
+        for rule in rules:
+            if rule.startswith('^'):
+                regex = rule[1:]
+                regexes.append(f'(?:{regex[1:] if regex.startswith("/") else regex})')
+                continue
+            rule = rule.strip('/')
+            if GLOB_CHARACTERS.intersection(rule):
+                if rule.endswith('/*'):
+                    exact.add(rule[:-2])
+                patterns.append(translate(rule))
+            else:
+                exact.add(rule)
+        self.exact = frozenset(exact)
+        self.pattern: Optional[Pattern] = re.compile('|'.join(patterns), re.DOTALL) if patterns else None
+        self.regex: Optional[Pattern] = re.compile('|'.join(regexes)) if regexes else None
+
+    def __bool__(self) -> bool:
+        """
+        Returns True if any rules are configured.
+        """
+        return bool(self.exact) or self.pattern is not None or self.regex is not None
+
+    def __call__(self, path: str) -> bool:
+        """
+        Returns True if the path matches any of the rules.
+        """
+        stripped = path.strip('/')
+        if stripped in self.exact:
+            return True
+        pattern = self.pattern
+        if pattern is not None and pattern.fullmatch(stripped) is not None:
+            return True
+        regex = self.regex
+        return regex is not None and regex.match(path[1:] if path.startswith('/') else path) is not None
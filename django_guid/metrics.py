@@ -0,0 +1,204 @@
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Counters, with their description and label names
+COUNTERS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'django_guid_request_ids_total': (
+        'Correlation IDs assigned to requests, by outcome: valid, unvalidated, invalid or generated',
+        ('outcome',),
+    ),
+    'django_guid_celery_task_ids_total': (
+        'Correlation IDs assigned to Celery tasks, by outcome: propagated or generated',
+        ('outcome',),
+    ),
+}
+
+# Histograms, with their description and label names
+HISTOGRAMS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'django_guid_incoming_seconds': ('Time spent processing incoming requests in the middleware', ()),
+    'django_guid_integration_seconds': (
+        'Time spent in integration hooks, by integration and hook',
+        ('integration', 'hook'),
+    ),
+}
+
+# Upper bounds of the histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.1, 1.0)
+
+
+class Metrics(ABC):
+    """
+    Metrics backend base class.
+
+    Metrics are only collected when a backend is configured with the METRICS setting.
+    Label values are passed positionally, in the order of the label names in `COUNTERS` and `HISTOGRAMS`.
+    """
+
+    @abstractmethod
+    def increment(self, name: str, *labels: str) -> None:
+        """
+        Increments a counter by one.
+        """
+
+    @abstractmethod
+    def observe(self, name: str, value: float, *labels: str) -> None:
+        """
+        Records a value, in seconds, in a histogram.
+        """
+
+
+class Histogram(NamedTuple):
+    observations: int  # Not `count`, which would shadow `tuple.count`
+    sum: float
+    buckets: Tuple[int, ...]  # Non-cumulative counts per bucket in DEFAULT_BUCKETS, plus one for larger values
+
+
+class MetricsRegistry(Metrics):
+    """
+    Keeps counters and histograms in memory, for exporting them with your own tooling.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self.histograms: Dict[Tuple[str, Tuple[str, ...]], List[Any]] = {}
+
+    def increment(self, name: str, *labels: str) -> None:
+        """
+        Increments a counter by one.
+        """
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def observe(self, name: str, value: float, *labels: str) -> None:
+        """
+        Records a value, in seconds, in a histogram.
+        """
+        key = (name, labels)
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0, 0.0, [0] * (len(self.buckets) + 1)]
+            histogram[0] += 1
+            histogram[1] += value
+            histogram[2][index] += 1
+
+    def counter(self, name: str, *labels: str) -> int:
+        """
+        Returns the value of a counter.
+        """
+        return self.counters.get((name, labels), 0)
+
+    def histogram(self, name: str, *labels: str) -> Histogram:
+        """
+        Returns the number of observations, sum and bucket counts of a histogram.
+        """
+        with self.lock:
+            observations, total, buckets = self.histograms.get((name, labels), (0, 0.0, [0] * (len(self.buckets) + 1)))
+            return Histogram(observations, total, tuple(buckets))
+
+    def reset(self) -> None:
+        """
+        Clears all collected values.
+        """
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+class CallbackMetrics(Metrics):
+    """
+    Passes every update to a callback, as `callback(kind, name, value, labels)`.
+
+    `kind` is either `counter` or `histogram`, and `labels` is a dict of label names and values.
+    """
+
+    def __init__(self, callback: Callable[[str, str, float, Dict[str, str]], None]) -> None:
+        self.callback = callback
+
+    def increment(self, name: str, *labels: str) -> None:
+        """
+        Reports a counter increment to the callback.
+        """
+        self.callback('counter', name, 1, dict(zip(COUNTERS[name][1], labels)))
+
+    def observe(self, name: str, value: float, *labels: str) -> None:
+        """
+        Reports a histogram value to the callback.
+        """
+        self.callback('histogram', name, value, dict(zip(HISTOGRAMS[name][1], labels)))
+
+
+class PrometheusMetrics(Metrics):
+    """
+    Updates `prometheus_client` counters and histograms, registered in the default collector registry.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import prometheus_client
+        except ModuleNotFoundError:
+            raise ImproperlyConfigured(
+                'The package `prometheus-client` is required for exporting metrics to Prometheus. '
+                'Please run `pip install prometheus-client` if you wish to use it.'
+            )
+        self.counters = {
+            name: prometheus_client.Counter(name, description, labelnames)
+            for name, (description, labelnames) in COUNTERS.items()
+        }
+        self.histograms = {
+            name: prometheus_client.Histogram(name, description, labelnames, buckets=DEFAULT_BUCKETS)
+            for name, (description, labelnames) in HISTOGRAMS.items()
+        }
+
+    def increment(self, name: str, *labels: str) -> None:
+        """
+        Increments a Prometheus counter by one.
+        """
+        counter = self.counters[name]
+        (counter.labels(*labels) if labels else counter).inc()
+
+    def observe(self, name: str, value: float, *labels: str) -> None:
+        """
+        Records a value in a Prometheus histogram.
+        """
+        histogram = self.histograms[name]
+        (histogram.labels(*labels) if labels else histogram).observe(value)
+
+
+# The built-in registry, used when METRICS is set to 'builtin'
+registry = MetricsRegistry()
+
+
+@lru_cache(maxsize=None)
+def prometheus_metrics() -> PrometheusMetrics:
+    """
+    Returns the Prometheus backend. Metrics can only be registered once per process, so the backend is shared.
+    """
+    return PrometheusMetrics()
+
+
+def resolve_metrics(value: Any) -> Optional[Metrics]:
+    """
+    Returns the metrics backend for a value of the METRICS setting.
+
+    :param value: None, `builtin`, `prometheus`, a Metrics instance or a callback
+    :return: Metrics backend, or None if metrics are disabled
+    """
+    if value is None or isinstance(value, Metrics):
+        return value
+    elif value == 'builtin':
+        return registry
+    elif value == 'prometheus':
+        return prometheus_metrics()
+    elif callable(value):
+        return CallbackMetrics(value)
+    raise ImproperlyConfigured("METRICS must be None, 'builtin', 'prometheus', a Metrics instance or a callable")
@@ -1,12 +1,20 @@
 import asyncio
 import logging
-from typing import Callable, Union
+from contextvars import Context, copy_context
+from functools import partial
+from itertools import repeat
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, NamedTuple, Optional, Sequence, Tuple, Union
 
 from django.apps import apps
 from django.core.exceptions import ImproperlyConfigured
 
-from django_guid.context import guid
-from django_guid.utils import get_id_from_header, ignored_url
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django_guid.context import guid, trace_parent, trace_state
+from django_guid.integrations.base import is_overridden
+from django_guid.trace_context import TRACEPARENT_HEADER, TRACESTATE_HEADER, start_trace_context
+from django_guid.utils import get_id_from_header, get_wrapper_guid, ignored_url
 
 try:
     from django.utils.decorators import sync_and_async_middleware
@@ -18,40 +26,474 @@ from typing import TYPE_CHECKING
 from django_guid.config import settings
 
 if TYPE_CHECKING:
-    from django.http import HttpRequest, HttpResponse
+    from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+    from django_guid.config import SettingsSnapshot
+    from django_guid.integrations import Integration
+    from django_guid.metrics import Metrics
 
 logger = logging.getLogger('django_guid')
 
 
-def process_incoming_request(request: 'HttpRequest') -> None:
+class RequestProcessors(NamedTuple):
     """
-    Processes an incoming request. This function is called before the view and later middleware.
-    Same logic for both async and sync views.
+    The incoming and outgoing request processing, specialised for one settings snapshot.
+    """
+
+    conf: 'SettingsSnapshot'
+    incoming: Callable[['HttpRequest'], None]
+    outgoing: Callable[['HttpResponse', 'HttpRequest'], None]
+    aincoming: Callable[['HttpRequest'], Awaitable[None]]
+    aoutgoing: Callable[['HttpResponse', 'HttpRequest'], Awaitable[None]]
+
+
+_request_processors: Optional[RequestProcessors] = None
+
+_unset = object()  # The value of context variables that aren't set, when restoring a context
+
+
+def call_integrations(
+    calls: Sequence[Tuple['Integration', Callable[..., None]]],
+    hook: str,
+    message: Optional[str],
+    metrics: Optional['Metrics'],
+    **kwargs: Any,
+) -> None:
+    """
+    Calls the integration hooks one after another.
+
+    :param calls: Pairs of integration and its hook
+    :param hook: Name of the hook, for the metrics
+    :param message: Debug message logged for each integration, formatted with its identifier, or None to not log
+    :param metrics: Metrics backend to record the time spent in each hook in, or None
+    :param kwargs: Arguments for the hooks
+    """
+    for integration, call in calls:
+        if message:
+            logger.debug(message, integration.identifier)
+        if metrics is None:
+            call(**kwargs)
+        else:
+            start = perf_counter()
+            call(**kwargs)
+            # The identifier is never None, as integrations are checked when they're created
+            metrics.observe(
+                'django_guid_integration_seconds', perf_counter() - start, str(integration.identifier), hook
+            )
+
+
+async def await_integrations(
+    calls: Sequence[Tuple['Integration', Awaitable[None]]],
+    hook: str,
+    message: Optional[str],
+    metrics: Optional['Metrics'],
+    timeout: Optional[float],
+) -> None:
+    """
+    Awaits the integration hooks concurrently, each in its own task, so changes they make to context variables are
+    never seen by the request, however many hooks there are. Hooks that exceed the timeout are logged and abandoned.
+
+    :param calls: Pairs of integration and the awaitable returned by its hook
+    :param hook: Name of the hook, for the metrics
+    :param message: Debug message logged for each integration, formatted with its identifier, or None to not log
+    :param metrics: Metrics backend to record the time spent in each hook in, or None
+    :param timeout: Seconds each hook may take, or None to wait indefinitely
+    """
+
+    async def bounded(integration: 'Integration', awaitable: Awaitable[None]) -> None:
+        if message:
+            logger.debug(message, integration.identifier)
+        start = perf_counter() if metrics is not None else 0.0
+        if timeout is None:
+            await awaitable
+        else:
+            try:
+                await asyncio.wait_for(awaitable, timeout)
+            except asyncio.TimeoutError:
+                logger.warning('Integration `%s` timed out after %s seconds', integration.identifier, timeout)
+        if metrics is not None:
+            metrics.observe(
+                'django_guid_integration_seconds', perf_counter() - start, str(integration.identifier), hook
+            )
+
+    if calls:
+        await asyncio.gather(*(bounded(integration, awaitable) for integration, awaitable in calls))
+
+
+def restore_context(context: Context) -> None:
+    """
+    Sets the context variables changed in a copy of the current context, as if the changes had been made in it.
+    """
+    for var, value in context.items():
+        if var.get(_unset) is not value:
+            var.set(value)
+
+
+async def offload_integrations(
+    calls: Sequence[Tuple['Integration', Callable[..., None]]],
+    hook: str,
+    message: Optional[str],
+    metrics: Optional['Metrics'],
+    timeout: Optional[float],
+    **kwargs: Any,
+) -> None:
+    """
+    Calls the sync integration hooks one after another in a worker thread, so blocking I/O doesn't hold up the event
+    loop. Each hook runs in a copy of the request's context, and the changes it makes to context variables are copied
+    back into the request's context when it returns, as if it had been called directly. Hooks that exceed the timeout
+    are logged and abandoned, and their changes are lost.
+
+    :param calls: Pairs of integration and its hook
+    :param hook: Name of the hook, for the metrics
+    :param message: Debug message logged for each integration, formatted with its identifier, or None to not log
+    :param metrics: Metrics backend to record the time spent in each hook in, or None
+    :param timeout: Seconds each hook may take, or None to wait indefinitely
+    :param kwargs: Arguments for the hooks
+    """
+    for integration, call in calls:
+        if message:
+            logger.debug(message, integration.identifier)
+        start = perf_counter() if metrics is not None else 0.0
+        context = copy_context()
+        offloaded = sync_to_async(context.run, thread_sensitive=False)(call, **kwargs)
+        if timeout is None:
+            await offloaded
+            restore_context(context)
+        else:
+            try:
+                await asyncio.wait_for(offloaded, timeout)
+            except asyncio.TimeoutError:
+                logger.warning('Integration `%s` timed out after %s seconds', integration.identifier, timeout)
+            else:
+                restore_context(context)
+        if metrics is not None:
+            metrics.observe(
+                'django_guid_integration_seconds', perf_counter() - start, str(integration.identifier), hook
+            )
+
+
+def timed(incoming: Callable[['HttpRequest'], None], metrics: 'Metrics') -> Callable[['HttpRequest'], None]:
+    """
+    Wraps the incoming request processing to record its duration.
+    """
+
+    def timed_incoming(request: 'HttpRequest') -> None:
+        start = perf_counter()
+        incoming(request)
+        metrics.observe('django_guid_incoming_seconds', perf_counter() - start)
+
+    return timed_incoming
+
+
+def atimed(
+    aincoming: Callable[['HttpRequest'], Awaitable[None]], metrics: 'Metrics'
+) -> Callable[['HttpRequest'], Awaitable[None]]:
+    """
+    Wraps the async incoming request processing to record its duration.
+    """
+
+    async def timed_aincoming(request: 'HttpRequest') -> None:
+        start = perf_counter()
+        await aincoming(request)
+        metrics.observe('django_guid_incoming_seconds', perf_counter() - start)
+
+    return timed_aincoming
+
+
+def start_request_trace(request: 'HttpRequest', correlation_id: str) -> None:
+    """
+    Sets the Trace Context of a request, continuing the trace of its `traceparent` header if it had a valid one.
+    """
+    incoming = getattr(request, 'trace_parent', None)
+    tracestate = request.headers.get(TRACESTATE_HEADER) if incoming is not None else None
+    start_trace_context(correlation_id, incoming, tracestate)
+
+
+def add_trace_headers(response: 'HttpResponse') -> None:
+    """
+    Adds the `traceparent` header, with the span ID of the request, and the `tracestate` header to a response.
+    """
+    traceparent = trace_parent.get()
+    if traceparent:
+        response[TRACEPARENT_HEADER] = traceparent
+        tracestate = trace_state.get()
+        if tracestate:
+            response[TRACESTATE_HEADER] = tracestate
+
+
+def response_headers_handler(conf: 'SettingsSnapshot') -> Callable[['HttpResponse', 'HttpRequest'], None]:
+    """
+    Returns the function adding the GUID header, and the Trace Context headers if enabled, to a response.
+    """
+    return_header = conf.return_header
+    expose_header = conf.return_header and conf.expose_header
+    header_name = conf.guid_header_name
+    trace_context = conf.trace_context
+    exposed_headers = f'{header_name}, {TRACEPARENT_HEADER}' if trace_context else header_name
+
+    def add_response_headers(response: 'HttpResponse', request: 'HttpRequest') -> None:
+        if not return_header:
+            return
+        # When an application wrapper assigned the GUID, it also adds the GUID header
+        if get_wrapper_guid(request) is None:
+            response[header_name] = guid.get()  # Adds the GUID to the response header
+            if expose_header:
+                response['Access-Control-Expose-Headers'] = exposed_headers
+        if trace_context:
+            add_trace_headers(response)
+
+    return add_response_headers
+
+
+def stream_in_context(response: 'StreamingHttpResponse', cleanup: Optional[Callable[[], None]]) -> None:
+    """
+    Makes the content of a streaming response run in the request's context, and defers the integrations' tear down
+    until the response is closed, after its content has been sent.
+
+    The content is iterated by the server after the middleware has returned, so logs written while streaming would
+    otherwise depend on what the server's context holds by then. Each chunk is produced in a copy of the request's
+    context instead, by `Context.run`, which `map` calls without a Python-level frame per chunk.
+    """
+    # The raw iterator is wrapped, rather than `streaming_content`, which would convert each chunk to bytes twice and
+    # stop servers from sending file responses with `wsgi.file_wrapper`
+    context = copy_context()
+    response._iterator = map(context.run, repeat(next), repeat(response._iterator))
+    if cleanup is not None:
+        # The closers run when the response is closed, before Django sends `request_finished`
+        response._resource_closers.append(cleanup)
+
+
+def astream_in_context(
+    response: 'StreamingHttpResponse',
+    acleanup: Optional[Callable[[], Awaitable[None]]],
+    cleanup: Optional[Callable[[], None]],
+) -> None:
+    """
+    Defers the integrations' tear down until an async streaming response has been sent.
+
+    Async content is iterated in the request's task, so it already runs in the request's context. The tear down
+    is awaited when the content is exhausted, or run by the sync tear down if the response is closed before that,
+    e.g. when the client disconnects. Sync content is handled as in `stream_in_context`.
+    """
+    if not response.is_async:
+        return stream_in_context(response, cleanup)
+    if acleanup is None or cleanup is None:
+        return
+    pending = [True]
+
+    async def content(iterator: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in iterator:
+                yield chunk
+        finally:
+            if pending:
+                pending.clear()
+                await acleanup()
+
+    def close() -> None:
+        if pending:
+            pending.clear()
+            cleanup()
+
+    response._iterator = content(response._iterator)
+    response._resource_closers.append(close)
+
+
+def sync_hook(integration: 'Integration', method: str) -> Callable[..., None]:
+    """
+    Returns the sync `run` or `cleanup` method of an integration.
+
+    If the integration only implements the async counterpart, it is wrapped to run to completion instead, in a copy
+    of the request's context, so that as in the async middleware, changes it makes to context variables are lost.
+    """
+    if is_overridden(integration, method):
+        return getattr(integration, method)
+    run_to_completion = async_to_sync(getattr(integration, f'a{method}'))
+
+    def isolated_hook(**kwargs: Any) -> None:
+        copy_context().run(partial(run_to_completion, **kwargs))
+
+    return isolated_hook
+
+
+def middleware_integrations(
+    conf: 'SettingsSnapshot',
+) -> Tuple[Tuple['Integration', ...], Tuple['Integration', ...]]:
+    """
+    Returns the integrations to run in the middleware, and the subset of those that implement a tear down.
+    """
+    run_integrations = tuple(integration for integration in conf.integrations if integration.runs_in_middleware)
+    for integration in run_integrations:
+        if not (is_overridden(integration, 'run') or is_overridden(integration, 'arun')):
+            raise ImproperlyConfigured(f'The integration `{integration.identifier}` is missing a `run` method')
+        sync_cleanup = is_overridden(integration, 'cleanup') or not is_overridden(integration, 'acleanup')
+        if integration.runs_inline and not (is_overridden(integration, 'run') and sync_cleanup):
+            raise ImproperlyConfigured(
+                f'The integration `{integration.identifier}` runs inline, so it must implement the sync hooks'
+            )
+    cleanup_integrations = tuple(
+        integration
+        for integration in run_integrations
+        if is_overridden(integration, 'cleanup') or is_overridden(integration, 'acleanup')
+    )
+    return run_integrations, cleanup_integrations
+
+
+def split_hooks(integrations: Tuple['Integration', ...], method: str) -> Tuple[
+    Tuple[Tuple['Integration', Callable[..., None]], ...],
+    Tuple[Tuple['Integration', Callable[..., None]], ...],
+    Tuple['Integration', ...],
+]:
+    """
+    Splits integrations into those whose sync hook is called directly by the async middleware, those whose sync hook
+    is called in a worker thread, and those whose async hook is awaited.
+
+    Integrations with `runs_inline` set are called on the event loop, and integrations that don't implement the async
+    hook in a worker thread, both keeping the changes they make to context variables, as in the sync middleware.
+    Awaited hooks run concurrently, each in a copy of the request's context, so changes they make to context
+    variables are lost.
+    """
+    inline = []
+    offloaded = []
+    awaited = []
+    for integration in integrations:
+        if integration.runs_inline:
+            inline.append((integration, sync_hook(integration, method)))
+        elif not is_overridden(integration, f'a{method}'):
+            offloaded.append((integration, sync_hook(integration, method)))
+        else:
+            awaited.append(integration)
+    return tuple(inline), tuple(offloaded), tuple(awaited)
+
+
+def build_request_processors(conf: 'SettingsSnapshot') -> RequestProcessors:
+    """
+    Builds the request processing for the given settings, so no settings are looked up per request.
+
+    The IGNORE_URLS check is left out when no URLs are ignored, integrations that don't run in the middleware
+    or don't override `cleanup` are left out of the respective loops, and header names are resolved up front.
+    With TRACE_CONTEXT enabled, the request's Trace Context is set after its GUID, and echoed in the response.
+
+    The async processing calls the sync hooks of integrations that run inline, then those of the integrations that
+    don't implement the async hooks one after another in a worker thread, keeping their changes to context variables,
+    and then awaits the `arun` and `acleanup` hooks of the other integrations concurrently, each in its own task.
+    Integrations that only implement the async hooks are run to completion by the sync processing, in a copy of the
+    request's context.
+    For streaming responses, the tear down runs once the content has been sent.
     """
-    if not ignored_url(request=request):
+    check_ignored = bool(conf.ignore_url_matcher)
+    timeout = conf.integration_timeout
+    metrics = conf.metrics
+    log_integrations = 'integrations' in conf.log_events
+    run_message = 'Running integration: `%s`' if log_integrations else None
+    cleanup_message = 'Running tear down for integration: `%s`' if log_integrations else None
+    run_integrations, cleanup_integrations = middleware_integrations(conf)
+    sync_runs = tuple((integration, sync_hook(integration, 'run')) for integration in run_integrations)
+    sync_cleanups = tuple((integration, sync_hook(integration, 'cleanup')) for integration in cleanup_integrations)
+    inline_runs, offloaded_runs, awaited_runs = split_hooks(run_integrations, 'run')
+    inline_cleanups, offloaded_cleanups, awaited_cleanups = split_hooks(cleanup_integrations, 'cleanup')
+    trace_context = conf.trace_context
+    add_response_headers = response_headers_handler(conf)
+    cleanup = partial(call_integrations, sync_cleanups, 'cleanup', cleanup_message, metrics) if sync_cleanups else None
+
+    def incoming(request: 'HttpRequest') -> None:
+        if check_ignored and ignored_url(request=request):
+            return
+
         # Process request and store the GUID in a contextvar
-        guid.set(get_id_from_header(request))
+        correlation_id = get_id_from_header(request)
+        guid.set(correlation_id)
+        if trace_context:
+            start_request_trace(request, correlation_id)
 
         # Run all integrations
-        for integration in settings.integrations:
-            logger.debug('Running integration: `%s`', integration.identifier)
-            integration.run(guid=guid.get())
+        call_integrations(sync_runs, 'run', run_message, metrics, guid=correlation_id)
+
+    async def aincoming(request: 'HttpRequest') -> None:
+        if check_ignored and ignored_url(request=request):
+            return
+
+        correlation_id = get_id_from_header(request)
+        guid.set(correlation_id)
+        if trace_context:
+            start_request_trace(request, correlation_id)
+
+        # Run all integrations, the sync ones in a worker thread unless they run inline, and the async ones concurrently
+        call_integrations(inline_runs, 'run', run_message, metrics, guid=correlation_id)
+        await offload_integrations(offloaded_runs, 'run', run_message, metrics, timeout, guid=correlation_id)
+        await await_integrations(
+            [(integration, integration.arun(guid=correlation_id)) for integration in awaited_runs],
+            'run',
+            run_message,
+            metrics,
+            timeout,
+        )
+
+    def outgoing(response: 'HttpResponse', request: 'HttpRequest') -> None:
+        if check_ignored and ignored_url(request=request):
+            return
+
+        add_response_headers(response, request)
+
+        # Run tear down for all the integrations, once the content has been sent for streaming responses
+        if response.streaming:
+            stream_in_context(response, cleanup)
+        else:
+            call_integrations(sync_cleanups, 'cleanup', cleanup_message, metrics)
+
+    async def acleanup() -> None:
+        # Run tear down for all the integrations, as in `aincoming`
+        call_integrations(inline_cleanups, 'cleanup', cleanup_message, metrics)
+        await offload_integrations(offloaded_cleanups, 'cleanup', cleanup_message, metrics, timeout)
+        await await_integrations(
+            [(integration, integration.acleanup()) for integration in awaited_cleanups],
+            'cleanup',
+            cleanup_message,
+            metrics,
+            timeout,
+        )
+
+    async def aoutgoing(response: 'HttpResponse', request: 'HttpRequest') -> None:
+        if check_ignored and ignored_url(request=request):
+            return
+
+        add_response_headers(response, request)
+
+        if response.streaming:
+            astream_in_context(response, acleanup if sync_cleanups else None, cleanup)
+        else:
+            await acleanup()
+
+    if metrics is not None:
+        return RequestProcessors(conf, timed(incoming, metrics), outgoing, atimed(aincoming, metrics), aoutgoing)
+    return RequestProcessors(conf, incoming, outgoing, aincoming, aoutgoing)
+
+
+def get_request_processors() -> RequestProcessors:
+    """
+    Returns the request processing for the current settings, rebuilding it if the settings have changed.
+    """
+    global _request_processors
+    conf = settings.snapshot
+    processors = _request_processors
+    if processors is None or processors.conf is not conf:
+        processors = _request_processors = build_request_processors(conf)
+    return processors
+
+
+def process_incoming_request(request: 'HttpRequest') -> None:
+    """
+    Processes an incoming request. This function is called before the view and later middleware.
+    Same logic for both async and sync views.
+    """
+    get_request_processors().incoming(request)
 
 
 def process_outgoing_request(response: 'HttpResponse', request: 'HttpRequest') -> None:
     """
     Process an outgoing request. This function is called after the view and before later middleware.
     """
-    if not ignored_url(request=request):
-        if settings.return_header:
-            response[settings.guid_header_name] = guid.get()  # Adds the GUID to the response header
-            if settings.expose_header:
-                response['Access-Control-Expose-Headers'] = settings.guid_header_name
-
-        # Run tear down for all the integrations
-        for integration in settings.integrations:
-            logger.debug('Running tear down for integration: `%s`', integration.identifier)
-            integration.cleanup()
+    get_request_processors().outgoing(response, request)
 
 
 @sync_and_async_middleware
@@ -62,22 +504,27 @@ def guid_middleware(get_response: Callable) -> Callable:
     # One-time configuration and initialization.
     if not apps.is_installed('django_guid'):
         raise ImproperlyConfigured('django_guid must be in installed apps')
+    get_request_processors()  # Surface integration errors when the middleware is loaded
     # fmt: off
     if asyncio.iscoroutinefunction(get_response):
         async def middleware(request: 'HttpRequest') -> Union['HttpRequest', 'HttpResponse']:
-            logger.debug('async middleware called')
-            process_incoming_request(request=request)
+            processors = get_request_processors()
+            if 'middleware' in processors.conf.log_events:
+                logger.debug('async middleware called')
+            await processors.aincoming(request)
             # ^ Code above this line is executed before the view and later middleware
             response = await get_response(request)
-            process_outgoing_request(response=response, request=request)
+            await processors.aoutgoing(response, request)
             return response
     else:
         def middleware(request: 'HttpRequest') -> Union['HttpRequest', 'HttpResponse']:  # type: ignore
-            logger.debug('sync middleware called')
-            process_incoming_request(request=request)
+            processors = get_request_processors()
+            if 'middleware' in processors.conf.log_events:
+                logger.debug('sync middleware called')
+            processors.incoming(request)
             # ^ Code above this line is executed before the view and later middleware
             response = get_response(request)
-            process_outgoing_request(response=response, request=request)
+            processors.outgoing(response, request)
             return response
     # fmt: on
     return middleware
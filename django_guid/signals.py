@@ -3,8 +3,11 @@ from typing import Any, Optional
 
 from django.core.signals import request_finished
 from django.dispatch import receiver
+from django.test.signals import setting_changed
 
+from django_guid.config import settings
 from django_guid.context import guid
+from django_guid.trace_context import clear_trace_context
 
 logger = logging.getLogger('django_guid')
 
@@ -23,5 +26,24 @@ def clear_guid(sender: Optional[dict], **kwargs: Any) -> None:
         must be able to handle those new arguments.
     :return: None
     """
-    logger.debug('Received signal `request_finished`, clearing guid')
+    conf = settings.snapshot
+    if 'context' in conf.log_events:
+        logger.debug('Received signal `request_finished`, clearing guid')
     guid.set(None)
+    if conf.trace_context:
+        clear_trace_context()
+
+
+@receiver(setting_changed)
+def reload_settings(sender: Optional[dict], setting: str, **kwargs: Any) -> None:
+    """
+    Receiver function for when a Django setting is changed, e.g. through `override_settings`.
+
+    Rebuilds the precomputed settings snapshot whenever `DJANGO_GUID` changes.
+
+    :param sender: The sender of the signal.
+    :param setting: The name of the changed setting.
+    :return: None
+    """
+    if setting == 'DJANGO_GUID':
+        settings.reload()
@@ -0,0 +1,131 @@
+import os
+from typing import NamedTuple, Optional
+
+from django_guid.context import trace_parent, trace_state
+
+TRACEPARENT_HEADER = 'traceparent'
+TRACESTATE_HEADER = 'tracestate'
+
+# Version 00 of the traceparent header: `00-<32 hex trace-id>-<16 hex parent-id>-<2 hex trace-flags>`
+TRACEPARENT_LENGTH = 55
+_HEX_DIGITS = '0123456789abcdef'
+_INVALID_TRACE_ID = '0' * 32
+_INVALID_SPAN_ID = '0' * 16
+
+
+class TraceParent(NamedTuple):
+    """
+    The fields of a `traceparent` header.
+    """
+
+    version: str
+    trace_id: str
+    parent_id: str
+    trace_flags: str
+
+
+def is_hex(value: str) -> bool:
+    """
+    Checks that a string only contains lowercase hex digits.
+
+    `str.strip` stops at the first character not in the given set, so only an all-hex string is stripped completely.
+    This is faster than checking each character against a set.
+    """
+    return not value.strip(_HEX_DIGITS)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[TraceParent]:
+    """
+    Parses a `traceparent` header, reading each field at its fixed offset.
+
+    Versions after 00 may append fields, which are ignored, as the specification requires.
+
+    :param value: Header value, or None if the header is missing
+    :return: TraceParent, or None if the header is missing or invalid
+    """
+    if not value or len(value) < TRACEPARENT_LENGTH:
+        return None
+    if len(value) > TRACEPARENT_LENGTH:
+        if value[TRACEPARENT_LENGTH] != '-' or value.startswith('00'):
+            return None
+        value = value[:TRACEPARENT_LENGTH]
+    if value[2] != '-' or value[35] != '-' or value[52] != '-':
+        return None
+    # The other 52 characters must be lowercase hex digits: 26 bytes, once decoded
+    digits = value.replace('-', '')
+    try:
+        if len(digits) != 52 or len(bytes.fromhex(digits)) != 26 or digits.lower() != digits:
+            return None
+    except ValueError:
+        return None
+    version = value[:2]
+    trace_id = value[3:35]
+    parent_id = value[36:52]
+    if version == 'ff' or trace_id == _INVALID_TRACE_ID or parent_id == _INVALID_SPAN_ID:
+        return None
+    return TraceParent(version, trace_id, parent_id, value[53:])
+
+
+def format_traceparent(trace_id: str, parent_id: str, trace_flags: str) -> str:
+    """
+    Formats a version 00 `traceparent` header.
+    """
+    return f'00-{trace_id}-{parent_id}-{trace_flags}'
+
+
+def new_span_id() -> str:
+    """
+    Generates a random 16 hex digit span ID.
+    """
+    span_id = os.urandom(8).hex()
+    while span_id == _INVALID_SPAN_ID:  # pragma: no cover
+        span_id = os.urandom(8).hex()
+    return span_id
+
+
+def trace_id_from_guid(guid: str) -> Optional[str]:
+    """
+    Returns the trace-id for a GUID. GUIDs in the `hex` and `string` UUID formats are valid trace-ids.
+
+    :param guid: GUID
+    :return: Trace-id, or None if the GUID can't be used as one, e.g. ULIDs or trimmed UUIDs
+    """
+    if len(guid) == 36 and guid[8] == guid[13] == guid[18] == guid[23] == '-':
+        guid = guid.replace('-', '')
+    if len(guid) != 32 or guid == _INVALID_TRACE_ID or not is_hex(guid):
+        return None
+    return guid
+
+
+def start_trace_context(guid: str, incoming: Optional[TraceParent], tracestate: Optional[str]) -> Optional[str]:
+    """
+    Sets the Trace Context of a request or task, with a new span ID.
+
+    The trace-id and trace-flags of the incoming `traceparent` are kept. Without one, the GUID is used as the
+    trace-id, and the trace is not sampled.
+
+    :param guid: GUID of the request or task
+    :param incoming: Parsed incoming `traceparent` header, if any
+    :param tracestate: Incoming `tracestate` header, passed on as is
+    :return: The `traceparent` header for responses and published tasks, or None if the GUID isn't a valid trace-id
+    """
+    trace_id: Optional[str]
+    if incoming is not None:
+        trace_id, trace_flags = incoming.trace_id, incoming.trace_flags
+    else:
+        trace_id, trace_flags, tracestate = trace_id_from_guid(guid), '00', None
+    if trace_id is None:
+        clear_trace_context()
+        return None
+    traceparent = format_traceparent(trace_id, new_span_id(), trace_flags)
+    trace_parent.set(traceparent)
+    trace_state.set(tracestate or None)
+    return traceparent
+
+
+def clear_trace_context() -> None:
+    """
+    Clears the Trace Context of the current request or task.
+    """
+    trace_parent.set(None)
+    trace_state.set(None)
@@ -1,8 +1,13 @@
 import logging
-import uuid
-from typing import TYPE_CHECKING, Optional, Union
+import re
+from typing import TYPE_CHECKING, Any, List, Optional, Union
 
-from django_guid.config import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from django_guid.config import TIME_ORDERED_FORMATS, settings
+from django_guid.generators import pool, ulid, uuid7_hex
+from django_guid.trace_context import TRACEPARENT_HEADER, TraceParent, parse_traceparent
+from django_guid.validation import MAX_GUID_LENGTH
 
 if TYPE_CHECKING:
     from django.http import HttpRequest, HttpResponse
@@ -10,6 +15,13 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger('django_guid')
 
+ALNUM_OR_DASH_PATTERN = re.compile(r'(?:[^\W_]|-)*')
+
+# Keys under which the application wrappers store the request's GUID, and its parsed `traceparent` header when
+# TRACE_CONTEXT is enabled, in the ASGI scope or WSGI environ
+WRAPPER_GUID_KEY = 'django_guid.correlation_id'
+WRAPPER_TRACEPARENT_KEY = 'django_guid.trace_parent'
+
 
 def get_correlation_id_from_header(request: 'HttpRequest') -> str:
     """
@@ -17,67 +29,244 @@ def get_correlation_id_from_header(request: 'HttpRequest') -> str:
     :param request: HttpRequest object
     :return: GUID
     """
-    given_guid: str = str(request.headers.get(settings.guid_header_name))
-    if not settings.validate_guid:
-        logger.debug('Returning ID from header without validating it as a GUID')
+    return correlation_id_from_header_value(str(request.headers.get(settings.snapshot.guid_header_name)))
+
+
+def correlation_id_from_header_value(given_guid: str) -> str:
+    """
+    Returns either the provided GUID or a new one depending on if the provided GUID is valid or not.
+    :param given_guid: Value of the GUID header
+    :return: GUID
+    """
+    conf = settings.snapshot
+    metrics = conf.metrics
+    if not conf.validate_guid:
+        if 'header' in conf.log_events:
+            logger.debug('Returning ID from header without validating it as a GUID')
+        if metrics is not None:
+            metrics.increment('django_guid_request_ids_total', 'unvalidated')
         return given_guid
     elif validate_guid(given_guid):
-        logger.debug('%s is a valid GUID', given_guid)
+        if 'header' in conf.log_events:
+            logger.debug('%s is a valid GUID', given_guid)
+        if metrics is not None:
+            metrics.increment('django_guid_request_ids_total', 'valid')
         return given_guid
     else:
+        if metrics is not None:
+            metrics.increment('django_guid_request_ids_total', 'invalid')
         new_guid = generate_guid()
-        if all(letter.isalnum() or letter == '-' for letter in given_guid):
-            logger.warning('%s is not a valid GUID. New GUID is %s', given_guid, new_guid)
+        warnings = conf.invalid_header_warnings
+        if len(given_guid) > MAX_GUID_LENGTH:
+            warnings.warning(
+                'oversized',
+                'Oversized %s provided (%s characters). New GUID is %s',
+                conf.guid_header_name,
+                len(given_guid),
+                new_guid,
+            )
+        elif ALNUM_OR_DASH_PATTERN.fullmatch(given_guid):
+            warnings.warning('invalid', '%s is not a valid GUID. New GUID is %s', given_guid, new_guid)
         else:
-            logger.warning('Non-alnum %s provided. New GUID is %s', settings.guid_header_name, new_guid)
+            warnings.warning('non-alnum', 'Non-alnum %s provided. New GUID is %s', conf.guid_header_name, new_guid)
         return new_guid
 
 
+def guid_from_header_value(header: Optional[str]) -> str:
+    """
+    Returns the GUID to use for a request, given the value of its GUID header.
+    If the header has a value, we attempt to validate the contents as GUID.
+    If no header is found, we generate a GUID to be injected instead.
+    :param header: Value of the GUID header, or None if the header is missing
+    :return: GUID
+    """
+    conf = settings.snapshot
+    if header:
+        if 'header' in conf.log_events:
+            logger.info('%s found in the header', conf.guid_header_name)
+        return correlation_id_from_header_value(header)
+    guid = generate_guid()
+    if conf.metrics is not None:
+        conf.metrics.increment('django_guid_request_ids_total', 'generated')
+    if 'header' in conf.log_events:
+        logger.info(
+            'Header `%s` was not found in the incoming request. Generated new GUID: %s', conf.guid_header_name, guid
+        )
+    return guid
+
+
+def guid_from_trace_parent(trace_parent: TraceParent) -> str:
+    """
+    Returns the GUID to use for a request with a valid `traceparent` header, which is the header's trace-id.
+    :param trace_parent: Parsed `traceparent` header
+    :return: GUID
+    """
+    conf = settings.snapshot
+    if 'header' in conf.log_events:
+        logger.info('Using the trace-id of the %s header as GUID', TRACEPARENT_HEADER)
+    if conf.metrics is not None:
+        conf.metrics.increment('django_guid_request_ids_total', 'valid')
+    return trace_parent.trace_id
+
+
+def adopted_guid(correlation_id: str) -> str:
+    """
+    Returns the ID an integration adopts as the GUID of a request instead of the one resolved from its headers,
+    e.g. the trace-id of the active OpenTelemetry span. The first integration returning an ID wins.
+    :param correlation_id: GUID resolved from the request's headers
+    :return: GUID
+    """
+    for adopt_guid in settings.snapshot.guid_adopters:
+        adopted = adopt_guid(correlation_id)
+        if adopted:
+            return adopted
+    return correlation_id
+
+
+def get_wrapper_value(request: 'HttpRequest', key: str) -> Any:
+    """
+    Returns a value stored by the ASGI or WSGI application wrapper, in the request's scope or environ.
+    :param request: HttpRequest object
+    :param key: WRAPPER_GUID_KEY or WRAPPER_TRACEPARENT_KEY
+    :return: The value, or None if the wrapper didn't store one
+    """
+    scope = getattr(request, 'scope', None)
+    if scope is not None:
+        return scope.get(key)
+    return request.META.get(key)
+
+
+def get_wrapper_guid(request: 'HttpRequest') -> Optional[str]:
+    """
+    Returns the GUID assigned to the request by the ASGI or WSGI application wrapper, if any.
+    :param request: HttpRequest object
+    :return: GUID or None
+    """
+    return get_wrapper_value(request, WRAPPER_GUID_KEY)
+
+
 def get_id_from_header(request: 'HttpRequest') -> str:
     """
     Checks if the request contains the header specified in the Django settings.
     If it does, we fetch the header and attempt to validate the contents as GUID.
     If no header is found, we generate a GUID to be injected instead.
+    If an application wrapper already assigned a GUID to the request, that GUID is used.
+    With the TRACE_CONTEXT setting enabled, the trace-id of a valid `traceparent` header is used before the GUID header.
+    Integrations overriding `adopt_guid` may replace the GUID before it is returned.
     :param request: HttpRequest object
     :return: GUID
     """
-    header: str = request.headers.get(settings.guid_header_name)  # Case insensitive headers.get added in Django2.2
-    if header:
-        logger.info('%s found in the header', settings.guid_header_name)
-        request.correlation_id = get_correlation_id_from_header(request)
+    conf = settings.snapshot
+    wrapper_guid = get_wrapper_guid(request)
+    if wrapper_guid is not None:
+        # The outcome was already counted in the metrics when the wrapper read the headers
+        if 'header' in conf.log_events:
+            logger.debug('Using GUID %s assigned by the application wrapper', wrapper_guid)
+        if conf.trace_context:
+            request.trace_parent = get_wrapper_value(request, WRAPPER_TRACEPARENT_KEY)
+        request.correlation_id = wrapper_guid
+        return wrapper_guid
+    trace_parent = None
+    if conf.trace_context:
+        trace_parent = request.trace_parent = parse_traceparent(request.headers.get(TRACEPARENT_HEADER))
+    if trace_parent is not None:
+        correlation_id = guid_from_trace_parent(trace_parent)
     else:
-        request.correlation_id = generate_guid()
-        logger.info(
-            'Header `%s` was not found in the incoming request. Generated new GUID: %s',
-            settings.guid_header_name,
-            request.correlation_id,
-        )
-    return request.correlation_id
+        header: Optional[str] = request.headers.get(conf.guid_header_name)  # Case insensitive
+        correlation_id = guid_from_header_value(header)
+    if conf.guid_adopters:
+        correlation_id = adopted_guid(correlation_id)
+    request.correlation_id = correlation_id
+    return correlation_id
 
 
 def ignored_url(request: Union['HttpRequest', 'HttpResponse']) -> bool:
     """
-    Checks if the current URL is defined in the `IGNORE_URLS` setting.
+    Checks if the current URL matches a rule in the `IGNORE_URLS` setting.
+
+    The result is cached on the request, so the outgoing phase of the middleware doesn't match the path again.
 
     :return: Boolean
     """
-    return request.get_full_path().strip('/') in settings.ignore_urls
+    try:
+        return request._django_guid_ignored
+    except AttributeError:
+        ignored = settings.snapshot.ignore_url_matcher(request.path_info)
+        request._django_guid_ignored = ignored
+        return ignored
+
+
+def format_uuid_hex(uuid_hex: str) -> str:
+    """
+    Formats a 32 character UUID hex as a 36 character UUID string.
+    """
+    return f'{uuid_hex[:8]}-{uuid_hex[8:12]}-{uuid_hex[12:16]}-{uuid_hex[16:20]}-{uuid_hex[20:]}'
+
+
+def new_guid(uuid_format: str) -> str:
+    """
+    Generates a full length GUID in the given UUID_FORMAT.
+    """
+    if uuid_format == 'hex':
+        return pool.uuid4_hex()
+    elif uuid_format == 'string':
+        return format_uuid_hex(pool.uuid4_hex())
+    elif uuid_format == 'uuidv7':
+        return format_uuid_hex(uuid7_hex())
+    elif uuid_format == 'ulid':
+        return ulid()
+    # Settings changed at runtime, e.g. with `override_settings`, aren't validated
+    raise ImproperlyConfigured('UUID_FORMAT must be one of hex, string, uuidv7 or ulid')
+
+
+def check_truncation(uuid_format: str, length: int) -> None:
+    """
+    Raises a ValueError if IDs of the given format can't be shortened, because only their timestamp would be kept.
+    """
+    if uuid_format in TIME_ORDERED_FORMATS:
+        raise ValueError(
+            f'{uuid_format} IDs can not be shortened to {length} characters, as they start with a timestamp'
+        )
 
 
 def generate_guid(uuid_length: Optional[int] = None) -> str:
     """
-    Generates an UUIDv4/GUID as a string.
+    Generates a GUID as a string, in the format given by the UUID_FORMAT setting.
 
     :return: GUID
     """
-    if settings.uuid_format == 'string':
-        guid = str(uuid.uuid4())
+    conf = settings.snapshot
+    guid = new_guid(conf.uuid_format)
+    length = conf.uuid_length if uuid_length is None else uuid_length
+    if length >= len(guid):
+        return guid
+    check_truncation(conf.uuid_format, length)
+    return guid[:length]
+
+
+def generate_guids(count: int, uuid_length: Optional[int] = None) -> List[str]:
+    """
+    Generates `count` GUIDs as strings. For UUIDv4 formats, the required entropy is read in a single call.
+
+    Useful for batch jobs, where calling `generate_guid` in a loop would make one `os.urandom` call per ID.
+
+    :param count: Number of GUIDs to generate
+    :param uuid_length: Optional length of the GUIDs, defaults to the `UUID_LENGTH` setting
+    :return: List of GUIDs
+    """
+    conf = settings.snapshot
+    if conf.uuid_format == 'hex':
+        guids = pool.uuid4_hexes(count)
+    elif conf.uuid_format == 'string':
+        guids = [format_uuid_hex(guid) for guid in pool.uuid4_hexes(count)]
     else:
-        guid = uuid.uuid4().hex
+        guids = [new_guid(conf.uuid_format) for _ in range(count)]
 
-    if uuid_length is None:
-        return guid[: settings.uuid_length]
-    return guid[:uuid_length]
+    length = conf.uuid_length if uuid_length is None else uuid_length
+    if guids and length < len(guids[0]):
+        check_truncation(conf.uuid_format, length)
+        return [guid[:length] for guid in guids]
+    return guids
 
 
 def validate_guid(original_guid: str) -> bool:
@@ -87,7 +276,4 @@ def validate_guid(original_guid: str) -> bool:
     :param original_guid: string to validate
     :return: bool
     """
-    try:
-        return bool(uuid.UUID(original_guid, version=4).hex)
-    except ValueError:
-        return False
+    return settings.snapshot.guid_validator(original_guid)
@@ -0,0 +1,62 @@
+import re
+from collections import OrderedDict
+from typing import Optional
+
+# Longest accepted GUID, a UUID string with a `urn:uuid:` prefix. Anything longer is rejected without being scanned.
+MAX_GUID_LENGTH = 45
+
+
+def _uuid_pattern(group: int) -> str:
+    """
+    Returns a pattern matching a UUID with either no dashes or all four, captured by the given group number.
+    """
+    dash = rf'\{group}'
+    return rf'[0-9a-f]{{8}}(-?)[0-9a-f]{{4}}{dash}[0-9a-f]{{4}}{dash}[0-9a-f]{{4}}{dash}[0-9a-f]{{12}}'
+
+
+UUID_PATTERN = re.compile(rf'(?:urn:uuid:)?{_uuid_pattern(1)}|\{{{_uuid_pattern(2)}\}}', re.IGNORECASE)
+ULID_PATTERN = re.compile(r'[0-7][0-9A-HJKMNP-TV-Z]{25}', re.IGNORECASE)
+
+
+class GUIDValidator:
+    """
+    Validates incoming GUIDs.
+
+    Accepts UUIDs as 32 hex characters or dashed strings, optionally wrapped in braces or prefixed with `urn:uuid:`,
+    and ULIDs when `accept_ulid` is True. Input is rejected on length before any pattern is run.
+
+    With a positive `cache_size`, recently accepted GUIDs are kept in a bounded LRU cache. Upstream services often
+    reuse a GUID across many requests, and a cache hit skips the pattern match. Rejected input is never cached,
+    so invalid input can't evict valid GUIDs.
+    """
+
+    __slots__ = ('accept_ulid', 'cache_size', 'cache')
+
+    def __init__(self, accept_ulid: bool = False, cache_size: int = 0) -> None:
+        self.accept_ulid = accept_ulid
+        self.cache_size = cache_size
+        self.cache: Optional[OrderedDict] = OrderedDict() if cache_size > 0 else None
+
+    def __call__(self, value: str) -> bool:
+        """
+        Returns True if the value is a valid GUID.
+        """
+        if len(value) > MAX_GUID_LENGTH:
+            return False
+        cache = self.cache
+        if cache is not None and value in cache:
+            try:
+                cache.move_to_end(value)
+            except KeyError:  # pragma: no cover - evicted by another thread
+                pass
+            return True
+        if UUID_PATTERN.fullmatch(value) is None and not (self.accept_ulid and ULID_PATTERN.fullmatch(value)):
+            return False
+        if cache is not None:
+            cache[value] = None
+            if len(cache) > self.cache_size:
+                try:
+                    cache.popitem(last=False)
+                except KeyError:  # pragma: no cover - evicted by another thread
+                    pass
+        return True
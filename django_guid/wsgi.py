@@ -0,0 +1,69 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django_guid.config import settings
+from django_guid.context import guid
+from django_guid.trace_context import TRACEPARENT_HEADER, parse_traceparent
+from django_guid.utils import (
+    WRAPPER_GUID_KEY,
+    WRAPPER_TRACEPARENT_KEY,
+    adopted_guid,
+    guid_from_header_value,
+    guid_from_trace_parent,
+)
+
+if TYPE_CHECKING:
+    Headers = List[Tuple[str, str]]
+    StartResponse = Callable[..., Callable[[bytes], object]]
+    WSGIApp = Callable[[Dict[str, Any], StartResponse], Iterable[bytes]]
+
+# Key of the `traceparent` header in the WSGI environ
+TRACEPARENT_KEY = 'HTTP_' + TRACEPARENT_HEADER.upper()
+
+
+def guid_wsgi_middleware(app: 'WSGIApp') -> 'WSGIApp':
+    """
+    Wraps a WSGI application, assigning the GUID before Django's handler runs.
+
+    The correlation header is read straight from the WSGI environ, so everything Django does before the middleware
+    chain, like `request_started` receivers and early exception logs, gets the GUID too. The GUID is added to the
+    response headers in `start_response`. Can be used with or without `guid_middleware`; the middleware reuses the
+    GUID assigned here. Like with the middleware, the GUID is cleared when Django sends `request_finished`.
+    With TRACE_CONTEXT enabled, the trace-id of a valid `traceparent` header is used as the GUID, and the parsed
+    header is kept in the environ, for the middleware to continue the trace.
+
+    Usage, in wsgi.py:
+
+        application = guid_wsgi_middleware(get_wsgi_application())
+    """
+
+    def guid_app(environ: Dict[str, Any], start_response: 'StartResponse') -> Iterable[bytes]:
+        conf = settings.snapshot
+        if conf.ignore_url_matcher(environ.get('PATH_INFO', '')):
+            return app(environ, start_response)
+
+        trace_parent = parse_traceparent(environ.get(TRACEPARENT_KEY)) if conf.trace_context else None
+        if trace_parent is not None:
+            correlation_id = guid_from_trace_parent(trace_parent)
+            environ[WRAPPER_TRACEPARENT_KEY] = trace_parent
+        else:
+            correlation_id = guid_from_header_value(environ.get(conf.wsgi_header_key))
+        if conf.guid_adopters:
+            correlation_id = adopted_guid(correlation_id)
+        environ[WRAPPER_GUID_KEY] = correlation_id
+        guid.set(correlation_id)
+
+        if not conf.return_header:
+            return app(environ, start_response)
+
+        response_headers = [(conf.guid_header_name, correlation_id)]
+        if conf.expose_header:
+            exposed = f'{conf.guid_header_name}, {TRACEPARENT_HEADER}' if conf.trace_context else conf.guid_header_name
+            response_headers.append(('Access-Control-Expose-Headers', exposed))
+
+        def start_response_with_guid(status: str, headers: 'Headers', exc_info: Optional[Any] = None) -> Any:
+            headers.extend(response_headers)
+            return start_response(status, headers, exc_info)
+
+        return app(environ, start_response_with_guid)
+
+    return guid_app
@@ -1,17 +1,12 @@
-import uuid
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
 
 import pytest
 
 
 @pytest.fixture
 def mock_uuid(monkeypatch):
-    class MockUUid:
-        hex = '704ae5472cae4f8daa8f2cc5a5a8mock'
-
-        def __str__(self):
-            return f'{self.hex[:8]}-{self.hex[8:12]}-{self.hex[12:16]}-{self.hex[16:20]}-{self.hex[20:]}'
-
-    monkeypatch.setattr('django_guid.utils.uuid.uuid4', MockUUid)
+    monkeypatch.setattr('django_guid.utils.pool.uuid4_hex', lambda: '704ae5472cae4f8daa8f2cc5a5a8mock')
 
 
 @pytest.fixture
@@ -21,14 +16,23 @@ def two_unique_uuid4():
 
 @pytest.fixture
 def mock_uuid_two_unique(mocker, two_unique_uuid4):
-    mocker.patch.object(
-        uuid.UUID,
-        'hex',
-        new_callable=mocker.PropertyMock,
-        side_effect=two_unique_uuid4,
-    )
+    mocker.patch('django_guid.utils.pool.uuid4_hex', side_effect=two_unique_uuid4)
 
 
 @pytest.fixture(autouse=True)
 def integrations(settings):
-    settings.DJANGO_GUID['INTEGRATIONS'] = []
+    # Assign a new dict, rather than mutating the existing one, so `setting_changed` rebuilds the settings snapshot
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': []}
+
+
+@pytest.fixture
+def keep_connections():
+    """
+    Disconnects `close_old_connections` like Django's test client does, so requests that aren't sent through the
+    test client don't touch database connections left open by earlier tests.
+    """
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    yield
+    request_started.connect(close_old_connections)
+    request_finished.connect(close_old_connections)
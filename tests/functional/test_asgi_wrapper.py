@@ -0,0 +1,130 @@
+import logging
+
+from django.core.asgi import get_asgi_application
+from django.core.signals import request_started
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+
+from django_guid.asgi import guid_asgi_middleware
+from django_guid.context import guid
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+TRACEPARENT = f'00-{TRACE_ID}-00f067aa0ba902b7-01'
+
+
+async def request(path, headers=()):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), *headers],
+        'client': ('127.0.0.1', 1234),
+        'server': ('testserver', 80),
+    }
+    communicator = ApplicationCommunicator(guid_asgi_middleware(get_asgi_application()), scope)
+    await communicator.send_input({'type': 'http.request', 'body': b''})
+    start = await communicator.receive_output(timeout=5)
+    body = await communicator.receive_output(timeout=5)
+    await communicator.wait(timeout=5)
+    return start, body
+
+
+def response_headers(start, name):
+    return [value.decode() for key, value in start['headers'] if key.decode().lower() == name.lower()]
+
+
+@pytest.fixture
+def early_log():
+    """
+    Logs from a `request_started` receiver, which runs before the middleware chain.
+    """
+
+    def receiver(**kwargs):
+        logging.getLogger('django_guid').info('Request started')
+
+    request_started.connect(receiver)
+    yield
+    request_started.disconnect(receiver)
+
+
+async def test_guid_from_header(caplog, early_log):
+    start, body = await request('/', headers=[(b'correlation-id', GUID.encode())])
+    assert start['status'] == 200
+    assert response_headers(start, 'Correlation-ID') == [GUID]
+    assert response_headers(start, 'Access-Control-Expose-Headers') == ['Correlation-ID']
+    records = [(x.message, x.correlation_id) for x in caplog.records]
+    assert ('Request started', GUID) in records
+    assert ('This log message should have a GUID', GUID) in records
+    assert guid.get() is None
+
+
+async def test_generated_guid(caplog, mock_uuid):
+    start, body = await request('/')
+    assert response_headers(start, 'Correlation-ID') == ['704ae5472cae4f8daa8f2cc5a5a8mock']
+    assert ('This log message should have a GUID', '704ae5472cae4f8daa8f2cc5a5a8mock') in [
+        (x.message, x.correlation_id) for x in caplog.records
+    ]
+
+
+async def test_invalid_guid_is_replaced(mock_uuid):
+    start, body = await request('/', headers=[(b'correlation-id', b'bad-guid')])
+    assert response_headers(start, 'Correlation-ID') == ['704ae5472cae4f8daa8f2cc5a5a8mock']
+
+
+async def test_ignored_url(caplog):
+    start, body = await request('/no-guid', headers=[(b'correlation-id', GUID.encode())])
+    assert response_headers(start, 'Correlation-ID') == []
+    assert all(x.correlation_id is None for x in caplog.records)
+
+
+async def test_no_return_header(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'RETURN_HEADER': False}
+    start, body = await request('/', headers=[(b'correlation-id', GUID.encode())])
+    assert response_headers(start, 'Correlation-ID') == []
+
+
+async def test_non_http_scope_is_passed_through():
+    scopes = []
+
+    async def app(scope, receive, send):
+        scopes.append(scope)
+
+    await guid_asgi_middleware(app)({'type': 'lifespan'}, None, None)
+    assert scopes == [{'type': 'lifespan'}]
+
+
+async def test_without_middleware(settings, caplog):
+    settings.MIDDLEWARE = [m for m in settings.MIDDLEWARE if m != 'django_guid.middleware.guid_middleware']
+    start, body = await request('/', headers=[(b'correlation-id', GUID.encode())])
+    assert response_headers(start, 'Correlation-ID') == [GUID]
+    assert ('This log message should have a GUID', GUID) in [(x.message, x.correlation_id) for x in caplog.records]
+
+
+async def test_trace_context(settings, caplog):
+    """
+    With TRACE_CONTEXT enabled, the wrapper uses the trace-id of the `traceparent` header as the GUID, and the
+    middleware continues its trace.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'TRACE_CONTEXT': True}
+    start, body = await request(
+        '/',
+        headers=[
+            (b'traceparent', TRACEPARENT.encode()),
+            (b'tracestate', b'vendor=1'),
+            (b'correlation-id', GUID.encode()),
+        ],
+    )
+    assert response_headers(start, 'Correlation-ID') == [TRACE_ID]
+    assert response_headers(start, 'Access-Control-Expose-Headers') == ['Correlation-ID, traceparent']
+    (traceparent,) = response_headers(start, 'traceparent')
+    assert traceparent.startswith(f'00-{TRACE_ID}-') and traceparent.endswith('-01')
+    assert response_headers(start, 'tracestate') == ['vendor=1']
+    assert ('This log message should have a GUID', TRACE_ID) in [(x.message, x.correlation_id) for x in caplog.records]
@@ -74,3 +74,12 @@ async def test_ignored_url(async_client, caplog, monkeypatch):
             ('Received signal `request_finished`, clearing guid', None),
         ]
         assert [(x.message, x.correlation_id) for x in caplog.records] == expected
+
+
+async def test_trace_context(async_client, settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'TRACE_CONTEXT': True}
+    response = await async_client.get(
+        '/asgi', headers={'traceparent': '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'}
+    )
+    assert response['Correlation-ID'] == '4bf92f3577b34da6a3ce929d0e0e4736'
+    assert response['traceparent'].startswith('00-4bf92f3577b34da6a3ce929d0e0e4736-')
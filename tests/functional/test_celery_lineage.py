@@ -0,0 +1,125 @@
+import logging
+import time
+
+import pytest
+from celery import Celery
+from celery.contrib.testing.worker import start_worker
+from celery.signals import before_task_publish
+
+from django_guid import clear_guid, get_guid, set_guid
+from django_guid.integrations import CeleryIntegration
+from django_guid.integrations.celery.lineage import Lineage, get_lineage
+from django_guid.integrations.celery.log_filters import CeleryTracing
+from django_guid.integrations.celery.stamping import stamp_canvas
+
+app = Celery('django_guid_lineage_tests', broker='memory://', backend='cache+memory://')
+app.conf.broker_transport_options = {'polling_interval': 0.01}
+app.conf.task_default_queue = 'django_guid_lineage_tests'
+seen = []
+
+
+@app.task
+def spawn(levels):
+    seen.append((get_guid(), get_lineage()))
+    if levels:
+        spawn.delay(levels - 1)
+
+
+@app.task
+def spawn_eager(levels):
+    seen.append((get_guid(), get_lineage()))
+    if levels:
+        stamp_canvas(spawn_eager.s(levels - 1)).apply()
+
+
+@pytest.fixture(scope='module')
+def worker():
+    # Stopping the worker takes a few seconds, so it's shared by the tests in this module
+    with start_worker(app, pool='solo', perform_ping_check=False) as worker:
+        yield worker
+
+
+def wait_for(count):
+    for _ in range(500):
+        if len(seen) >= count:
+            return
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def celery_integration(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [CeleryIntegration(log_parent=True)]}
+    seen.clear()
+    yield
+    clear_guid()
+
+
+def assert_tree(tasks, guid):
+    """
+    Checks that the tasks form a chain, from the root down.
+    """
+    root = tasks[0][1]
+    assert root == Lineage(root.current, None, root.current, 0)
+    for depth, (task_guid, lineage) in enumerate(tasks):
+        assert task_guid == guid
+        assert lineage.root == root.current
+        assert lineage.depth == depth
+        if depth:
+            assert lineage.parent == tasks[depth - 1][1].current
+
+
+def test_lineage_through_the_broker(worker):
+    """
+    Tasks published by tasks, through the in-memory broker, extend the lineage of the publishing task.
+    """
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    spawn.delay(3)
+    wait_for(4)
+    assert_tree(seen, '704ae5472cae4f8daa8f2cc5a5a8mock')
+
+
+def test_lineage_in_eager_mode():
+    """
+    Eager tasks don't publish messages, so the lineage is passed on through the stamps of a stamped signature.
+    """
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    stamp_canvas(spawn_eager.s(3)).apply()
+    assert_tree(seen, '704ae5472cae4f8daa8f2cc5a5a8mock')
+
+
+def test_header_size_is_fixed(worker):
+    """
+    The lineage header only carries the root, the publishing task's ID and its depth, whatever the depth.
+    """
+    sizes = set()
+
+    def record_size(headers, **kwargs):
+        if 'CELERY_LINEAGE' in headers:
+            sizes.add(len(headers['CELERY_LINEAGE']))
+
+    before_task_publish.connect(record_size, weak=False)
+    try:
+        spawn.delay(20)
+        wait_for(21)
+    finally:
+        before_task_publish.disconnect(record_size)
+    assert len(seen) == 21
+    assert seen[-1][1].depth == 20
+    assert len(sizes) == 1
+
+
+def test_log_filter_sets_lineage_fields():
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    records = []
+
+    @app.task
+    def log():
+        record = logging.LogRecord('test', logging.INFO, __file__, 1, 'message', None, None)
+        CeleryTracing().filter(record)
+        records.append(record)
+
+    stamp_canvas(log.s()).apply()
+    (record,) = records
+    assert record.celery_root_id == record.celery_current_id
+    assert record.celery_parent_id is None
+    assert record.celery_depth == 0
@@ -0,0 +1,84 @@
+import pytest
+from celery import Celery, group
+
+from django_guid import clear_guid, get_guid, set_guid
+from django_guid.integrations import CeleryIntegration
+from django_guid.integrations.celery.context import celery_current
+from django_guid.integrations.celery.stamping import CorrelationIdStamper, stamp_canvas
+
+app = Celery('django_guid_tests', broker='memory://')
+seen = []
+
+
+@app.task
+def record_guid(i):
+    seen.append(get_guid())
+
+
+@pytest.fixture(autouse=True)
+def celery_integration(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [CeleryIntegration(log_parent=True)]}
+    seen.clear()
+    yield
+    clear_guid()
+    celery_current.set(None)
+
+
+def drain():
+    with app.connection() as connection:
+        queue = connection.SimpleQueue('celery')
+        messages = []
+        while queue.qsize():
+            message = queue.get(timeout=1)
+            message.ack()
+            messages.append(message.headers)
+        queue.close()
+    return messages
+
+
+def test_stamper_reads_ids_once():
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    celery_current.set('c494886651cd4baaa8654e4d24a8mock')
+    stamper = CorrelationIdStamper()
+    assert stamper.on_signature(record_guid.s(1)) == {
+        'Correlation-ID': '704ae5472cae4f8daa8f2cc5a5a8mock',
+        'CELERY_LINEAGE': 'c494886651cd4baaa8654e4d24a8mock:c494886651cd4baaa8654e4d24a8mock:00000000',
+        'CELERY_PARENT_ID': 'c494886651cd4baaa8654e4d24a8mock',
+    }
+
+
+def test_stamper_without_guid():
+    assert CorrelationIdStamper().on_signature(record_guid.s(1)) == {}
+
+
+def test_stamped_group_keeps_the_original_guid():
+    """
+    A stamped canvas published later, from another context, carries the GUID it was built with.
+    """
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    canvas = stamp_canvas(group(record_guid.s(i) for i in range(3)))
+    set_guid('c494886651cd4baaa8654e4d24a8mock')
+    canvas.apply_async()
+
+    messages = drain()
+    assert len(messages) == 3
+    for headers in messages:
+        assert headers['stamps']['Correlation-ID'] == '704ae5472cae4f8daa8f2cc5a5a8mock'
+        assert 'Correlation-ID' not in headers  # The per-message header work was skipped
+
+
+def test_unstamped_group_gets_the_publishing_guid():
+    set_guid('c494886651cd4baaa8654e4d24a8mock')
+    group(record_guid.s(i) for i in range(2)).apply_async()
+    assert [headers['Correlation-ID'] for headers in drain()] == ['c494886651cd4baaa8654e4d24a8mock'] * 2
+
+
+def test_worker_uses_the_stamped_guid():
+    """
+    Tasks run from a stamped signature get the stamped GUID, rather than generating a new one.
+    """
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    signature = stamp_canvas(record_guid.s(1))
+    clear_guid()
+    signature.apply()
+    assert seen == ['704ae5472cae4f8daa8f2cc5a5a8mock']
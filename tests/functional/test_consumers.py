@@ -0,0 +1,129 @@
+import json
+import logging
+
+import pytest
+from asgiref.testing import ApplicationCommunicator
+
+channels = pytest.importorskip('channels')
+
+from channels.generic.websocket import AsyncJsonWebsocketConsumer, JsonWebsocketConsumer  # noqa: E402
+from channels.layers import get_channel_layer  # noqa: E402
+
+from django_guid import get_guid  # noqa: E402
+from django_guid.consumers import GuidConsumerMixin  # noqa: E402
+from django_guid.context import connection_guid  # noqa: E402
+from django_guid.log_filters import ConnectionId  # noqa: E402
+
+logger = logging.getLogger('django_guid')
+
+# Consumers close old database connections before handling each message
+pytestmark = pytest.mark.django_db
+
+
+class WebsocketCommunicator(ApplicationCommunicator):
+    """
+    Talks JSON to a websocket consumer. `channels.testing` has one too, but importing it requires `daphne`.
+    """
+
+    def __init__(self, application, path, headers=None):
+        super().__init__(application, {'type': 'websocket', 'path': path, 'headers': headers or [], 'subprotocols': []})
+
+    async def connect(self):
+        await self.send_input({'type': 'websocket.connect'})
+        return (await self.receive_output())['type'] == 'websocket.accept'
+
+    async def send_json_to(self, data):
+        await self.send_input({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive_json_from(self):
+        return json.loads((await self.receive_output())['text'])
+
+    async def disconnect(self):
+        await self.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await self.wait()
+
+
+def ids():
+    return {'guid': get_guid(), 'connection': connection_guid.get()}
+
+
+class AsyncConsumer(GuidConsumerMixin, AsyncJsonWebsocketConsumer):
+    groups = ['chat']
+
+    async def receive_json(self, content, **kwargs):
+        logger.info('Received %s', content)
+        if content.get('broadcast'):
+            await self.channel_layer.group_send('chat', {'type': 'chat.message', 'sent_by': get_guid()})
+        await self.send_json(ids())
+
+    async def chat_message(self, event):
+        await self.send_json({**ids(), 'sent_by': event['sent_by']})
+
+
+class SyncConsumer(GuidConsumerMixin, JsonWebsocketConsumer):
+    def receive_json(self, content, **kwargs):
+        self.send_json(ids())
+
+
+@pytest.fixture(autouse=True)
+def in_memory_channel_layer(settings):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+async def test_each_message_gets_a_guid(caplog):
+    communicator = WebsocketCommunicator(
+        AsyncConsumer.as_asgi(), '/ws', headers=[(b'correlation-id', b'97c304252fd14b25b72d6aee31565842')]
+    )
+    assert await communicator.connect()
+    await communicator.send_json_to({'text': 'first'})
+    first = await communicator.receive_json_from()
+    await communicator.send_json_to({'text': 'second'})
+    second = await communicator.receive_json_from()
+    await communicator.disconnect()
+
+    assert first['connection'] == second['connection'] == '97c304252fd14b25b72d6aee31565842'
+    assert len({first['guid'], second['guid'], first['connection']}) == 3
+    assert [record.correlation_id for record in caplog.records if record.message.startswith('Received')] == [
+        first['guid'],
+        second['guid'],
+    ]
+    assert get_guid() is None
+    assert connection_guid.get() is None
+
+
+async def test_channel_layer_messages_get_a_guid():
+    communicator = WebsocketCommunicator(AsyncConsumer.as_asgi(), '/ws')
+    assert await communicator.connect()
+    await communicator.send_json_to({'broadcast': True})
+    replies = [await communicator.receive_json_from(), await communicator.receive_json_from()]
+    await communicator.disconnect()
+
+    (event,) = [reply for reply in replies if 'sent_by' in reply]
+    (reply,) = [reply for reply in replies if 'sent_by' not in reply]
+    assert event['sent_by'] == reply['guid']
+    assert event['guid'] != reply['guid']
+    assert event['connection'] == reply['connection']  # A generated connection GUID, as no header was sent
+    assert type(get_channel_layer()).__name__ == 'InMemoryChannelLayer'
+
+
+async def test_sync_consumer():
+    communicator = WebsocketCommunicator(
+        SyncConsumer.as_asgi(), '/ws', headers=[(b'correlation-id', b'97c304252fd14b25b72d6aee31565842')]
+    )
+    assert await communicator.connect()
+    await communicator.send_json_to({})
+    reply = await communicator.receive_json_from()
+    await communicator.disconnect()
+
+    assert reply['connection'] == '97c304252fd14b25b72d6aee31565842'
+    assert reply['guid'] not in (None, reply['connection'])
+
+
+def test_connection_id_log_filter():
+    record = logging.LogRecord('django_guid', logging.INFO, __file__, 1, 'Message', (), None)
+    token = connection_guid.set('97c304252fd14b25b72d6aee31565842')
+    try:
+        ConnectionId(connection_id_field='websocket_id').filter(record)
+    finally:
+        connection_guid.reset(token)
+    assert record.websocket_id == '97c304252fd14b25b72d6aee31565842'
@@ -0,0 +1,78 @@
+import logging
+from multiprocessing import get_context
+
+import pytest
+
+from django_guid import clear_guid, get_guid, set_guid
+from django_guid.api import GuidProcessPoolExecutor, GuidThreadPoolExecutor
+from django_guid.integrations.celery.context import celery_current, celery_parent
+
+
+def ids(*args, **kwargs):
+    return get_guid(), celery_parent.get(), celery_current.get(), args, kwargs
+
+
+@pytest.fixture(autouse=True)
+def reset_ids():
+    yield
+    clear_guid()
+    celery_parent.set(None)
+    celery_current.set(None)
+
+
+def test_thread_pool(caplog):
+    """
+    Work submitted to the thread pool runs with the submitter's IDs, and logs get the GUID.
+    """
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    celery_current.set('c494886651cd4baaa8654e4d24a8mock')
+
+    def log():
+        logging.getLogger('django_guid').warning('From a thread')
+
+    with GuidThreadPoolExecutor(max_workers=2) as executor:
+        assert executor.submit(ids, 1, fn=2).result() == (
+            '704ae5472cae4f8daa8f2cc5a5a8mock',
+            None,
+            'c494886651cd4baaa8654e4d24a8mock',
+            (1,),
+            {'fn': 2},
+        )
+        executor.submit(log).result()
+        assert [result[0] for result in executor.map(ids, range(3))] == ['704ae5472cae4f8daa8f2cc5a5a8mock'] * 3
+
+    (record,) = [record for record in caplog.records if record.message == 'From a thread']
+    assert record.correlation_id == '704ae5472cae4f8daa8f2cc5a5a8mock'
+
+
+def test_thread_pool_changes_stay_in_the_thread():
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    with GuidThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(set_guid, 'c494886651cd4baaa8654e4d24a8mock').result()
+    assert get_guid() == '704ae5472cae4f8daa8f2cc5a5a8mock'
+
+
+@pytest.mark.parametrize('start_method', ['fork', 'spawn'])
+def test_process_pool(start_method):
+    """
+    The GUID and Celery IDs are sent to the worker processes, and don't leak into the next submitted function.
+    """
+    with GuidProcessPoolExecutor(max_workers=1, mp_context=get_context(start_method)) as executor:
+        set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+        celery_parent.set('1234')
+        celery_current.set('c494886651cd4baaa8654e4d24a8mock')
+        assert executor.submit(ids, 1, fn=2).result() == (
+            '704ae5472cae4f8daa8f2cc5a5a8mock',
+            '1234',
+            'c494886651cd4baaa8654e4d24a8mock',
+            (1,),
+            {'fn': 2},
+        )
+        assert [result[0] for result in executor.map(ids, range(3), chunksize=2)] == [
+            '704ae5472cae4f8daa8f2cc5a5a8mock'
+        ] * 3
+
+        clear_guid()
+        celery_parent.set(None)
+        celery_current.set(None)
+        assert executor.submit(ids).result() == (None, None, None, (), {})
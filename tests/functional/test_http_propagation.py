@@ -0,0 +1,147 @@
+import http.client
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from django_guid import clear_guid, set_guid
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """
+    Records the headers and client port of each request, and responds with an empty body.
+    """
+
+    protocol_version = 'HTTP/1.1'  # Keeps connections open, so pooling can be checked
+
+    def do_GET(self):
+        self.server.received.append((self.headers, self.client_address[1]))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+    server.received = []
+    server.url = f'http://127.0.0.1:{server.server_port}/'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def reset_guid():
+    yield
+    clear_guid()
+
+
+def assert_propagated(server):
+    """
+    Checks that the first request carried the GUID, the second carried none, and both used the same connection.
+    """
+    (first, first_port), (second, second_port) = server.received
+    assert first['Correlation-ID'] == '704ae5472cae4f8daa8f2cc5a5a8mock'
+    assert 'Correlation-ID' not in second
+    assert first_port == second_port
+
+
+def test_requests_adapter(server):
+    requests = pytest.importorskip('requests')
+    from django_guid.http.requests import mount_guid_adapter
+
+    with mount_guid_adapter(requests.Session()) as session:
+        set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+        session.get(server.url)
+        clear_guid()
+        session.get(server.url)
+    assert_propagated(server)
+
+
+def test_urllib3_pool_manager(server):
+    pytest.importorskip('urllib3')
+    from django_guid.http.urllib3 import GuidPoolManager
+
+    with GuidPoolManager() as http:
+        set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+        http.request('GET', server.url)
+        clear_guid()
+        http.request('GET', server.url)
+    assert_propagated(server)
+
+
+def test_httpx_transport(server):
+    httpx = pytest.importorskip('httpx')
+    from django_guid.http.httpx import GuidTransport
+
+    with httpx.Client(transport=GuidTransport()) as client:
+        set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+        client.get(server.url)
+        clear_guid()
+        client.get(server.url)
+    assert_propagated(server)
+
+
+async def test_httpx_async_transport(server):
+    httpx = pytest.importorskip('httpx')
+    from django_guid.http.httpx import AsyncGuidTransport
+
+    async with httpx.AsyncClient(transport=AsyncGuidTransport()) as client:
+        set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+        await client.get(server.url)
+        clear_guid()
+        await client.get(server.url)
+    assert_propagated(server)
+
+
+def test_header_set_by_caller_is_kept(server, settings):
+    """
+    A GUID header passed by the caller wins, and the header name follows the GUID_HEADER_NAME setting.
+    """
+    requests = pytest.importorskip('requests')
+    httpx = pytest.importorskip('httpx')
+    from django_guid.http.httpx import GuidTransport
+    from django_guid.http.requests import mount_guid_adapter
+    from django_guid.http.urllib3 import GuidPoolManager
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'GUID_HEADER_NAME': 'X-Request-ID'}
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    with mount_guid_adapter(requests.Session()) as session:
+        session.get(server.url, headers={'x-request-id': 'from-caller'})
+        session.get(server.url)
+    with GuidPoolManager() as http:
+        http.request('GET', server.url, headers={'x-request-id': 'from-caller'})
+        http.request('GET', server.url)
+    with httpx.Client(transport=GuidTransport()) as client:
+        client.get(server.url, headers={'x-request-id': 'from-caller'})
+        client.get(server.url)
+
+    assert [headers.get_all('X-Request-ID') for headers, _ in server.received] == [
+        ['from-caller'],
+        ['704ae5472cae4f8daa8f2cc5a5a8mock'],
+    ] * 3
+
+
+def test_urllib3_header_is_not_repeated(server):
+    """
+    Requests sent without `request`, like urllib3 1.x's `request_chunked`, don't repeat the GUID of an earlier request.
+    """
+    pytest.importorskip('urllib3')
+    from django_guid.http.urllib3 import GuidHTTPConnection
+
+    connection = GuidHTTPConnection('127.0.0.1', server.server_port)
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    connection.request('GET', '/')
+    connection.getresponse().read()
+    clear_guid()
+    connection.putrequest('GET', '/')
+    connection.endheaders()
+    http.client.HTTPConnection.getresponse(connection).read()  # urllib3 2.x only reads responses to `request`
+    connection.close()
+    assert_propagated(server)
@@ -130,3 +130,406 @@ def test_base_class():
     assert stub_integration.setup() is None
     assert stub_integration.run('test') is None
     assert stub_integration.cleanup() is None
+
+
+def test_is_overridden():
+    from django_guid.integrations import CeleryIntegration, Integration, SentryIntegration
+    from django_guid.integrations.base import is_overridden
+
+    class RunOnly(Integration):
+        identifier = 'RunOnly'
+
+        def run(self, guid, **kwargs):
+            pass
+
+    integration = RunOnly()
+    assert is_overridden(integration, 'run')
+    assert not is_overridden(integration, 'cleanup')
+    assert not is_overridden(integration, 'setup')
+    assert is_overridden(SentryIntegration(), 'setup')
+    assert not CeleryIntegration.runs_in_middleware
+
+
+def test_middleware_skips_integrations(client, monkeypatch, settings):
+    """
+    Integrations that don't run in the middleware, or don't override `cleanup`, are left out of the loops.
+    """
+    from django_guid.integrations import CeleryIntegration, Integration
+
+    calls = []
+
+    class RunOnly(Integration):
+        identifier = 'RunOnly'
+
+        def run(self, guid, **kwargs):
+            calls.append(('run', guid))
+
+    class RunAndCleanup(RunOnly):
+        identifier = 'RunAndCleanup'
+
+        def cleanup(self, **kwargs):
+            calls.append(('cleanup', None))
+
+    monkeypatch.setattr(CeleryIntegration, 'run', lambda *args, **kwargs: calls.append(('celery', None)))
+    settings.DJANGO_GUID = {
+        **settings.DJANGO_GUID,
+        'INTEGRATIONS': [CeleryIntegration(), RunOnly(), RunAndCleanup()],
+    }
+    client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert calls == [
+        ('run', '97c304252fd14b25b72d6aee31565842'),
+        ('run', '97c304252fd14b25b72d6aee31565842'),
+        ('cleanup', None),
+    ]
+
+
+def test_request_processors_are_specialised_once(client, mocker):
+    """
+    The request processing is built once per settings snapshot, not per request.
+    """
+    from django_guid import middleware
+
+    build = mocker.spy(middleware, 'build_request_processors')
+    client.get('/')
+    client.get('/')
+    assert build.call_count <= 1
+
+
+def test_async_hooks_must_be_coroutines(subtests):
+    """
+    Tests that an exception is raised when `arun` or `acleanup` aren't coroutine functions or don't accept kwargs.
+    """
+    from django_guid.integrations import Integration
+
+    class SyncArun(Integration):
+        identifier = 'SyncArun'
+
+        def arun(self, guid, **kwargs):  # pragma: no cover
+            pass
+
+    class NoKwargsAcleanup(Integration):
+        identifier = 'NoKwargsAcleanup'
+
+        async def acleanup(self):  # pragma: no cover
+            pass
+
+    for integration, error in [
+        (SyncArun(), 'Integration method `arun` must be a coroutine function'),
+        (NoKwargsAcleanup(), 'Integration method `acleanup` must accept keyword arguments'),
+    ]:
+        with override_settings(DJANGO_GUID={'INTEGRATIONS': [integration]}):
+            with subtests.test(msg=integration.identifier):
+                with pytest.raises(ImproperlyConfigured, match=error):
+                    Settings().validate()
+
+
+async def test_async_hooks_run_concurrently(async_client, settings):
+    """
+    The async middleware awaits `arun` and `acleanup` concurrently, so hooks waiting on each other complete.
+    """
+    import asyncio
+
+    from django_guid.integrations import Integration
+
+    started = asyncio.Event()
+    calls = []
+
+    class Waiting(Integration):
+        identifier = 'Waiting'
+
+        async def arun(self, guid, **kwargs):
+            await started.wait()
+            calls.append(('Waiting', guid))
+
+        async def acleanup(self, **kwargs):
+            calls.append(('Waiting', 'cleanup'))
+
+    class Starting(Integration):
+        identifier = 'Starting'
+
+        async def arun(self, guid, **kwargs):
+            started.set()
+            calls.append(('Starting', guid))
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [Waiting(), Starting()], 'INTEGRATION_TIMEOUT': 5}
+    response = await async_client.get('/', headers={'Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert response['Correlation-ID'] == '97c304252fd14b25b72d6aee31565842'
+    assert calls == [
+        ('Starting', '97c304252fd14b25b72d6aee31565842'),
+        ('Waiting', '97c304252fd14b25b72d6aee31565842'),
+        ('Waiting', 'cleanup'),
+    ]
+
+
+async def test_sync_integrations_are_offloaded(async_client, settings):
+    """
+    Sync-only integrations are called in a worker thread by the async middleware, not on the event loop, and the
+    context variables they set are seen by the rest of the request, as in the sync middleware. This holds however
+    many integrations are awaited, and whether or not INTEGRATION_TIMEOUT is set, while changes made by async hooks
+    are always lost.
+    """
+    import threading
+    from contextvars import ContextVar
+
+    from django_guid.integrations import Integration
+
+    var: ContextVar = ContextVar('var', default=None)
+    threads = []
+    seen = []
+
+    class SyncOnly(Integration):
+        identifier = 'SyncOnly'
+
+        def run(self, guid, **kwargs):
+            threads.append(threading.get_ident())
+            var.set(guid)
+
+        def cleanup(self, **kwargs):
+            threads.append(threading.get_ident())
+            seen.append(var.get())
+
+    class AsyncOnly(Integration):
+        identifier = 'AsyncOnly'
+
+        async def arun(self, guid, **kwargs):
+            var.set('lost')
+
+    for integrations, timeout in [
+        ([SyncOnly()], None),
+        ([SyncOnly()], 5),
+        ([SyncOnly(), SyncOnly()], None),
+        ([SyncOnly(), AsyncOnly()], None),
+        ([AsyncOnly(), SyncOnly()], 5),
+    ]:
+        threads.clear()
+        seen.clear()
+        settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': integrations, 'INTEGRATION_TIMEOUT': timeout}
+        await async_client.get('/', headers={'Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+        runs = len([integration for integration in integrations if isinstance(integration, SyncOnly)])
+        assert len(threads) == 2 * runs
+        assert threading.get_ident() not in threads
+        assert seen == ['97c304252fd14b25b72d6aee31565842'] * runs
+
+
+async def test_offloaded_integration_changes_reach_the_view(rf, settings):
+    """
+    Context variables set by a sync-only integration in its worker thread are set in the request's context.
+    """
+    from contextvars import ContextVar
+
+    from django_guid.integrations import Integration
+    from django_guid.middleware import get_request_processors
+
+    var: ContextVar = ContextVar('var', default=None)
+
+    class SyncOnly(Integration):
+        identifier = 'SyncOnly'
+
+        def run(self, guid, **kwargs):
+            var.set(guid)
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [SyncOnly()]}
+    await get_request_processors().aincoming(rf.get('/', HTTP_CORRELATION_ID='97c304252fd14b25b72d6aee31565842'))
+    assert var.get() == '97c304252fd14b25b72d6aee31565842'
+
+
+async def test_offloaded_integration_timeout(async_client, caplog, settings):
+    """
+    Sync hooks exceeding INTEGRATION_TIMEOUT are abandoned in their worker thread, and the request completes.
+    """
+    import threading
+
+    from django_guid.integrations import Integration
+
+    release = threading.Event()
+
+    class Slow(Integration):
+        identifier = 'Slow'
+
+        def run(self, guid, **kwargs):
+            release.wait(10)
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [Slow()], 'INTEGRATION_TIMEOUT': 0.01}
+    try:
+        response = await async_client.get('/')
+    finally:
+        release.set()
+    assert response.status_code == 200
+    assert 'Integration `Slow` timed out after 0.01 seconds' in [record.message for record in caplog.records]
+
+
+async def test_async_hooks_are_isolated(async_client, settings):
+    """
+    Changes to context variables made by an async hook are lost, even when it is the only one awaited.
+    """
+    from contextvars import ContextVar
+
+    from django_guid.integrations import Integration
+
+    var: ContextVar = ContextVar('var', default=None)
+    seen = []
+
+    class AsyncHooks(Integration):
+        identifier = 'AsyncHooks'
+
+        async def arun(self, guid, **kwargs):
+            var.set(guid)
+
+        async def acleanup(self, **kwargs):
+            seen.append(var.get())
+
+    for timeout in [None, 5]:
+        settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [AsyncHooks()], 'INTEGRATION_TIMEOUT': timeout}
+        await async_client.get('/', headers={'Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert seen == [None, None]
+
+
+def test_async_only_integration_in_sync_middleware_is_isolated(client, settings):
+    """
+    The sync middleware runs async-only hooks in a copy of the request's context, as the async middleware does.
+    """
+    from contextvars import ContextVar
+
+    from django_guid.integrations import Integration
+
+    var: ContextVar = ContextVar('var', default=None)
+    seen = []
+
+    class AsyncOnly(Integration):
+        identifier = 'AsyncOnly'
+
+        async def arun(self, guid, **kwargs):
+            var.set(guid)
+
+        async def acleanup(self, **kwargs):
+            seen.append(var.get())
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [AsyncOnly()]}
+    client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert seen == [None]
+    assert var.get() is None
+
+
+async def test_async_hook_timeout(async_client, caplog, settings):
+    """
+    Hooks exceeding INTEGRATION_TIMEOUT are logged and abandoned, and the request completes.
+    """
+    import asyncio
+
+    from django_guid.integrations import Integration
+
+    class Slow(Integration):
+        identifier = 'Slow'
+
+        async def arun(self, guid, **kwargs):
+            await asyncio.sleep(10)
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [Slow()], 'INTEGRATION_TIMEOUT': 0.01}
+    response = await async_client.get('/')
+    assert response.status_code == 200
+    assert 'Integration `Slow` timed out after 0.01 seconds' in [record.message for record in caplog.records]
+
+
+def test_async_only_integration_in_sync_middleware(client, settings):
+    """
+    Integrations that only implement the async hooks are run to completion by the sync middleware.
+    """
+    from django_guid.integrations import Integration
+
+    calls = []
+
+    class AsyncOnly(Integration):
+        identifier = 'AsyncOnly'
+
+        async def arun(self, guid, **kwargs):
+            calls.append(guid)
+
+        async def acleanup(self, **kwargs):
+            calls.append('cleanup')
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [AsyncOnly()]}
+    client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert calls == ['97c304252fd14b25b72d6aee31565842', 'cleanup']
+
+
+async def test_async_hook_metrics(async_client, settings):
+    """
+    The time spent in each async hook, and in the incoming request processing, is recorded.
+    """
+    from django_guid.integrations import Integration
+    from django_guid.metrics import MetricsRegistry
+
+    class AsyncHooks(Integration):
+        identifier = 'AsyncHooks'
+
+        async def arun(self, guid, **kwargs):
+            pass
+
+        async def acleanup(self, **kwargs):
+            pass
+
+    metrics = MetricsRegistry()
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [AsyncHooks()], 'METRICS': metrics}
+    await async_client.get('/')
+    assert metrics.histogram('django_guid_incoming_seconds').observations == 1
+    assert metrics.histogram('django_guid_integration_seconds', 'AsyncHooks', 'run').observations == 1
+    assert metrics.histogram('django_guid_integration_seconds', 'AsyncHooks', 'cleanup').observations == 1
+
+
+async def test_inline_integrations_run_in_the_request_context(async_client, settings):
+    """
+    Context variables set by inline integrations are seen by the view, and by the tear down.
+    Awaited hooks run concurrently in copies of the request's context, so their changes are lost.
+    """
+    from contextvars import ContextVar
+
+    from django_guid.integrations import Integration
+
+    var: ContextVar = ContextVar('var', default=None)
+    seen = []
+
+    class Inline(Integration):
+        identifier = 'Inline'
+        runs_inline = True
+
+        def run(self, guid, **kwargs):
+            var.set(guid)
+
+        def cleanup(self, **kwargs):
+            seen.append(('inline', var.get()))
+
+    class Awaited(Integration):
+        identifier = 'Awaited'
+
+        async def arun(self, guid, **kwargs):
+            var.set('lost')
+
+        async def acleanup(self, **kwargs):
+            seen.append(('awaited', var.get()))
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [Awaited(), Inline(), Awaited()]}
+    await async_client.get('/', headers={'Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert sorted(seen) == [
+        ('awaited', '97c304252fd14b25b72d6aee31565842'),
+        ('awaited', '97c304252fd14b25b72d6aee31565842'),
+        ('inline', '97c304252fd14b25b72d6aee31565842'),
+    ]
+
+
+def test_inline_integrations_need_sync_hooks(settings):
+    from django_guid.integrations import Integration
+    from django_guid.middleware import get_request_processors
+
+    class AsyncInline(Integration):
+        identifier = 'AsyncInline'
+        runs_inline = True
+
+        def run(self, guid, **kwargs):
+            pass
+
+        async def acleanup(self, **kwargs):
+            pass
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [AsyncInline()]}
+    with pytest.raises(ImproperlyConfigured, match='`AsyncInline` runs inline, so it must implement the sync hooks'):
+        get_request_processors()
@@ -0,0 +1,165 @@
+from django.core.exceptions import ImproperlyConfigured
+
+import pytest
+
+from django_guid.config import Settings
+from django_guid.integrations import OpenTelemetryIntegration
+
+pytest.importorskip('opentelemetry.sdk')
+
+from opentelemetry import baggage  # noqa: E402
+from opentelemetry.sdk.trace import TracerProvider  # noqa: E402
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+
+
+@pytest.fixture
+def exporter():
+    return InMemorySpanExporter()
+
+
+@pytest.fixture
+def tracer(exporter):
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return provider.get_tracer(__name__)
+
+
+def test_guid_is_added_to_the_span(client, settings, tracer, exporter):
+    """
+    The GUID is set as an attribute of the span started by OpenTelemetry's instrumentation, without new spans.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [OpenTelemetryIntegration()]}
+    with tracer.start_as_current_span('GET /'):
+        response = client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+
+    (span,) = exporter.get_finished_spans()
+    assert span.attributes['correlation_id'] == '97c304252fd14b25b72d6aee31565842'
+    assert response['Correlation-ID'] == '97c304252fd14b25b72d6aee31565842'
+
+
+def test_trace_id_is_adopted(client, settings, tracer, exporter):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [OpenTelemetryIntegration(adopt_trace_id=True)]}
+    with tracer.start_as_current_span('GET /') as span:
+        response = client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+
+    trace_id = f'{span.get_span_context().trace_id:032x}'
+    assert response['Correlation-ID'] == trace_id
+    (span,) = exporter.get_finished_spans()
+    assert span.attributes['correlation_id'] == trace_id
+
+
+def test_adopted_trace_id_is_passed_on(client, settings, tracer, caplog):
+    """
+    The trace-id is adopted before the GUID is set, so later integrations and the request get it too,
+    without a log line about the GUID changing.
+    """
+    from django_guid.integrations import Integration
+
+    seen = []
+
+    class Recording(Integration):
+        identifier = 'Recording'
+
+        def run(self, guid, **kwargs):
+            seen.append(guid)
+
+    settings.DJANGO_GUID = {
+        **settings.DJANGO_GUID,
+        'INTEGRATIONS': [OpenTelemetryIntegration(adopt_trace_id=True), Recording()],
+    }
+    with tracer.start_as_current_span('GET /') as span:
+        response = client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+
+    trace_id = f'{span.get_span_context().trace_id:032x}'
+    assert seen == [trace_id]
+    assert response.wsgi_request.correlation_id == trace_id
+    assert not [record for record in caplog.records if record.message.startswith('Changing the guid ContextVar')]
+
+
+async def test_adopted_trace_id_with_the_asgi_wrapper(settings, tracer):
+    """
+    With the span started outside the application wrapper, the wrapper adopts the trace-id and returns it.
+    """
+    from django.core.asgi import get_asgi_application
+
+    from asgiref.testing import ApplicationCommunicator
+
+    from django_guid.asgi import guid_asgi_middleware
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [OpenTelemetryIntegration(adopt_trace_id=True)]}
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': '/asgi',
+        'query_string': b'',
+        'headers': [(b'host', b'testserver'), (b'correlation-id', b'97c304252fd14b25b72d6aee31565842')],
+    }
+    application = guid_asgi_middleware(get_asgi_application())
+    spans = []
+
+    async def instrumented(scope, receive, send):
+        # Starts the span outside the wrapper, as OpenTelemetry's ASGI middleware does
+        with tracer.start_as_current_span('GET /asgi') as span:
+            spans.append(span)
+            await application(scope, receive, send)
+
+    communicator = ApplicationCommunicator(instrumented, scope)
+    await communicator.send_input({'type': 'http.request', 'body': b''})
+    start = await communicator.receive_output(timeout=5)
+    await communicator.wait(timeout=5)
+
+    trace_id = f'{spans[0].get_span_context().trace_id:032x}'
+    assert (b'Correlation-ID', trace_id.encode()) in start['headers']
+
+
+def test_trace_id_is_not_adopted_without_a_span(client, settings, exporter):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [OpenTelemetryIntegration(adopt_trace_id=True)]}
+    response = client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert response['Correlation-ID'] == '97c304252fd14b25b72d6aee31565842'
+    assert exporter.get_finished_spans() == ()
+
+
+def test_baggage_is_set_for_the_request():
+    integration = OpenTelemetryIntegration()
+    integration.run(guid='97c304252fd14b25b72d6aee31565842')
+    assert baggage.get_baggage('correlation_id') == '97c304252fd14b25b72d6aee31565842'
+    integration.cleanup()
+    assert baggage.get_baggage('correlation_id') is None
+
+
+def test_disabled_attribute_and_baggage(tracer, exporter):
+    integration = OpenTelemetryIntegration(span_attribute=None, baggage_key=None)
+    with tracer.start_as_current_span('GET /'):
+        integration.run(guid='97c304252fd14b25b72d6aee31565842')
+        assert baggage.get_baggage('correlation_id') is None
+        integration.cleanup()
+    (span,) = exporter.get_finished_spans()
+    assert 'correlation_id' not in span.attributes
+
+
+async def test_async_middleware(async_client, caplog, settings, tracer, exporter):
+    """
+    The integration runs inline in the async middleware, so the baggage is attached to, and detached from,
+    the request's context. Detaching it from another context would log an error.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [OpenTelemetryIntegration()]}
+    with tracer.start_as_current_span('GET /asgi'):
+        await async_client.get('/asgi', headers={'Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    (span,) = exporter.get_finished_spans()
+    assert span.attributes['correlation_id'] == '97c304252fd14b25b72d6aee31565842'
+    assert not [record for record in caplog.records if record.levelname == 'ERROR']
+
+
+@pytest.mark.parametrize(
+    'kwargs, error',
+    [
+        ({'adopt_trace_id': 'yes'}, 'adopt_trace_id setting must be a boolean'),
+        ({'span_attribute': ''}, 'span_attribute setting must be a string or None'),
+        ({'baggage_key': 1}, 'baggage_key setting must be a string or None'),
+    ],
+)
+def test_invalid_settings(settings, kwargs, error):
+    settings.DJANGO_GUID = {'INTEGRATIONS': [OpenTelemetryIntegration(**kwargs)]}
+    with pytest.raises(ImproperlyConfigured, match=error):
+        Settings().validate()
@@ -4,10 +4,13 @@ from django.core.exceptions import ImproperlyConfigured
 from django.test import override_settings
 
 import pytest
+import sentry_sdk
 from sentry_sdk.scope import Scope
+from sentry_sdk.transport import Transport
 
 from django_guid.config import Settings
 from django_guid.integrations import SentryIntegration
+from django_guid.integrations.sentry import transaction_id_setter
 
 mocked_settings = {
     'GUID_HEADER_NAME': 'Correlation-ID',
@@ -34,7 +37,7 @@ def test_sentry_integration(client, caplog, mocker, monkeypatch):
             ('97c304252fd14b25b72d6aee31565842', 'Setting Sentry transaction_id to 97c304252fd14b25b72d6aee31565842'),
             ('97c304252fd14b25b72d6aee31565842', 'This is a DRF view log, and should have a GUID.'),
             ('97c304252fd14b25b72d6aee31565842', 'Some warning in a function'),
-            ('97c304252fd14b25b72d6aee31565842', 'Running tear down for integration: `SentryIntegration`'),
+            # No tear down, as SentryIntegration doesn't override `cleanup`
             ('97c304252fd14b25b72d6aee31565842', 'Received signal `request_finished`, clearing guid'),
         ]
         mock_scope.assert_called_with('transaction_id', '97c304252fd14b25b72d6aee31565842')
@@ -63,3 +66,81 @@ def test_sentry_validation(client):
     # Put it back in - otherwise a bunch of downstream tests break
     if backup:
         sys.modules['sentry_sdk'] = backup
+
+
+class StubTransport(Transport):
+    """
+    Keeps the events Sentry would have sent, rather than sending them.
+    """
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.events = []
+
+    def capture_envelope(self, envelope):
+        self.events.extend(item.payload.json for item in envelope.items if item.type == 'event')
+
+
+@pytest.fixture
+def sentry_transport():
+    transport = StubTransport()
+    sentry_sdk.init(
+        dsn='http://public@localhost/1',
+        transport=transport,
+        default_integrations=False,
+        auto_enabling_integrations=False,
+    )
+    yield transport
+    sentry_sdk.get_client().close()
+    sentry_sdk.get_global_scope().set_client(None)
+    sentry_sdk.get_isolation_scope().remove_tag('transaction_id')
+
+
+def test_transaction_id_reaches_sentry(client, sentry_transport):
+    """
+    The tag set by the middleware is sent with events captured later in the request's isolation scope.
+    """
+    with override_settings(DJANGO_GUID={**mocked_settings, 'IGNORE_URLS': []}):
+        client.get('/api', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+        sentry_sdk.capture_message('Something went wrong')
+
+    (event,) = sentry_transport.events
+    assert event['tags']['transaction_id'] == '97c304252fd14b25b72d6aee31565842'
+
+
+async def test_transaction_id_reaches_sentry_in_async_middleware(rf, sentry_transport):
+    """
+    The async middleware tags the request's isolation scope, even if the request's context has none yet.
+    """
+    from sentry_sdk.scope import _isolation_scope
+
+    from django_guid.middleware import get_request_processors
+
+    _isolation_scope.set(None)
+    with override_settings(DJANGO_GUID={**mocked_settings, 'IGNORE_URLS': []}):
+        await get_request_processors().aincoming(rf.get('/api', HTTP_CORRELATION_ID='97c304252fd14b25b72d6aee31565842'))
+        sentry_sdk.capture_message('Something went wrong')
+
+    (event,) = sentry_transport.events
+    assert event['tags']['transaction_id'] == '97c304252fd14b25b72d6aee31565842'
+
+
+def test_transaction_id_reaches_sentry_from_celery(sentry_transport):
+    """
+    The Celery integration shares the setter, so task events are tagged too.
+    """
+    from django_guid.integrations import CeleryIntegration
+    from django_guid.integrations.celery.signals import set_transaction_id
+
+    with override_settings(DJANGO_GUID={'INTEGRATIONS': [CeleryIntegration(sentry_integration=True)]}):
+        set_transaction_id('704ae5472cae4f8daa8f2cc5a5a8mock')
+        sentry_sdk.capture_message('Something went wrong in a task')
+
+    (event,) = sentry_transport.events
+    assert event['tags']['transaction_id'] == '704ae5472cae4f8daa8f2cc5a5a8mock'
+
+
+def test_setter_is_resolved_in_setup():
+    integration = SentryIntegration()
+    integration.setup()
+    assert integration.set_transaction_id is transaction_id_setter()
@@ -21,3 +21,25 @@ async def test_api(async_client, caplog, mock_uuid):
         ('Received signal `request_finished`, clearing guid', None),
     ]
     assert [(x.message, x.correlation_id) for x in caplog.records] == expected
+
+
+def test_unlogged_changes_skip_the_settings(caplog, monkeypatch):
+    """
+    The settings are only read to check LOG_EVENTS when the `django_guid` logger would log a change to the GUID.
+    """
+    import logging
+
+    from django_guid import clear_guid, get_guid, set_guid
+
+    class UnreadableSettings:
+        @property
+        def snapshot(self):
+            raise AssertionError('The settings were read')
+
+    monkeypatch.setattr('django_guid.api._settings', UnreadableSettings())
+    caplog.set_level(logging.WARNING, logger='django_guid')
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    set_guid('97c304252fd14b25b72d6aee31565842')
+    assert get_guid() == '97c304252fd14b25b72d6aee31565842'
+    clear_guid()
+    assert get_guid() is None
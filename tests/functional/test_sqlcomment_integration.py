@@ -0,0 +1,136 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from django.urls import path
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from django_guid import clear_guid, set_guid
+from django_guid.integrations import SqlCommentIntegration
+from django_guid.integrations.sqlcommenter import prepend_comment, sql_comment
+
+
+def sync_queries(request):
+    connection.cursor().execute('SELECT 1')
+    return JsonResponse({'count': ContentType.objects.filter(app_label='django_guid').count()})
+
+
+async def async_queries(request):
+    """
+    Returns the queries as the database receives them, which is after the integration's wrapper has run.
+    """
+    received = []
+
+    def capture(execute, sql, params, many, context):
+        received.append(sql)
+        return execute(sql, params, many, context)
+
+    @sync_to_async
+    def count():
+        with connection.execute_wrapper(capture):
+            return ContentType.objects.filter(app_label='django_guid').count()
+
+    await count()
+    return JsonResponse({'received': received})
+
+
+urlpatterns = [path('sync', sync_queries), path('async', async_queries)]
+
+
+@pytest.fixture
+def statements(db):
+    """
+    Collects the statements SQLite executes, after all execute wrappers have run.
+    """
+    executed = []
+    connection.ensure_connection()
+    connection.connection.set_trace_callback(executed.append)
+    yield executed
+    connection.connection.set_trace_callback(None)
+
+
+@pytest.fixture
+def sql_comments(settings, db):
+    integration = SqlCommentIntegration()
+    integration.setup()
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [integration]}
+    yield integration
+    connection_created.disconnect(dispatch_uid='django_guid.sqlcommenter')
+    connection.execute_wrappers.remove(prepend_comment)
+
+
+@pytest.mark.urls(__name__)
+def test_queries_are_tagged(client, sql_comments, statements):
+    client.get('/sync', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    connection.cursor().execute('SELECT 2')
+
+    assert statements == [
+        '/* correlation_id=97c304252fd14b25b72d6aee31565842 */ SELECT 1',
+        '/* correlation_id=97c304252fd14b25b72d6aee31565842 */ SELECT COUNT(*) AS "__count" FROM '
+        '"django_content_type" WHERE "django_content_type"."app_label" = \'django_guid\'',
+        'SELECT 2',  # Queries aren't tagged once the request is finished
+    ]
+
+
+@pytest.mark.urls(__name__)
+@pytest.mark.django_db(transaction=True)
+async def test_async_queries_are_tagged(async_client, sql_comments):
+    response = await async_client.get('/async', headers={'Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+
+    assert response.json()['received'] == [
+        '/* correlation_id=97c304252fd14b25b72d6aee31565842 */ SELECT COUNT(*) AS "__count" FROM '
+        '"django_content_type" WHERE "django_content_type"."app_label" = %s',
+    ]
+
+
+@pytest.mark.urls(__name__)
+def test_comment_is_escaped(client, settings, sql_comments, statements):
+    """
+    A GUID from an unvalidated header can't close the comment, and `%` survives parameter formatting.
+    """
+    settings.DJANGO_GUID = {
+        **settings.DJANGO_GUID,
+        'VALIDATE_GUID': False,
+        'INTEGRATIONS': [SqlCommentIntegration(key='request')],
+    }
+    client.get('/sync', **{'HTTP_Correlation-ID': '*/ DROP TABLE x; 100%'})
+
+    assert [statement.split(' SELECT')[0] for statement in statements] == [
+        '/* request=%2A%2F%20DROP%20TABLE%20x%3B%20100%25 */'
+    ] * 2
+
+
+def test_comment_is_built_once_per_request():
+    integration = SqlCommentIntegration(databases=['default'])
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    integration.run(guid='704ae5472cae4f8daa8f2cc5a5a8mock')
+    assert sql_comment.get() == ('/* correlation_id=704ae5472cae4f8daa8f2cc5a5a8mock */ ',) * 2 + (('default',),)
+    integration.cleanup()
+    clear_guid()
+    assert sql_comment.get() is None
+
+
+@pytest.mark.urls(__name__)
+def test_only_selected_databases_are_tagged(client, settings, sql_comments, statements):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [SqlCommentIntegration(databases=[])]}
+    client.get('/sync', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    assert statements[0] == 'SELECT 1'
+
+
+@pytest.mark.parametrize(
+    'kwargs, message',
+    [
+        ({'key': ''}, 'The SqlCommentIntegration key setting must be a non-empty string'),
+        ({'key': 'a b'}, 'The SqlCommentIntegration key setting must be a non-empty string'),
+        (
+            {'databases': ['default', 'other']},
+            'The SqlCommentIntegration databases setting contains unknown aliases: other',
+        ),
+    ],
+)
+def test_invalid_settings(kwargs, message):
+    with pytest.raises(ImproperlyConfigured, match=message):
+        SqlCommentIntegration(**kwargs).setup()
@@ -0,0 +1,128 @@
+import logging
+from io import BytesIO
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.urls import path
+
+import pytest
+
+from django_guid import get_guid
+from django_guid.context import guid
+from django_guid.integrations import Integration
+from django_guid.middleware import guid_middleware
+
+logger = logging.getLogger('django_guid')
+events = []
+
+pytestmark = pytest.mark.usefixtures('keep_connections')
+
+
+def chunks():
+    for number in range(2):
+        events.append(('chunk', get_guid()))
+        logger.info('Streaming chunk %s', number)
+        yield b'chunk'
+
+
+async def achunks():
+    for chunk in chunks():
+        yield chunk
+
+
+def sync_stream(request):
+    return StreamingHttpResponse(chunks())
+
+
+async def async_stream(request):
+    return StreamingHttpResponse(achunks())
+
+
+urlpatterns = [path('sync', sync_stream), path('async', async_stream)]
+
+
+class RecordingIntegration(Integration):
+    identifier = 'RecordingIntegration'
+
+    def run(self, guid, **kwargs):
+        events.append(('run', guid))
+
+    def cleanup(self, **kwargs):
+        events.append(('cleanup', get_guid()))
+
+
+class InlineRecordingIntegration(RecordingIntegration):
+    identifier = 'InlineRecordingIntegration'
+    runs_inline = True
+
+
+@pytest.fixture(autouse=True)
+def recording_integrations(settings):
+    events.clear()
+    settings.DJANGO_GUID = {
+        **settings.DJANGO_GUID,
+        'INTEGRATIONS': [RecordingIntegration(), InlineRecordingIntegration()],
+    }
+
+
+GUID = '97c304252fd14b25b72d6aee31565842'
+
+
+@pytest.mark.urls(__name__)
+def test_sync_streaming(client, caplog):
+    """
+    Chunks are produced with the GUID even if the server's context was cleared, and the tear down runs after them.
+    """
+    response = client.get('/sync', **{'HTTP_Correlation-ID': GUID})
+    assert events == [('run', GUID), ('run', GUID)]
+
+    guid.set(None)
+    assert b''.join(response.streaming_content) == b'chunkchunk'
+
+    assert events == [('run', GUID)] * 2 + [('chunk', GUID)] * 2 + [('cleanup', None)] * 2
+    assert [record.correlation_id for record in caplog.records if record.message.startswith('Streaming')] == [GUID] * 2
+
+
+@pytest.mark.urls(__name__)
+async def test_async_streaming(async_client):
+    response = await async_client.get('/async', headers={'Correlation-ID': GUID})
+    assert events == [('run', GUID), ('run', GUID)]
+
+    assert b''.join([chunk async for chunk in response.streaming_content]) == b'chunkchunk'
+
+    assert events == [('run', GUID)] * 2 + [('chunk', GUID)] * 2 + [('cleanup', GUID)] * 2
+
+
+async def test_async_stream_closed_early():
+    """
+    If the response is closed before its content is sent, e.g. because the client disconnected, the tear down
+    runs when it's closed, once.
+    """
+
+    async def view(request):
+        return StreamingHttpResponse(achunks())
+
+    response = await guid_middleware(view)(RequestFactory().get('/', HTTP_CORRELATION_ID=GUID))
+    response.close()
+    async for _ in response.streaming_content:
+        pass
+
+    assert [event for event, _ in events] == ['run', 'run', 'cleanup', 'cleanup', 'chunk', 'chunk']
+
+
+def test_file_response_keeps_file_to_stream():
+    """
+    File responses aren't wrapped, so servers can still use `wsgi.file_wrapper`. The tear down runs on close.
+    """
+    file = BytesIO(b'content')
+    response = guid_middleware(lambda request: FileResponse(file))(RequestFactory().get('/', HTTP_CORRELATION_ID=GUID))
+    assert response.file_to_stream is file
+    assert [event for event, _ in events] == ['run', 'run']
+
+    response.close()
+    assert [event for event, _ in events] == ['run', 'run', 'cleanup', 'cleanup']
+
+
+def test_regular_responses_are_torn_down_in_the_middleware(client):
+    client.get('/', **{'HTTP_Correlation-ID': GUID})
+    assert events == [('run', GUID), ('run', GUID), ('cleanup', GUID), ('cleanup', GUID)]
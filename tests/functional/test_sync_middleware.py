@@ -307,3 +307,147 @@ def test_url_ignored(client, caplog):
             ('Received signal `request_finished`, clearing guid', None),
         ]
         assert [(x.message, x.correlation_id) for x in caplog.records] == expected
+
+
+def test_url_ignored_with_query_string(client, caplog):
+    """
+    Test that the query string does not affect IGNORE_URLS matching.
+    """
+    response = client.get('/no-guid?page=2')
+    assert not response.get('Correlation-ID')
+    assert [x.correlation_id for x in caplog.records] == [None, None, None, None]
+
+
+def test_url_ignored_with_prefix_rule(client, caplog):
+    """
+    Test that a glob rule in IGNORE_URLS is matched.
+    """
+    from django.conf import settings as django_settings
+
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['IGNORE_URLS'] = ['no-*']
+    with override_settings(DJANGO_GUID=mocked_settings):
+        response = client.get('/no-guid')
+    assert not response.get('Correlation-ID')
+
+
+def test_ignored_url_is_matched_once_per_request(client, mocker):
+    """
+    Test that the IGNORE_URLS decision is cached on the request between the incoming and outgoing phase.
+    """
+    from django_guid.config import settings
+
+    spy = mocker.spy(type(settings.snapshot.ignore_url_matcher), '__call__')
+    client.get('/')
+    assert spy.call_count == 1
+
+
+def test_request_with_oversized_correlation_id(client, caplog, mock_uuid):
+    """
+    Tests that an oversized GUID is replaced without being logged.
+    """
+    response = client.get('/', **{'HTTP_Correlation-ID': 'a' * 100_000})
+    expected = [
+        ('sync middleware called', None),
+        ('Correlation-ID found in the header', None),
+        ('Oversized Correlation-ID provided (100000 characters). New GUID is 704ae5472cae4f8daa8f2cc5a5a8mock', None),
+        ('This log message should have a GUID', '704ae5472cae4f8daa8f2cc5a5a8mock'),
+        ('Some warning in a function', '704ae5472cae4f8daa8f2cc5a5a8mock'),
+        ('Received signal `request_finished`, clearing guid', '704ae5472cae4f8daa8f2cc5a5a8mock'),
+    ]
+    assert [(x.message, x.correlation_id) for x in caplog.records] == expected
+    assert response['Correlation-ID'] == '704ae5472cae4f8daa8f2cc5a5a8mock'
+
+
+def test_log_events_setting(client, caplog, mock_uuid, settings):
+    """
+    Tests that only the lifecycle events selected in LOG_EVENTS are logged.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'LOG_EVENTS': ['header']}
+    client.get('/')
+    expected = [
+        (
+            'Header `Correlation-ID` was not found in the incoming request. '
+            'Generated new GUID: 704ae5472cae4f8daa8f2cc5a5a8mock',
+            None,
+        ),
+        ('This log message should have a GUID', '704ae5472cae4f8daa8f2cc5a5a8mock'),
+        ('Some warning in a function', '704ae5472cae4f8daa8f2cc5a5a8mock'),
+    ]
+    assert [(x.message, x.correlation_id) for x in caplog.records] == expected
+
+
+def test_invalid_header_warnings_are_rate_limited(client, caplog, mock_uuid, settings):
+    """
+    Tests that only the first invalid header warning in the INVALID_HEADER_LOG_INTERVAL is logged.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'LOG_EVENTS': [], 'INVALID_HEADER_LOG_INTERVAL': 3600}
+    for _ in range(3):
+        client.get('/', **{'HTTP_Correlation-ID': 'bad-guid'})
+    warnings = [x.message for x in caplog.records if x.name == 'django_guid']
+    assert warnings == ['bad-guid is not a valid GUID. New GUID is 704ae5472cae4f8daa8f2cc5a5a8mock']
+
+
+def test_metrics(client, settings):
+    """
+    Tests that the ID outcomes and the time spent processing requests and integrations are recorded.
+    """
+    from django_guid.integrations import Integration
+    from django_guid.metrics import MetricsRegistry
+
+    class Noop(Integration):
+        identifier = 'Noop'
+
+        def run(self, guid, **kwargs):
+            pass
+
+    metrics = MetricsRegistry()
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'METRICS': metrics, 'INTEGRATIONS': [Noop()]}
+    client.get('/', **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'})
+    client.get('/', **{'HTTP_Correlation-ID': 'bad-guid'})
+    client.get('/')
+
+    for outcome in ['valid', 'invalid', 'generated']:
+        assert metrics.counter('django_guid_request_ids_total', outcome) == 1
+    assert metrics.histogram('django_guid_incoming_seconds').observations == 3
+    assert metrics.histogram('django_guid_integration_seconds', 'Noop', 'run').observations == 3
+
+
+def test_trace_context(client, settings):
+    """
+    Tests that the trace-id of a traceparent header is used as GUID, and a new span ID is returned.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'TRACE_CONTEXT': True}
+    traceparent = '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+    response = client.get(
+        '/', HTTP_TRACEPARENT=traceparent, HTTP_TRACESTATE='congo=t61rcWkgMzE', **{'HTTP_Correlation-ID': 'ignored'}
+    )
+    assert response['Correlation-ID'] == '4bf92f3577b34da6a3ce929d0e0e4736'
+    version, trace_id, span_id, flags = response['traceparent'].split('-')
+    assert (version, trace_id, flags) == ('00', '4bf92f3577b34da6a3ce929d0e0e4736', '01')
+    assert len(span_id) == 16 and span_id != '00f067aa0ba902b7'
+    assert response['tracestate'] == 'congo=t61rcWkgMzE'
+    assert response['Access-Control-Expose-Headers'] == 'Correlation-ID, traceparent'
+
+
+def test_trace_context_without_traceparent(client, settings):
+    """
+    Tests that the GUID header is used without a valid traceparent header, and the GUID starts a new trace.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'TRACE_CONTEXT': True}
+    response = client.get(
+        '/',
+        HTTP_TRACEPARENT='invalid',
+        HTTP_TRACESTATE='congo=t61rcWkgMzE',
+        **{'HTTP_Correlation-ID': '97c304252fd14b25b72d6aee31565842'},
+    )
+    assert response['Correlation-ID'] == '97c304252fd14b25b72d6aee31565842'
+    assert response['traceparent'].startswith('00-97c304252fd14b25b72d6aee31565842-')
+    assert response['traceparent'].endswith('-00')
+    assert 'tracestate' not in response
+
+
+def test_trace_context_disabled(client):
+    response = client.get('/', HTTP_TRACEPARENT='00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01')
+    assert response['Correlation-ID'] != '4bf92f3577b34da6a3ce929d0e0e4736'
+    assert 'traceparent' not in response
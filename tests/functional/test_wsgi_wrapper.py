@@ -0,0 +1,103 @@
+import logging
+
+from django.core.signals import request_started
+from django.core.wsgi import get_wsgi_application
+from django.test import RequestFactory
+
+import pytest
+
+from django_guid.context import guid
+from django_guid.wsgi import guid_wsgi_middleware
+
+GUID = '97c304252fd14b25b72d6aee31565843'
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+TRACEPARENT = f'00-{TRACE_ID}-00f067aa0ba902b7-01'
+
+pytestmark = pytest.mark.usefixtures('keep_connections')
+
+
+def request(path, **headers):
+    environ = RequestFactory().get(path, **headers).environ
+    responses = []
+
+    def start_response(status, headers, exc_info=None):
+        responses.append((status, headers))
+
+    result = guid_wsgi_middleware(get_wsgi_application())(environ, start_response)
+    b''.join(result)
+    result.close()
+    return responses[0]
+
+
+def response_headers(response, name):
+    return [value for key, value in response[1] if key.lower() == name.lower()]
+
+
+@pytest.fixture
+def early_log():
+    """
+    Logs from a `request_started` receiver, which runs before the middleware chain.
+    """
+
+    def receiver(**kwargs):
+        logging.getLogger('django_guid').info('Request started')
+
+    request_started.connect(receiver)
+    yield
+    request_started.disconnect(receiver)
+
+
+def test_guid_from_header(caplog, early_log):
+    response = request('/', HTTP_CORRELATION_ID=GUID)
+    assert response[0] == '200 OK'
+    assert response_headers(response, 'Correlation-ID') == [GUID]
+    assert response_headers(response, 'Access-Control-Expose-Headers') == ['Correlation-ID']
+    records = [(x.message, x.correlation_id) for x in caplog.records]
+    assert ('Request started', GUID) in records
+    assert ('This log message should have a GUID', GUID) in records
+    assert guid.get() is None
+
+
+def test_generated_guid_is_assigned_once(caplog, mock_uuid_two_unique, two_unique_uuid4):
+    """
+    The middleware must reuse the wrapper's GUID, rather than generate a second one.
+    """
+    response = request('/')
+    assert response_headers(response, 'Correlation-ID') == [two_unique_uuid4[0]]
+    assert {x.correlation_id for x in caplog.records if x.message == 'This log message should have a GUID'} == {
+        two_unique_uuid4[0]
+    }
+
+
+def test_ignored_url(caplog):
+    response = request('/no-guid', HTTP_CORRELATION_ID=GUID)
+    assert response_headers(response, 'Correlation-ID') == []
+    assert all(x.correlation_id is None for x in caplog.records)
+
+
+def test_no_return_header(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'RETURN_HEADER': False}
+    response = request('/', HTTP_CORRELATION_ID=GUID)
+    assert response_headers(response, 'Correlation-ID') == []
+
+
+def test_without_middleware(settings, caplog):
+    settings.MIDDLEWARE = [m for m in settings.MIDDLEWARE if m != 'django_guid.middleware.guid_middleware']
+    response = request('/', HTTP_CORRELATION_ID=GUID)
+    assert response_headers(response, 'Correlation-ID') == [GUID]
+    assert ('This log message should have a GUID', GUID) in [(x.message, x.correlation_id) for x in caplog.records]
+
+
+def test_trace_context(settings, caplog):
+    """
+    With TRACE_CONTEXT enabled, the wrapper uses the trace-id of the `traceparent` header as the GUID, and the
+    middleware continues its trace.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'TRACE_CONTEXT': True}
+    response = request('/', HTTP_TRACEPARENT=TRACEPARENT, HTTP_TRACESTATE='vendor=1', HTTP_CORRELATION_ID=GUID)
+    assert response_headers(response, 'Correlation-ID') == [TRACE_ID]
+    assert response_headers(response, 'Access-Control-Expose-Headers') == ['Correlation-ID, traceparent']
+    (traceparent,) = response_headers(response, 'traceparent')
+    assert traceparent.startswith(f'00-{TRACE_ID}-') and traceparent.endswith('-01')
+    assert response_headers(response, 'tracestate') == ['vendor=1']
+    assert ('This log message should have a GUID', TRACE_ID) in [(x.message, x.correlation_id) for x in caplog.records]
@@ -41,7 +41,7 @@ def test_validate_uuid_length():
     Test that validation for uuid_length works as expected
     """
     invalid_settings = [True, False, {}, [], 'asd', -1, 0, 3.3, 33]
-    valid_settings = [1, 15, 32]
+    valid_settings = [None, 1, 15, 32]
     for setting in invalid_settings:
         with pytest.raises(ImproperlyConfigured, match='The CeleryIntegration uuid_length setting must be an integer.'):
             CeleryIntegrationSettings(CeleryIntegration(uuid_length=setting))
@@ -50,6 +50,21 @@ def test_validate_uuid_length():
         CeleryIntegrationSettings(CeleryIntegration(uuid_length=setting))
 
 
+@pytest.mark.parametrize('uuid_format,length', [('uuidv7', 36), ('ulid', 26)])
+def test_validate_uuid_length_time_ordered(uuid_format, length):
+    """
+    Time-ordered IDs can't be shortened, as only their timestamp would be kept
+    """
+    for setting in [1, 15, 32, length + 1, float(length)]:
+        with pytest.raises(
+            ImproperlyConfigured, match=f'The CeleryIntegration uuid_length setting must be {length} when UUID_FORMAT'
+        ):
+            CeleryIntegrationSettings(CeleryIntegration(uuid_length=setting), uuid_format)
+
+    for setting in [None, length]:
+        CeleryIntegrationSettings(CeleryIntegration(uuid_length=setting), uuid_format)
+
+
 def test_validate_sentry_integration():
     """
     Test that validation for sentry_integration works as expected
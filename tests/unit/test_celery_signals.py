@@ -9,7 +9,8 @@ from pytest_mock import MockerFixture
 from django_guid import get_guid, set_guid
 from django_guid.config import Settings
 from django_guid.integrations import CeleryIntegration
-from django_guid.integrations.celery.context import celery_current, celery_parent
+from django_guid.integrations.celery.context import celery_current, celery_depth, celery_parent, celery_root
+from django_guid.integrations.celery.lineage import Lineage, get_lineage, lineage_header
 from django_guid.integrations.celery.signals import (
     clean_up,
     parent_header,
@@ -57,16 +58,20 @@ def test_task_publish_includes_correct_depth_headers(monkeypatch):
 
         headers = {}
         publish_task_from_worker_or_request(headers=headers)
-        # The parent header should not be in headers, because
+        # The lineage header should not be in headers, because
         # There should be no celery_current context
+        assert lineage_header not in headers
         assert parent_header not in headers
 
         for correlation_id in ['test', 123, -1]:
             headers = {}
             celery_current.set(correlation_id)
             publish_task_from_worker_or_request(headers=headers)
-            # Here the celery-parent-id header should exist
+            # Here the lineage header should exist, with the current ID as the root
+            assert headers[lineage_header] == f'{correlation_id}:{correlation_id}:00000000'
+            # The parent ID header read by earlier versions is still sent, for rolling upgrades
             assert headers[parent_header] == correlation_id
+        celery_current.set(None)
 
 
 def test_worker_prerun_guid_exists(monkeypatch, mocker: MockerFixture, two_unique_uuid4):
@@ -144,6 +149,8 @@ def test_cleanup(monkeypatch, mocker: MockerFixture):
     set_guid('123')
     celery_current.set('123')
     celery_parent.set('123')
+    celery_root.set('123')
+    celery_depth.set(1)
 
     mocked_settings = deepcopy(django_settings.DJANGO_GUID)
     mocked_settings['INTEGRATIONS'] = [CeleryIntegration(log_parent=True)]
@@ -153,6 +160,56 @@ def test_cleanup(monkeypatch, mocker: MockerFixture):
         clean_up(task=mocker.Mock())
 
     assert [get_guid(), celery_current.get(), celery_parent.get()] == [None, None, None]
+    assert [celery_root.get(), celery_depth.get()] == [None, None]
+
+
+def test_worker_prerun_extends_lineage(settings, mocker: MockerFixture, mock_uuid_two_unique):
+    """
+    The root is kept, the publishing task's current ID becomes the parent, and the depth is incremented.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [CeleryIntegration(log_parent=True)]}
+    mock_task = mocker.Mock()
+    mock_task.request = {'Correlation-ID': None, lineage_header: 'root:1234:00000002'}
+    worker_prerun(mock_task)
+    assert get_lineage() == Lineage('root', '1234', 'c494886651cd4baaa8654e4d24a8mock', 3)
+
+    headers = {}
+    publish_task_from_worker_or_request(headers=headers)
+    assert headers[lineage_header] == 'root:c494886651cd4baaa8654e4d24a8mock:00000003'
+    assert headers[parent_header] == 'c494886651cd4baaa8654e4d24a8mock'
+    clean_up(task=mock_task)
+    assert get_lineage() is None
+
+
+def test_worker_prerun_starts_lineage(settings, mocker: MockerFixture, mock_uuid_two_unique):
+    """
+    Tasks without a (valid) lineage header are roots.
+    """
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [CeleryIntegration(log_parent=True)]}
+    mock_task = mocker.Mock()
+    mock_task.request = {'Correlation-ID': None, lineage_header: 'not-a-lineage'}
+    worker_prerun(mock_task)
+    current = 'c494886651cd4baaa8654e4d24a8mock'
+    assert get_lineage() == Lineage(current, None, current, 0)
+    clean_up(task=mock_task)
+
+
+def test_worker_prerun_time_ordered_ids_are_not_shortened(settings, mocker: MockerFixture):
+    """
+    Without a uuid_length, task IDs in time-ordered formats are generated at full length.
+    """
+    settings.DJANGO_GUID = {
+        **settings.DJANGO_GUID,
+        'UUID_FORMAT': 'uuidv7',
+        'UUID_LENGTH': 36,
+        'INTEGRATIONS': [CeleryIntegration(log_parent=True)],
+    }
+    mock_task = mocker.Mock()
+    mock_task.request = {'Correlation-ID': None}
+    worker_prerun(mock_task)
+    assert len(get_guid()) == 36
+    assert len(celery_current.get()) == 36
+    clean_up(task=mock_task)
 
 
 def test_set_transaction_id(monkeypatch, caplog):
@@ -190,3 +247,93 @@ def test_dont_set_transaction_id(monkeypatch, caplog):
         set_transaction_id(guid)
     logger.removeHandler(caplog.handler)
     assert f'Setting Sentry transaction_id to {guid}' not in [record.message for record in caplog.records]
+
+
+def test_worker_prerun_metrics(monkeypatch, mocker: MockerFixture):
+    """
+    Tests that propagated and generated task IDs are counted.
+    """
+    from django_guid.metrics import MetricsRegistry
+
+    metrics = MetricsRegistry()
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['INTEGRATIONS'] = [CeleryIntegration()]
+    mocked_settings['METRICS'] = metrics
+    with override_settings(DJANGO_GUID=mocked_settings):
+        settings = Settings()
+        monkeypatch.setattr('django_guid.integrations.celery.signals.settings', settings)
+        for correlation_id in ['704ae5472cae4f8daa8f2cc5a5a8mock', None, None]:
+            mock_task = mocker.Mock()
+            mock_task.request = {'Correlation-ID': correlation_id}
+            worker_prerun(mock_task)
+    assert metrics.counter('django_guid_celery_task_ids_total', 'propagated') == 1
+    assert metrics.counter('django_guid_celery_task_ids_total', 'generated') == 2
+
+
+def test_signal_handlers_are_bound_once(monkeypatch, mocker: MockerFixture):
+    """
+    Tests that the Celery settings are resolved and validated once, not for every task.
+    """
+    from django_guid.integrations.celery import signals
+    from django_guid.integrations.celery.config import CeleryIntegrationSettings
+
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['INTEGRATIONS'] = [CeleryIntegration(log_parent=True, sentry_integration=True)]
+    with override_settings(DJANGO_GUID=mocked_settings):
+        settings = Settings()
+        settings.validate()
+        monkeypatch.setattr('django_guid.integrations.celery.signals.settings', settings)
+        build = mocker.spy(signals, 'build_signal_handlers')
+        validate = mocker.spy(CeleryIntegrationSettings, 'validate')
+        for _ in range(3):
+            headers = {}
+            publish_task_from_worker_or_request(headers=headers)
+            mock_task = mocker.Mock()
+            mock_task.request = headers
+            worker_prerun(mock_task)
+            clean_up(mock_task)
+    assert build.call_count == 1
+    assert validate.call_count == 1
+
+
+def test_setup_binds_signal_handlers(settings):
+    """
+    Tests that CeleryIntegration.setup binds the signal handlers to the settings it is configured in.
+    """
+    from django_guid.config import settings as guid_settings
+    from django_guid.integrations.celery.signals import get_signal_handlers
+
+    integration = CeleryIntegration(log_parent=True)
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'INTEGRATIONS': [integration]}
+    integration.setup()
+    handlers = get_signal_handlers()
+    assert handlers.conf is guid_settings.snapshot
+    assert handlers.conf.integration_settings.celery.log_parent is True
+
+
+def test_trace_context_is_passed_to_tasks(settings, mocker: MockerFixture):
+    """
+    The Trace Context of the publisher is sent with the task, and the task continues the trace with a new span ID.
+    """
+    from django_guid.context import trace_parent, trace_state
+    from django_guid.trace_context import clear_trace_context
+
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'TRACE_CONTEXT': True, 'INTEGRATIONS': [CeleryIntegration()]}
+    set_guid('4bf92f3577b34da6a3ce929d0e0e4736')
+    trace_parent.set('00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01')
+    trace_state.set('congo=t61rcWkgMzE')
+    headers = {}
+    publish_task_from_worker_or_request(headers=headers)
+    assert headers['traceparent'] == '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+    assert headers['tracestate'] == 'congo=t61rcWkgMzE'
+    clear_trace_context()
+
+    mock_task = mocker.Mock()
+    mock_task.request = headers
+    worker_prerun(mock_task)
+    assert get_guid() == '4bf92f3577b34da6a3ce929d0e0e4736'
+    assert trace_parent.get().startswith('00-4bf92f3577b34da6a3ce929d0e0e4736-')
+    assert trace_parent.get() != headers['traceparent']
+    assert trace_state.get() == 'congo=t61rcWkgMzE'
+    clean_up(task=mock_task)
+    assert trace_parent.get() is None
@@ -100,6 +100,10 @@ def test_not_string_in_igore_urls():
         (0, 'hex', UUID_LENGTH_IS_NOT_INTEGER),
         (33, 'hex', UUID_LENGHT_IS_NOT_CORRECT_RANGE_HEX_FORMAT),
         (37, 'string', UUID_LENGHT_IS_NOT_CORRECT_RANGE_STRING_FORMAT),
+        (37, 'uuidv7', 'UUID_LENGTH must be 36 when UUID_FORMAT is uuidv7'),
+        (12, 'uuidv7', 'UUID_LENGTH must be 36 when UUID_FORMAT is uuidv7'),
+        (27, 'ulid', 'UUID_LENGTH must be 26 when UUID_FORMAT is ulid'),
+        (10, 'ulid', 'UUID_LENGTH must be 26 when UUID_FORMAT is ulid'),
     ],
 )
 def test_uuid_len_fail(uuid_length, uuid_format, error_message):
@@ -116,7 +120,7 @@ def test_uuid_format_fail(uuid_format):
     mocked_settings = deepcopy(django_settings.DJANGO_GUID)
     mocked_settings['UUID_FORMAT'] = uuid_format
     with override_settings(DJANGO_GUID=mocked_settings):
-        with pytest.raises(ImproperlyConfigured, match='UUID_FORMAT must be either hex or string'):
+        with pytest.raises(ImproperlyConfigured, match='UUID_FORMAT must be one of hex, string, uuidv7 or ulid'):
             Settings().validate()
 
 
@@ -126,3 +130,104 @@ def test_converts_correctly():
     with override_settings(DJANGO_GUID=mocked_settings):
         assert 'my/api/path' in Settings().ignore_urls
         assert 'no-guid' in Settings().ignore_urls
+
+
+def test_snapshot_is_immutable():
+    snapshot = Settings().snapshot
+    with pytest.raises(AttributeError, match='SettingsSnapshot is immutable'):
+        snapshot.guid_header_name = 'Other-ID'
+    with pytest.raises(AttributeError, match='SettingsSnapshot is immutable'):
+        del snapshot.guid_header_name
+
+
+def test_snapshot_values():
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['GUID_HEADER_NAME'] = 'Request-ID'
+    mocked_settings['IGNORE_URLS'] = ['/no-guid/', 'no-guid', 'health']
+    mocked_settings['UUID_FORMAT'] = 'string'
+    with override_settings(DJANGO_GUID=mocked_settings):
+        snapshot = Settings().snapshot
+    assert snapshot.guid_header_name == 'Request-ID'
+    assert snapshot.ignore_urls == frozenset({'no-guid', 'health'})
+    assert snapshot.uuid_format == 'string'
+    assert snapshot.uuid_length == 36
+    assert snapshot.integrations == ()
+
+
+def test_snapshot_is_reused():
+    settings = Settings()
+    assert settings.snapshot is settings.snapshot
+
+
+def test_snapshot_rebuilt_on_setting_changed():
+    from django_guid.config import settings
+
+    old_snapshot = settings.snapshot
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['GUID_HEADER_NAME'] = 'Request-ID'
+    with override_settings(DJANGO_GUID=mocked_settings):
+        assert settings.snapshot is not old_snapshot
+        assert settings.snapshot.guid_header_name == 'Request-ID'
+    assert settings.snapshot.guid_header_name == old_snapshot.guid_header_name
+
+
+def test_invalid_regex_in_ignore_urls():
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['IGNORE_URLS'] = ['^api/(unclosed']
+    with override_settings(DJANGO_GUID=mocked_settings):
+        with pytest.raises(ImproperlyConfigured, match='IGNORE_URLS contains an invalid regular expression'):
+            Settings().validate()
+
+
+@pytest.mark.parametrize('cache_size', [-1, 1.5, '10', True, None])
+def test_invalid_validate_guid_cache_size(cache_size):
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['VALIDATE_GUID_CACHE_SIZE'] = cache_size
+    with override_settings(DJANGO_GUID=mocked_settings):
+        with pytest.raises(ImproperlyConfigured, match='VALIDATE_GUID_CACHE_SIZE must be a non-negative integer'):
+            Settings().validate()
+
+
+@pytest.mark.parametrize('timeout', [0, -1, '1', True])
+def test_invalid_integration_timeout(timeout):
+    mocked_settings = deepcopy(django_settings.DJANGO_GUID)
+    mocked_settings['INTEGRATION_TIMEOUT'] = timeout
+    with override_settings(DJANGO_GUID=mocked_settings):
+        with pytest.raises(ImproperlyConfigured, match='INTEGRATION_TIMEOUT must be a positive number of seconds'):
+            Settings().validate()
+
+
+def test_integration_timeout():
+    with override_settings(DJANGO_GUID={'INTEGRATION_TIMEOUT': 0.5}):
+        assert Settings().snapshot.integration_timeout == 0.5
+    with override_settings(DJANGO_GUID={}):
+        assert Settings().snapshot.integration_timeout is None
+
+
+@pytest.mark.parametrize(
+    'log_events, error_message',
+    [
+        ('header', 'LOG_EVENTS must be an array'),
+        (['header', 'requests'], 'LOG_EVENTS can only contain celery, context, header, integrations, middleware'),
+    ],
+)
+def test_invalid_log_events(log_events, error_message):
+    with override_settings(DJANGO_GUID={'LOG_EVENTS': log_events}):
+        with pytest.raises(ImproperlyConfigured, match=error_message):
+            Settings().validate()
+
+
+@pytest.mark.parametrize('interval', [-1, '60', None])
+def test_invalid_header_log_interval(interval):
+    with override_settings(DJANGO_GUID={'INVALID_HEADER_LOG_INTERVAL': interval}):
+        with pytest.raises(
+            ImproperlyConfigured, match='INVALID_HEADER_LOG_INTERVAL must be a non-negative number of seconds'
+        ):
+            Settings().validate()
+
+
+@pytest.mark.parametrize('trace_context', ['true', 1, None])
+def test_invalid_trace_context(trace_context):
+    with override_settings(DJANGO_GUID={'TRACE_CONTEXT': trace_context}):
+        with pytest.raises(ImproperlyConfigured, match='TRACE_CONTEXT must be a boolean'):
+            Settings().validate()
@@ -0,0 +1,144 @@
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ImproperlyConfigured
+
+import pytest
+
+from django_guid.generators import TimeOrderedGenerator, UUID4Pool, pool, ulid, uuid4_hex_block, uuid7_hex
+from django_guid.utils import generate_guid, generate_guids, validate_guid
+
+
+def test_block_contains_valid_uuid4s():
+    block = uuid4_hex_block(100)
+    assert len(block) == 3200
+    for i in range(0, len(block), 32):
+        parsed = uuid.UUID(block[i : i + 32])
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+
+
+def test_pool_refills():
+    small_pool = UUID4Pool(block_size=2)
+    guids = {small_pool.uuid4_hex() for _ in range(5)}
+    assert len(guids) == 5
+    assert all(len(guid) == 32 for guid in guids)
+
+
+def test_pool_is_thread_safe():
+    thread_pool = UUID4Pool(block_size=16)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        guids = list(executor.map(lambda _: thread_pool.uuid4_hex(), range(2000)))
+    assert len(set(guids)) == 2000
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires os.fork')
+def test_pool_is_reset_after_fork():
+    """
+    A forked child must not hand out the IDs buffered in the parent.
+    """
+    pool.uuid4_hex()  # Make sure the buffer is filled
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        os.close(read_fd)
+        os.write(write_fd, pool.uuid4_hex().encode())
+        os._exit(0)
+    os.close(write_fd)
+    child_guid = os.read(read_fd, 32).decode()
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    assert child_guid != pool.uuid4_hex()
+
+
+@pytest.mark.parametrize('uuid_length,expected_length', [(None, 32), (10, 10), (32, 32)])
+def test_generate_guids(uuid_length, expected_length):
+    guids = generate_guids(1000, uuid_length=uuid_length)
+    assert len(guids) == 1000
+    assert len(set(guids)) == 1000
+    assert all(len(guid) == expected_length for guid in guids)
+
+
+def test_generate_guids_string_format(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'UUID_FORMAT': 'string'}
+    guids = generate_guids(10)
+    assert all(str(uuid.UUID(guid)) == guid for guid in guids)
+
+
+def test_generate_guids_empty():
+    assert generate_guids(0) == []
+
+
+def test_time_ordered_generator_is_monotonic(mocker):
+    """
+    Values within the same millisecond must increase, even if the clock goes backwards.
+    """
+    generator = TimeOrderedGenerator(random_bits=8)
+    mocker.patch('django_guid.generators.time.time_ns', side_effect=[5_000_000, 5_000_000, 4_000_000, 6_000_000])
+    values = [generator.next_value() for _ in range(4)]
+    assert values == sorted(values)
+    assert len(set(values)) == 4
+    assert [value >> 8 for value in values[:3]] == [5, 5, 5]
+    assert values[3] >> 8 == 6
+
+
+def test_uuid7():
+    before = time.time_ns() // 1_000_000
+    guids = [uuid7_hex() for _ in range(1000)]
+    after = time.time_ns() // 1_000_000
+    assert guids == sorted(guids)
+    assert len(set(guids)) == 1000
+    for guid in guids:
+        parsed = uuid.UUID(guid)
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+        assert before <= parsed.int >> 80 <= after
+
+
+def test_ulid():
+    before = time.time_ns() // 1_000_000
+    ulids = [ulid() for _ in range(1000)]
+    after = time.time_ns() // 1_000_000
+    assert ulids == sorted(ulids)
+    assert len(set(ulids)) == 1000
+    alphabet = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+    for value in ulids:
+        assert len(value) == 26
+        timestamp = 0
+        for character in value[:10]:
+            timestamp = timestamp * 32 + alphabet.index(character)
+        assert before <= timestamp <= after
+
+
+@pytest.mark.parametrize('uuid_format,length', [('uuidv7', 36), ('ulid', 26)])
+def test_generate_time_ordered_guid(settings, uuid_format, length):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'UUID_FORMAT': uuid_format}
+    guids = [generate_guid() for _ in range(100)] + generate_guids(100)
+    assert guids == sorted(guids)
+    assert all(len(guid) == length for guid in guids)
+    assert all(validate_guid(guid) for guid in guids)
+
+
+def test_unknown_uuid_format_is_rejected(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'UUID_FORMAT': 'uuidv1'}
+    with pytest.raises(ImproperlyConfigured, match='UUID_FORMAT must be one of hex, string, uuidv7 or ulid'):
+        generate_guid()
+    with pytest.raises(ImproperlyConfigured, match='UUID_FORMAT must be one of hex, string, uuidv7 or ulid'):
+        generate_guids(2)
+
+
+@pytest.mark.parametrize('uuid_format,length', [('uuidv7', 36), ('ulid', 26)])
+def test_time_ordered_guids_are_not_shortened(settings, uuid_format, length):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'UUID_FORMAT': uuid_format}
+    with pytest.raises(ValueError, match=f'{uuid_format} IDs can not be shortened to 12 characters'):
+        generate_guid(uuid_length=12)
+    with pytest.raises(ValueError, match=f'{uuid_format} IDs can not be shortened to 12 characters'):
+        generate_guids(2, uuid_length=12)
+    assert len(generate_guid(uuid_length=length)) == length
+
+    # UUID_LENGTH is only validated at startup, so changes at runtime are checked when generating
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'UUID_LENGTH': 12}
+    with pytest.raises(ValueError, match=f'{uuid_format} IDs can not be shortened to 12 characters'):
+        generate_guid()
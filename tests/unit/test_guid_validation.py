@@ -1,4 +1,8 @@
+import pytest
+
+from django_guid import config as settings_module
 from django_guid.utils import validate_guid
+from django_guid.validation import GUIDValidator
 
 
 def test_valid_guid():
@@ -7,3 +11,65 @@ def test_valid_guid():
 
 def test_is_valid_dashed_guid():
     assert validate_guid('07742cab-407e-4e80-89eb-fd191acbb752') is True
+
+
+def test_is_valid_uuid7():
+    assert validate_guid('01a14f3a-fea0-7b96-a4c9-b02d142ebd78') is True
+
+
+def test_ulid_is_valid_with_ulid_format(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'UUID_FORMAT': 'ulid'}
+    assert validate_guid('01M57KNZN028M29C35XA6Z5QDN') is True
+    assert validate_guid('01m57knzn028m29c35xa6z5qdn') is True
+    assert validate_guid('07742cab407e4e8089ebfd191acbb752') is True
+    assert validate_guid('81M57KNZN028M29C35XA6Z5QDN') is False
+    assert validate_guid('01M57KNZN028M29C35XA6Z5QDU') is False
+
+
+def test_ulid_is_invalid_with_hex_format():
+    assert validate_guid('01M57KNZN028M29C35XA6Z5QDN') is False
+
+
+@pytest.mark.parametrize(
+    'value,expected',
+    [
+        ('07742CAB407E4E8089EBFD191ACBB752', True),
+        ('{07742cab-407e-4e80-89eb-fd191acbb752}', True),
+        ('urn:uuid:07742cab-407e-4e80-89eb-fd191acbb752', True),
+        ('07742cab-407e4e80-89eb-fd191acbb752', False),
+        ('07742cab407e4e8089ebfd191acbb75', False),
+        ('07742cab407e4e8089ebfd191acbb752a', False),
+        ('07742cab407e4e8089ebfd191acbb75g', False),
+        ('07742cab407e4e8089ebfd191acbb752' * 10_000, False),
+        ('', False),
+    ],
+)
+def test_validator(value, expected):
+    assert GUIDValidator()(value) is expected
+
+
+def test_validator_cache():
+    validator = GUIDValidator(cache_size=2)
+    guids = ['07742cab407e4e8089ebfd191acbb752', '07742cab407e4e8089ebfd191acbb753', '07742cab407e4e8089ebfd191acbb754']
+    for guid in guids:
+        assert validator(guid) is True
+    assert list(validator.cache) == guids[1:]
+
+    # A hit moves the GUID to the end, so the other one is evicted next
+    assert validator(guids[1]) is True
+    assert validator(guids[0]) is True
+    assert list(validator.cache) == [guids[1], guids[0]]
+
+    # Invalid input is never cached
+    assert validator('bad-guid') is False
+    assert list(validator.cache) == [guids[1], guids[0]]
+
+
+def test_validator_cache_disabled():
+    assert GUIDValidator().cache is None
+
+
+def test_validator_cache_setting(settings):
+    settings.DJANGO_GUID = {**settings.DJANGO_GUID, 'VALIDATE_GUID_CACHE_SIZE': 10}
+    assert validate_guid('07742cab407e4e8089ebfd191acbb752') is True
+    assert list(settings_module.settings.snapshot.guid_validator.cache) == ['07742cab407e4e8089ebfd191acbb752']
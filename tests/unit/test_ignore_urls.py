@@ -0,0 +1,39 @@
+import pytest
+
+from django_guid.matching import IgnoreURLMatcher
+
+
+@pytest.mark.parametrize(
+    'rules,path,expected',
+    [
+        (['no-guid'], '/no-guid', True),
+        (['/no-guid/'], '/no-guid', True),
+        (['no-guid'], '/no-guid/', True),
+        (['no-guid'], '/no-guid/other', False),
+        (['health/*'], '/health/', True),
+        (['health/*'], '/health/live', True),
+        (['health/*'], '/health/live/deep', True),
+        (['health/*'], '/healthy', False),
+        (['api/v?/status'], '/api/v1/status', True),
+        (['api/v?/status'], '/api/v10/status', False),
+        ([r'^api/v\d+/status$'], '/api/v10/status', True),
+        ([r'^api/v\d+/status$'], '/api/v10/status/more', False),
+        ([r'^metrics'], '/metrics/prometheus', True),
+        ([r'^metrics'], '/other/metrics', False),
+        (['no-guid', 'health/*', r'^metrics'], '/metrics', True),
+        (['^admin/'], '/admin/', True),
+        (['^admin/'], '/admin/users', True),
+        (['^admin/'], '/administrator/x', False),
+        (['^/admin/'], '/admin/users', True),
+        (['^/admin/'], '/administrator/x', False),
+        ([], '/no-guid', False),
+    ],
+)
+def test_matcher(rules, path, expected):
+    assert IgnoreURLMatcher(rules)(path) is expected
+
+
+def test_matcher_bool():
+    assert not IgnoreURLMatcher([])
+    assert IgnoreURLMatcher(['no-guid'])
+    assert IgnoreURLMatcher(['^no-guid'])
@@ -0,0 +1,93 @@
+import logging
+import time
+
+from django_guid.log_events import RateLimitedWarnings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeTimer:
+    def __init__(self, interval, function):
+        self.interval = interval
+        self.function = function
+        self.daemon = False
+        self.started = False
+        self.cancelled = False
+
+    def start(self):
+        self.started = True
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def test_warnings_are_not_limited_without_interval(caplog):
+    warnings = RateLimitedWarnings(logging.getLogger('django_guid'), 'Correlation-ID', 0)
+    for _ in range(3):
+        warnings.warning('invalid', 'bad is not a valid GUID')
+    assert [record.message for record in caplog.records] == ['bad is not a valid GUID'] * 3
+
+
+def test_warnings_are_aggregated(caplog):
+    clock = FakeClock()
+    timers = []
+
+    def make_timer(interval, function):
+        timers.append(FakeTimer(interval, function))
+        return timers[-1]
+
+    warnings = RateLimitedWarnings(
+        logging.getLogger('django_guid'), 'Correlation-ID', 60, clock=clock, make_timer=make_timer
+    )
+    warnings.warning('invalid', '%s is not a valid GUID', 'first')
+    for _ in range(3):
+        warnings.warning('invalid', '%s is not a valid GUID', 'suppressed')
+    warnings.warning('oversized', 'Oversized Correlation-ID provided')
+    clock.now += 60
+    warnings.warning('non-alnum', 'Non-alnum Correlation-ID provided')
+    warnings.warning('invalid', '%s is not a valid GUID', 'suppressed')
+    clock.now += 59
+    warnings.warning('invalid', '%s is not a valid GUID', 'suppressed')
+
+    assert [record.message for record in caplog.records] == [
+        'first is not a valid GUID',
+        'Suppressed 4 warnings about invalid Correlation-ID headers (3 invalid, 1 oversized)',
+        'Non-alnum Correlation-ID provided',
+    ]
+    assert all(record.levelno == logging.WARNING for record in caplog.records)
+    # A timer is started by the first suppressed warning of each interval, and cancelled by the next interval
+    assert [(timer.interval, timer.started, timer.cancelled) for timer in timers] == [
+        (60, True, True),
+        (60, True, False),
+    ]
+    assert all(timer.daemon for timer in timers)
+
+
+def test_summary_is_logged_when_the_interval_ends(caplog):
+    """
+    A flood of warnings followed by silence is summarised once the interval ends, without waiting for another warning.
+    """
+    warnings = RateLimitedWarnings(logging.getLogger('django_guid'), 'Correlation-ID', 0.05)
+    for _ in range(100):
+        warnings.warning('invalid', 'bad is not a valid GUID')
+    assert [record.message for record in caplog.records] == ['bad is not a valid GUID']
+
+    deadline = time.monotonic() + 5
+    while len(caplog.records) == 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [record.message for record in caplog.records] == [
+        'bad is not a valid GUID',
+        'Suppressed 99 warnings about invalid Correlation-ID headers (99 invalid)',
+    ]
+    assert warnings.timer is None
+
+    # The next warning starts a new interval, without another summary
+    warnings.warning('oversized', 'Oversized Correlation-ID provided')
+    assert caplog.records[-1].message == 'Oversized Correlation-ID provided'
+    assert warnings.timer is None
@@ -0,0 +1,120 @@
+import json
+import logging
+import sys
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from django_guid import clear_guid, set_guid
+from django_guid.integrations.celery.context import celery_current, celery_parent
+from django_guid.log_formatters import JsonFormatter
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def formatter_class(request, monkeypatch):
+    """
+    Runs each test with orjson, and with the standard library `json` module.
+    """
+    if request.param == 'json':
+        monkeypatch.setattr('django_guid.log_formatters.orjson', None)
+    yield JsonFormatter
+    clear_guid()
+    celery_parent.set(None)
+    celery_current.set(None)
+
+
+def make_record(name='django_guid.test', level=logging.INFO, msg='Processed order %s', args=(42,), **kwargs):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, kwargs.pop('exc_info', None), **kwargs)
+    record.created, record.msecs = 1_700_000_000.5, 500.0
+    return record
+
+
+def test_ids_are_read_from_the_context(formatter_class):
+    formatter = formatter_class()
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    celery_parent.set('c494886651cd4baaa8654e4d24a8mock')
+    celery_current.set('97c304252fd14b25b72d6aee31565842')
+
+    line = formatter.format(make_record())
+
+    assert json.loads(line) == {
+        'timestamp': '2023-11-14T22:13:20.500Z',
+        'level': 'INFO',
+        'logger': 'django_guid.test',
+        'message': 'Processed order 42',
+        'correlation_id': '704ae5472cae4f8daa8f2cc5a5a8mock',
+        'celery_parent_id': 'c494886651cd4baaa8654e4d24a8mock',
+        'celery_current_id': '97c304252fd14b25b72d6aee31565842',
+    }
+    assert '\n' not in line
+
+
+def test_ids_are_null_outside_a_request(formatter_class):
+    output = json.loads(formatter_class().format(make_record()))
+    assert output['correlation_id'] is None
+    assert output['celery_parent_id'] is None
+    assert output['celery_current_id'] is None
+
+
+def test_fields_and_static_fields(formatter_class):
+    formatter = formatter_class(fields=['user_id', 'order', 'missing'], static_fields={'service': 'shop'})
+    record = make_record(msg='Said "hi" to %s\n', args=('Åse',))
+    record.user_id = 7
+    record.order = {'id': 42, 'lines': [1, 2]}
+    record.ignored = 'not listed in fields'
+
+    output = json.loads(formatter.format(record))
+
+    assert output['message'] == 'Said "hi" to Åse\n'
+    assert output['service'] == 'shop'
+    assert output['user_id'] == 7
+    assert output['order'] == {'id': 42, 'lines': [1, 2]}
+    assert 'missing' not in output
+    assert 'ignored' not in output
+
+
+def test_values_json_cannot_serialize_are_converted_to_strings(formatter_class):
+    formatter = formatter_class(fields=['price'], static_fields={'released': date(2026, 10, 18)})
+    record = make_record()
+    record.price = Decimal('9.50')
+
+    output = json.loads(formatter.format(record))
+
+    assert output['price'] == '9.50'
+    assert output['released'] == '2026-10-18'
+
+
+def test_static_parts_are_cached_per_logger_and_level(formatter_class):
+    formatter = formatter_class(static_fields={'service': 'shop'})
+    first = formatter.format(make_record())
+    formatter.format(make_record(name='django_guid.other', level=logging.WARNING))
+    second = formatter.format(make_record())
+
+    assert first == second
+    assert set(formatter.prefixes) == {('django_guid.test', logging.INFO), ('django_guid.other', logging.WARNING)}
+    assert json.loads(formatter.format(make_record(name='django_guid.other', level=logging.WARNING)))['level'] == (
+        'WARNING'
+    )
+
+
+def test_timestamp_changes_with_the_second(formatter_class):
+    formatter = formatter_class()
+    record = make_record()
+    assert json.loads(formatter.format(record))['timestamp'] == '2023-11-14T22:13:20.500Z'
+    record.created, record.msecs = 1_700_000_061.007, 7.0
+    assert json.loads(formatter.format(record))['timestamp'] == '2023-11-14T22:14:21.007Z'
+
+
+def test_exceptions_and_stacks(formatter_class):
+    formatter = formatter_class()
+    try:
+        raise ValueError('Out of stock')
+    except ValueError:
+        record = make_record(exc_info=sys.exc_info(), sinfo='Stack (most recent call last):\n  ...')
+
+    output = json.loads(formatter.format(record))
+
+    assert output['exc_info'].startswith('Traceback (most recent call last):')
+    assert output['exc_info'].endswith('ValueError: Out of stock')
+    assert output['stack_info'] == 'Stack (most recent call last):\n  ...'
@@ -0,0 +1,180 @@
+import logging
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+
+import pytest
+
+from django_guid import clear_guid, set_guid
+from django_guid.integrations.celery.context import celery_current, celery_parent
+from django_guid.log_filters import CorrelationId
+from django_guid.log_handlers import GuidQueueHandler
+
+
+class RecordingHandler(logging.Handler):
+    """
+    Records the IDs seen by the handler's filters, and the thread the records were handled on.
+    """
+
+    def __init__(self, gate=None):
+        super().__init__()
+        self.addFilter(CorrelationId(correlation_id_field='filtered_id'))
+        self.gate = gate
+        self.seen = []
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.seen.append(
+            (
+                record.getMessage(),
+                record.correlation_id,
+                record.filtered_id,
+                record.celery_parent_id,
+                record.celery_current_id,
+                threading.current_thread() is threading.main_thread(),
+            )
+        )
+
+
+@pytest.fixture
+def queue_logger():
+    logger = logging.getLogger('django_guid.test_queue')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    yield logger
+    logger.handlers.clear()
+    clear_guid()
+    celery_parent.set(None)
+    celery_current.set(None)
+
+
+def test_ids_are_captured_when_logged(queue_logger):
+    target = RecordingHandler()
+    handler = GuidQueueHandler([target])
+    queue_logger.addHandler(handler)
+
+    set_guid('704ae5472cae4f8daa8f2cc5a5a8mock')
+    celery_parent.set('c494886651cd4baaa8654e4d24a8mock')
+    celery_current.set('97c304252fd14b25b72d6aee31565842')
+    queue_logger.info('First %s', 'message')
+    clear_guid()
+    queue_logger.info('Second message')
+    handler.close()
+
+    assert target.seen == [
+        (
+            'First message',
+            '704ae5472cae4f8daa8f2cc5a5a8mock',
+            '704ae5472cae4f8daa8f2cc5a5a8mock',  # The filter on the target handler reads the captured GUID
+            'c494886651cd4baaa8654e4d24a8mock',
+            '97c304252fd14b25b72d6aee31565842',
+            False,
+        ),
+        (
+            'Second message',
+            None,
+            None,
+            'c494886651cd4baaa8654e4d24a8mock',
+            '97c304252fd14b25b72d6aee31565842',
+            False,
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    'overflow, expected',
+    [
+        ('drop_newest', ['message 0', 'message 1', 'message 2']),
+        ('drop_oldest', ['message 0', 'message 3', 'message 4']),
+    ],
+)
+def test_overflow_policies(queue_logger, overflow, expected):
+    """
+    With the listener stuck on the first record, two more fit in the queue.
+    """
+    gate = threading.Event()
+    target = RecordingHandler(gate)
+    handler = GuidQueueHandler([target], maxsize=2, overflow=overflow)
+    queue_logger.addHandler(handler)
+
+    queue_logger.info('message 0')
+    while not handler.queue.empty():  # Wait for the listener to take the first record
+        pass
+    for number in range(1, 5):
+        queue_logger.info('message %s', number)
+    gate.set()
+    handler.close()
+
+    assert [message for message, *_ in target.seen] == expected
+    assert handler.dropped == 2
+
+
+def test_block_overflow_policy(queue_logger):
+    target = RecordingHandler()
+    handler = GuidQueueHandler([target], maxsize=1, overflow='block')
+    queue_logger.addHandler(handler)
+    for number in range(100):
+        queue_logger.info('message %s', number)
+    handler.close()
+
+    assert len(target.seen) == 100
+    assert handler.dropped == 0
+
+
+def test_handlers_by_name(queue_logger):
+    target = RecordingHandler()
+    target.set_name('django_guid_test_target')
+    handler = GuidQueueHandler(['django_guid_test_target'])
+    queue_logger.addHandler(handler)
+    queue_logger.info('message')
+    handler.close()
+    assert len(target.seen) == 1
+
+    handler = GuidQueueHandler(['missing'])
+    with pytest.raises(ImproperlyConfigured, match='GuidQueueHandler could not find the log handler `missing`'):
+        handler.start()
+
+
+def test_records_after_close_are_dropped(queue_logger):
+    target = RecordingHandler()
+    handler = GuidQueueHandler([target])
+    queue_logger.addHandler(handler)
+    handler.close()
+    queue_logger.info('message')
+    assert handler.listener is None
+    assert target.seen == []
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires os.fork')
+def test_handler_is_reset_after_fork(queue_logger):
+    """
+    A forked child starts a listener of its own, as the parent's listener thread doesn't run in the child.
+    """
+    target = RecordingHandler()
+    handler = GuidQueueHandler([target])
+    queue_logger.addHandler(handler)
+    queue_logger.info('parent message')
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        reset = handler.listener is None and handler.queue.empty()
+        queue_logger.info('child message')
+        handler.close()
+        os._exit(0 if reset and [message for message, *_ in target.seen][-1:] == ['child message'] else 1)
+    _, status = os.waitpid(pid, 0)
+    handler.close()
+    assert status == 0
+    assert [message for message, *_ in target.seen] == ['parent message']
+
+
+@pytest.mark.parametrize(
+    'kwargs, message',
+    [
+        ({'maxsize': 0}, 'GuidQueueHandler maxsize must be a positive integer'),
+        ({'overflow': 'drop'}, 'GuidQueueHandler overflow must be one of drop_newest, drop_oldest, block'),
+    ],
+)
+def test_invalid_arguments(kwargs, message):
+    with pytest.raises(ImproperlyConfigured, match=message):
+        GuidQueueHandler(**kwargs)
@@ -0,0 +1,83 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+import pytest
+
+from django_guid.config import Settings
+from django_guid.metrics import CallbackMetrics, Metrics, MetricsRegistry, registry, resolve_metrics
+
+
+def test_registry_counters():
+    metrics = MetricsRegistry()
+    metrics.increment('django_guid_request_ids_total', 'valid')
+    metrics.increment('django_guid_request_ids_total', 'valid')
+    metrics.increment('django_guid_request_ids_total', 'generated')
+    assert metrics.counter('django_guid_request_ids_total', 'valid') == 2
+    assert metrics.counter('django_guid_request_ids_total', 'generated') == 1
+    assert metrics.counter('django_guid_request_ids_total', 'invalid') == 0
+
+
+def test_registry_histograms():
+    metrics = MetricsRegistry(buckets=(0.001, 0.01))
+    for value in (0.0005, 0.001, 0.005, 1.0):
+        metrics.observe('django_guid_incoming_seconds', value)
+    histogram = metrics.histogram('django_guid_incoming_seconds')
+    assert histogram.observations == 4
+    assert histogram.sum == pytest.approx(1.0065)
+    assert histogram.buckets == (2, 1, 1)
+    assert metrics.histogram('django_guid_integration_seconds', 'SentryIntegration', 'run').observations == 0
+
+    metrics.reset()
+    assert metrics.histogram('django_guid_incoming_seconds').observations == 0
+
+
+def test_callback_metrics():
+    calls = []
+    metrics = CallbackMetrics(lambda *args: calls.append(args))
+    metrics.increment('django_guid_request_ids_total', 'invalid')
+    metrics.observe('django_guid_integration_seconds', 0.5, 'SentryIntegration', 'run')
+    assert calls == [
+        ('counter', 'django_guid_request_ids_total', 1, {'outcome': 'invalid'}),
+        ('histogram', 'django_guid_integration_seconds', 0.5, {'integration': 'SentryIntegration', 'hook': 'run'}),
+    ]
+
+
+def test_backends_must_implement_the_updates():
+    class CountersOnly(Metrics):
+        def increment(self, name, *labels):
+            pass
+
+    with pytest.raises(TypeError, match='observe'):
+        CountersOnly()
+
+
+def test_resolve_metrics():
+    def callback(kind, name, value, labels):  # pragma: no cover
+        pass
+
+    custom = MetricsRegistry()
+    assert resolve_metrics(None) is None
+    assert resolve_metrics('builtin') is registry
+    assert resolve_metrics(custom) is custom
+    assert resolve_metrics(callback).callback is callback
+
+
+def test_prometheus_metrics():
+    prometheus_client = pytest.importorskip('prometheus_client')
+    metrics = resolve_metrics('prometheus')
+    assert resolve_metrics('prometheus') is metrics
+
+    before = prometheus_client.REGISTRY.get_sample_value('django_guid_request_ids_total', {'outcome': 'valid'}) or 0
+    metrics.increment('django_guid_request_ids_total', 'valid')
+    metrics.observe('django_guid_incoming_seconds', 0.001)
+    assert (
+        prometheus_client.REGISTRY.get_sample_value('django_guid_request_ids_total', {'outcome': 'valid'}) == before + 1
+    )
+    assert prometheus_client.REGISTRY.get_sample_value('django_guid_incoming_seconds_count') >= 1
+
+
+@pytest.mark.parametrize('value', ['statsd', 1])
+def test_invalid_metrics_setting(value):
+    with override_settings(DJANGO_GUID={'METRICS': value}):
+        with pytest.raises(ImproperlyConfigured, match='METRICS must be None'):
+            Settings().validate()
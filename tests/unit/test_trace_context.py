@@ -0,0 +1,66 @@
+import pytest
+
+from django_guid.trace_context import TraceParent, format_traceparent, parse_traceparent, trace_id_from_guid
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f'00-{TRACE_ID}-{PARENT_ID}-01') == TraceParent('00', TRACE_ID, PARENT_ID, '01')
+
+
+def test_parse_future_version():
+    """
+    Later versions may add fields, which are ignored.
+    """
+    assert parse_traceparent(f'cc-{TRACE_ID}-{PARENT_ID}-01-what-the-future-holds') == TraceParent(
+        'cc', TRACE_ID, PARENT_ID, '01'
+    )
+    assert parse_traceparent(f'cc-{TRACE_ID}-{PARENT_ID}-01') == TraceParent('cc', TRACE_ID, PARENT_ID, '01')
+
+
+@pytest.mark.parametrize(
+    'value',
+    [
+        None,
+        '',
+        f'00-{TRACE_ID}-{PARENT_ID}-1',  # Too short
+        f'00-{TRACE_ID}-{PARENT_ID}-01-',  # Version 00 has no more fields
+        f'cc-{TRACE_ID}-{PARENT_ID}-01.',  # Fields of later versions are separated by a dash
+        f'ff-{TRACE_ID}-{PARENT_ID}-01',  # Invalid version
+        f'00-{TRACE_ID.upper()}-{PARENT_ID}-01',  # Uppercase
+        f'00_{TRACE_ID}-{PARENT_ID}-01',
+        f'00-{TRACE_ID}_{PARENT_ID}-01',
+        f'00-{TRACE_ID}-{PARENT_ID}_01',
+        f'00-{"0" * 32}-{PARENT_ID}-01',  # All zero trace-id
+        f'00-{TRACE_ID}-{"0" * 16}-01',  # All zero parent-id
+        f'00-{TRACE_ID[:-1]}g-{PARENT_ID}-01',
+        f'00-{TRACE_ID}-{PARENT_ID}-0x',
+        f'00-{TRACE_ID[:-1]}--{PARENT_ID}-01',
+        f'00-{TRACE_ID[:-1]} -{PARENT_ID}-01',
+        f'00-{TRACE_ID[:-2]} 0-{PARENT_ID}-01',
+        f'00-{TRACE_ID[:-1]}é-{PARENT_ID}-01',
+    ],
+)
+def test_parse_invalid_traceparent(value):
+    assert parse_traceparent(value) is None
+
+
+def test_format_traceparent():
+    assert format_traceparent(TRACE_ID, PARENT_ID, '01') == f'00-{TRACE_ID}-{PARENT_ID}-01'
+
+
+@pytest.mark.parametrize(
+    'guid, trace_id',
+    [
+        (TRACE_ID, TRACE_ID),
+        ('4bf92f35-77b3-4da6-a3ce-929d0e0e4736', TRACE_ID),
+        ('4bf92f3577b34da6', None),  # Trimmed with UUID_LENGTH
+        ('01ARZ3NDEKTSV4RRFFQ69G5FAV', None),  # ULID
+        ('0' * 32, None),
+        ('4BF92F3577B34DA6A3CE929D0E0E4736', None),
+    ],
+)
+def test_trace_id_from_guid(guid, trace_id):
+    assert trace_id_from_guid(guid) == trace_id